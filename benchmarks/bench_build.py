@@ -0,0 +1,191 @@
+'''
+Benchmark: full-build time against dataset size and core count.
+
+For each size a synthetic unsorted CSV (title,value rows of ~8 KB like the
+Faker output, with a few quoted values holding commas, quotes and newlines)
+is generated once into `--work-dir`. The build then runs on it for each
+worker count and mode:
+
+- two-pass     `sort_csv_external` writes a sorted CSV (sort), then
+               `create_index` reads it back into data.bin + index.json (index);
+               the old build, kept in benchmarks/legacy_build.py
+- single-pass  `build_sorted_data` of scripts/build_wikidict_full.py merges
+               straight into data.bin + index.json
+
+Reported per run: seconds per step and in total, MB/s of input, and the
+bytes the build process read and wrote (/proc/self/io rchar/wchar; chunk
+sorting in pool workers is not included, it is the same in both modes). The
+output is checked: records in case-insensitive title order, none lost, every
+index entry pointing at its value.
+
+Usage:
+    python benchmarks/bench_build.py
+    python benchmarks/bench_build.py --sizes 256,1024 --workers 1,2,4,8 --output build.json
+'''
+
+import argparse
+import csv
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_index import generate_keys
+from common import PROJECT_ROOT, write_results
+
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+
+VALUE_BYTES = 8000
+WORDS = ("lorem", "ipsum", "dolor", "sit", "amet,", "consectetur", "adipiscing", "elit.",
+         "sed", "do", "eiusmod", "tempor", "incididunt", "ut", "labore", "et", "dolore")
+
+
+def prepare_csv(work_dir, size_mb, seed):
+    """Unsorted title,value CSV of about `size_mb` MB (reused when present)."""
+    path = Path(work_dir) / f"build-{size_mb}mb-{seed}.csv"
+    if path.exists():
+        return path
+
+    rng = random.Random(seed)
+    rows = size_mb * 1024 * 1024 // VALUE_BYTES
+    titles = generate_keys(rows, seed)
+    rng.shuffle(titles)
+    # Values are slices of one long text: cheap to generate, realistic to compress and parse
+    text = " ".join(rng.choice(WORDS) for _ in range(VALUE_BYTES))
+    print(f"Generating {rows:,} rows ({size_mb} MB)...")
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["title", "value"])
+        for i, title in enumerate(titles):
+            start = rng.randrange(len(text) // 2)
+            value = text[start:start + rng.randint(VALUE_BYTES // 2, VALUE_BYTES * 3 // 2)]
+            if i % 1000 == 0:
+                value = f'He said "{title}",\nthen left. {value}'
+            writer.writerow([title, value])
+    return path
+
+
+def io_counters():
+    """(bytes read, bytes written) by this process so far, or zeros off Linux."""
+    try:
+        with open("/proc/self/io", "r", encoding="ascii") as f:
+            fields = dict(line.split(": ") for line in f.read().splitlines())
+        return int(fields["rchar"]), int(fields["wchar"])
+    except OSError:
+        return 0, 0
+
+
+def check_output(data_file, index_file, expected_rows):
+    """Records in case-insensitive title order, none lost, index entries point at their values."""
+    from record_format import iter_records
+
+    with open(index_file, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    previous = ""
+    rows = 0
+    with open(data_file, "rb") as f:
+        for record in iter_records(f):
+            key = record["title"].lower()
+            if key < previous:
+                raise AssertionError(f"Out of order: {previous!r} before {key!r}")
+            previous = key
+            rows += 1
+        for title in random.Random(0).sample(list(index), min(100, len(index))):
+            f.seek(index[title]["offset"])
+            if len(f.read(index[title]["length"])) != index[title]["length"]:
+                raise AssertionError(f"Index entry of {title!r} points past the data file")
+    if rows != expected_rows or len(index) != expected_rows:
+        raise AssertionError(f"{rows:,} records and {len(index):,} index entries, {expected_rows:,} expected")
+
+
+def run_build(build, legacy, mode, input_csv, workers, chunk_rows, tmp_dir):
+    """Time the build steps once; returns seconds per step, (read, written) bytes and the outputs."""
+    sorted_csv = os.path.join(tmp_dir, "sorted.csv")
+    data_file = os.path.join(tmp_dir, "data.bin")
+    index_file = os.path.join(tmp_dir, "index.json")
+
+    sort_kwargs = {"chunk_size": chunk_rows, "workers": workers}
+
+    read_before, written_before = io_counters()
+    start = time.perf_counter()
+    if mode == "single-pass":
+        with open(data_file, "wb", buffering=build.SORT_IO_BUFFER) as data_out, \
+             open(index_file, "w", encoding="utf-8", buffering=build.SORT_IO_BUFFER) as index_out:
+            build.build_sorted_data(str(input_csv), data_out, index_out, **sort_kwargs)
+        seconds = {"sort": time.perf_counter() - start, "index": 0.0}
+    else:
+        legacy.sort_csv_external(str(input_csv), sorted_csv, **sort_kwargs)
+        sort_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        legacy.create_index(sorted_csv, data_file, index_file)
+        seconds = {"sort": sort_seconds, "index": time.perf_counter() - start}
+    read_after, written_after = io_counters()
+    return seconds, (read_after - read_before, written_after - written_before), (data_file, index_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-build time vs dataset size and cores")
+    parser.add_argument("--sizes", default="128,512", help="Comma-separated input sizes in MB (default: 128,512)")
+    parser.add_argument("--workers", default=None,
+                        help="Comma-separated sort worker counts (default: 1 and the CPU count)")
+    parser.add_argument("--modes", default="two-pass,single-pass",
+                        help="Comma-separated build modes: two-pass, single-pass (default: both)")
+    parser.add_argument("--chunk-rows", type=int, default=25000, help="Rows per sorted chunk (default: 25000)")
+    parser.add_argument("--seed", type=int, default=42, help="Dataset seed (default: 42)")
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "wikidict-bench"),
+                        help="Where datasets are generated and cached")
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    import build_wikidict_full as build
+    import legacy_build as legacy
+    # The build logs every 100k rows; keep the benchmark output readable
+    logging.getLogger(build.__name__).setLevel(logging.WARNING)
+
+    cpus = os.cpu_count() or 1
+    worker_counts = [int(w) for w in args.workers.split(",")] if args.workers else sorted({1, cpus})
+    os.makedirs(args.work_dir, exist_ok=True)
+
+    modes = args.modes.split(",")
+    if "single-pass" in modes and not hasattr(build, "build_sorted_data"):
+        modes.remove("single-pass")
+
+    results = {"cpus": cpus, "chunk_rows": args.chunk_rows, "runs": []}
+    print(f"{cpus} CPU(s), {args.chunk_rows:,} rows per chunk")
+    print(f"  {'size':>8} {'mode':>11} {'workers':>7} {'sort s':>8} {'index s':>8} {'total s':>8}"
+          f" {'MB/s':>7} {'read MB':>8} {'written MB':>10}")
+    for size_mb in [int(s) for s in args.sizes.split(",")]:
+        input_csv = prepare_csv(args.work_dir, size_mb, args.seed)
+        input_mb = input_csv.stat().st_size / (1024 ** 2)
+        with open(input_csv, "r", encoding="utf-8", newline="") as f:
+            expected_rows = sum(1 for _ in csv.DictReader(f))
+
+        for workers in worker_counts:
+            for mode in modes:
+                tmp_dir = tempfile.mkdtemp(prefix="wikidict-build-", dir=args.work_dir)
+                try:
+                    seconds, (read, written), outputs = run_build(
+                        build, legacy, mode, input_csv, workers, args.chunk_rows, tmp_dir)
+                    check_output(*outputs, expected_rows)
+                    index_mb = os.path.getsize(outputs[1]) / (1024 ** 2)
+                finally:
+                    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+                total = sum(seconds.values())
+                results["runs"].append({"input_mb": input_mb, "rows": expected_rows, "mode": mode,
+                                        "workers": workers, "seconds": seconds, "total_seconds": total,
+                                        "read_bytes": read, "written_bytes": written, "index_mb": index_mb})
+                print(f"  {input_mb:>6,.0f}MB {mode:>11} {workers:>7} {seconds['sort']:>8.1f}"
+                      f" {seconds['index']:>8.1f} {total:>8.1f} {input_mb / total:>7.1f}"
+                      f" {read / 1024 ** 2:>8,.0f} {written / 1024 ** 2:>10,.0f}")
+
+    write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+'''
+Benchmark: applying delta segments to a live IndexLoader vs reloading it.
+
+A synthetic index (see bench_index.py) is loaded once through the local
+storage backend. Delta indexes of `--delta-sizes` changed titles (updates,
+additions and deletions in equal parts) are then applied one after another
+with `IndexLoader.apply_delta`, while `--readers` threads keep calling
+`get_value_by_key` and `autosuggest_keys`. Reported:
+
+- full load time of the base index (what a reload would cost)
+- apply time per delta, from the parsed delta index and including the read
+  and parse from storage
+- lookup ns/op for present keys with no deltas and with all of them applied
+  (each delta adds one dict probe for keys it does not hold)
+
+The readers check consistency: every delta also rewrites one probe title,
+and a reader that saw generation g must find the probe at least as new as
+the delta that produced g.
+
+Usage:
+    python benchmarks/bench_delta_apply.py
+    python benchmarks/bench_delta_apply.py --keys 5M --delta-sizes 1k,10k,100k --output delta-apply.json
+'''
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+from bench_index import best_ns_per_op, format_size, generate_keys, parse_size, prepare_index
+from common import write_results
+
+PROBE = "Delta benchmark probe"
+
+
+def write_delta(bucket_dir, number, keys, size, rng):
+    """Delta index of `size` changes (a third each updated, added, deleted); returns the manifest entry."""
+    third = max(1, size // 3)
+    index = {key: {"offset": number, "length": 100} for key in rng.sample(keys, third)}
+    index.update({f"{key} delta {number}": {"offset": number, "length": 100} for key in rng.sample(keys, third)})
+    index.update({key: None for key in rng.sample(keys, third) if key not in index})
+    index[PROBE] = {"offset": number, "length": 100}
+
+    index_key = f"dict/bench/delta-{number}.json"
+    with open(os.path.join(bucket_dir, index_key), "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(index.items(), key=lambda item: item[0].lower())), f, separators=(",", ":"))
+    return {"file_path": f"dict/bench/delta-{number}.bin", "index_file_path": index_key,
+            "data_format": "binary-v1", "entries": len(index)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delta apply time vs full index reload")
+    parser.add_argument("--keys", default="1M", help="Base index size (default: 1M)")
+    parser.add_argument("--delta-sizes", default="1k,10k,100k",
+                        help="Comma-separated changed titles per delta (default: 1k,10k,100k)")
+    parser.add_argument("--layout", choices=("dict", "packed"), default="dict", help="Index layout (default: dict)")
+    parser.add_argument("--readers", type=int, default=4, help="Reader threads during applies (default: 4)")
+    parser.add_argument("--lookups", type=int, default=200000, help="Keys per lookup pass (default: 200000)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed (default: 42)")
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "wikidict-bench"),
+                        help="Where synthetic indexes are generated and cached")
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    from src.config.load_indexes import IndexLoader
+    from src.storage import LocalStorageBackend, set_storage_backend
+
+    os.makedirs(args.work_dir, exist_ok=True)
+    num_keys = parse_size(args.keys)
+    bucket_dir = prepare_index(args.work_dir, num_keys, args.seed)
+    set_storage_backend(LocalStorageBackend(str(bucket_dir)))
+    with open(os.path.join(bucket_dir, "manifest.json"), "r", encoding="utf-8") as f:
+        base_manifest = json.load(f)
+
+    loader = IndexLoader(layout=args.layout)
+    rng = random.Random(args.seed)
+    keys = generate_keys(num_keys, args.seed)
+    present = [rng.choice(keys) for _ in range(args.lookups)]
+    results = {"keys": num_keys, "layout": args.layout, "load_seconds": loader.load_seconds,
+               "hit_ns_per_op": best_ns_per_op(loader.get_value_by_key, present, 3), "deltas": []}
+
+    # Generation -> delta number the probe must be at (or past)
+    expected = {loader.generation: -1}
+    manifests = []
+    sizes = [parse_size(s) for s in args.delta_sizes.split(",")]
+    for number, size in enumerate(sizes):
+        delta = write_delta(bucket_dir, number, keys, size, rng)
+        manifest = {**base_manifest, "deltas": [*(m["deltas"][-1] for m in manifests), delta]}
+        manifests.append(manifest)
+        expected[IndexLoader._generation_of(manifest)] = number
+
+    stop = threading.Event()
+    errors = []
+
+    def reader(seed):
+        reader_rng = random.Random(seed)
+        while not stop.is_set():
+            generation = loader.generation
+            entry = loader.get_value_by_key(PROBE)
+            seen = entry["offset"] if entry else -1
+            if seen < expected[generation]:
+                errors.append(f"generation {generation} expects delta {expected[generation]}, probe at {seen}")
+            loader.autosuggest_keys(reader_rng.choice(keys)[:2], max_suggestions=10)
+
+    threads = [threading.Thread(target=reader, args=(i,), daemon=True) for i in range(args.readers)]
+    for thread in threads:
+        thread.start()
+
+    print(f"{format_size(num_keys)} keys ({args.layout}): full load {loader.load_seconds:.2f}s,"
+          f" lookup {results['hit_ns_per_op']:,.0f} ns/op; {args.readers} reader thread(s)")
+    print(f"  {'delta':>8} {'apply ms':>9} {'+ read ms':>9}")
+    try:
+        for number, manifest in enumerate(manifests):
+            delta = manifest["deltas"][-1]
+            start = time.perf_counter()
+            index = loader.storage.read_json(delta["index_file_path"])
+            parsed = time.perf_counter()
+            loader.apply_delta(delta, index, manifest=manifest)
+            applied = time.perf_counter()
+            results["deltas"].append({"changed": delta["entries"], "apply_seconds": applied - parsed,
+                                      "read_and_apply_seconds": applied - start})
+            print(f"  {delta['entries']:>8,} {(applied - parsed) * 1000:>9.1f} {(applied - start) * 1000:>9.1f}")
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    if errors:
+        raise AssertionError(f"{len(errors)} inconsistent reads, e.g. {errors[0]}")
+    results["hit_ns_per_op_with_deltas"] = best_ns_per_op(loader.get_value_by_key, present, 3)
+    print(f"  lookup with {len(manifests)} delta(s): {results['hit_ns_per_op_with_deltas']:,.0f} ns/op;"
+          f" readers saw no inconsistent state")
+    write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
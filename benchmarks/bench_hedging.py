@@ -0,0 +1,92 @@
+'''
+Benchmark: hedged range reads against a storage stand-in with a latency tail.
+
+The stand-in answers most reads in `--base-ms` (with jitter) and a fraction
+`--tail-rate` in `--tail-ms`, independently per request - the shape of S3 GET
+latency. The same workload is run with and without hedging and the latency
+percentiles, hedge rate and hedge win rate are reported.
+
+Usage:
+    python benchmarks/bench_hedging.py
+    python benchmarks/bench_hedging.py --reads 5000 --tail-rate 0.02 --tail-ms 400 --budget 0.05
+'''
+
+import argparse
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import write_results
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hedged read benchmark")
+    parser.add_argument("--reads", type=int, default=3000, help="Reads per scenario (default: 3000)")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent readers (default: 16)")
+    parser.add_argument("--base-ms", type=float, default=8.0, help="Typical read latency (default: 8)")
+    parser.add_argument("--tail-ms", type=float, default=250.0, help="Tail read latency (default: 250)")
+    parser.add_argument("--tail-rate", type=float, default=0.03, help="Fraction of slow reads (default: 0.03)")
+    parser.add_argument("--budget", type=float, default=0.05, help="Hedge budget (default: 0.05)")
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    from src.storage import HedgedStorageBackend, MemoryStorageBackend
+
+    class TailLatencyBackend(MemoryStorageBackend):
+        """In-memory objects with S3-like latency: jittered base plus a heavy tail."""
+
+        def read_range(self, key, offset, length):
+            if random.random() < args.tail_rate:
+                time.sleep(args.tail_ms / 1000)
+            else:
+                time.sleep(random.uniform(0.5, 1.5) * args.base_ms / 1000)
+            return super().read_range(key, offset, length)
+
+    stand_in = TailLatencyBackend({"data.bin": b"x" * 1_000_000})
+    scenarios = [
+        ("no hedging", stand_in),
+        ("hedged", HedgedStorageBackend(stand_in, budget=args.budget,
+                                        initial_delay_ms=args.base_ms * 2)),
+    ]
+
+    print(f"{args.reads:,} reads, {args.clients} clients, base {args.base_ms}ms, "
+          f"{args.tail_rate:.0%} tail at {args.tail_ms}ms")
+    results = []
+    for label, backend in scenarios:
+        def timed_read(_):
+            start = time.perf_counter()
+            backend.read_range("data.bin", random.randrange(900_000), 8000)
+            return (time.perf_counter() - start) * 1000
+
+        with ThreadPoolExecutor(max_workers=args.clients) as pool:
+            latencies = list(pool.map(timed_read, range(args.reads)))
+
+        result = {
+            "label": label,
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+            "mean_ms": statistics.mean(latencies),
+        }
+        if isinstance(backend, HedgedStorageBackend):
+            result.update(backend.stats()["hedging"])
+            backend.close()
+        results.append(result)
+
+        extra = ""
+        if "hedge_rate" in result:
+            extra = f"  hedged {result['hedge_rate']:.1%} (wins {result['hedge_wins']}, delay {result['delay_ms']}ms)"
+        print(f"  {label:<12} p50 {result['p50_ms']:7.1f}ms  p95 {result['p95_ms']:7.1f}ms  "
+              f"p99 {result['p99_ms']:7.1f}ms{extra}")
+
+    write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
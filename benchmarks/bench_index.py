@@ -0,0 +1,326 @@
+'''
+Micro-benchmark: IndexLoader load, exact lookup and autosuggest at scale.
+
+For each size a synthetic index (Wikipedia-like titles, sorted
+case-insensitively like build_wikidict_full.py output) is generated once into
+`--work-dir` and loaded by the real `IndexLoader` through the local storage
+backend. Every size runs in a fresh subprocess so RSS is not inherited from
+the previous one. Reported per size:
+
+- load time (manifest + index JSON + key lists)
+- RSS before loading, peak RSS during load, steady RSS after a gc
+- `get_value_by_key` ns/op for present and missing keys (best of `--repeat`)
+- `autosuggest_keys` ops/s per prefix length and limit
+
+Sizes whose estimated footprint exceeds the available memory are skipped and
+recorded as such. `--layout packed` measures the flat-buffer layout used by
+the pre-fork server instead of the dict.
+
+Usage:
+    python benchmarks/bench_index.py                          # 1M, 10M, 50M keys
+    python benchmarks/bench_index.py --sizes 1M --output index-1m.json
+    python benchmarks/bench_index.py --sizes 1M --compare index-1m.json
+    python benchmarks/bench_index.py --sizes 1M --layout packed --compare index-1m.json
+'''
+
+import argparse
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common import PROJECT_ROOT, process_memory_mb, write_results
+
+SYLLABLES = [
+    "a", "an", "ar", "ba", "be", "bi", "bo", "ca", "ce", "chi", "co", "da", "de",
+    "di", "do", "el", "en", "er", "es", "fa", "fe", "fi", "ga", "ge", "go", "ha",
+    "he", "hi", "in", "is", "ka", "ko", "la", "le", "li", "lo", "ma", "me", "mi",
+    "mo", "na", "ne", "ni", "no", "on", "or", "pa", "pe", "pi", "po", "qua", "ra",
+    "re", "ri", "ro", "sa", "se", "si", "so", "ta", "te", "ti", "to", "tra", "u",
+    "un", "va", "ve", "vi", "wa", "we", "xi", "ya", "yo", "za", "ze", "zo",
+]
+PREFIX_LENGTHS = (1, 2, 3, 5, 8)
+LIMITS = (10, 50)
+# Rough IndexLoader footprint per key, used until a size has been measured
+DEFAULT_BYTES_PER_KEY = 450
+
+
+def parse_size(text):
+    """'1M' -> 1_000_000, '500k' -> 500_000, '20000' -> 20000."""
+    text = text.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * multiplier)
+
+
+def format_size(n):
+    if n >= 1_000_000 and n % 1_000_000 == 0:
+        return f"{n // 1_000_000}M"
+    if n >= 1_000 and n % 1_000 == 0:
+        return f"{n // 1_000}k"
+    return str(n)
+
+
+def available_memory_mb():
+    """MemAvailable from /proc/meminfo (None elsewhere)."""
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def generate_keys(num_keys, seed):
+    """Unique 1-3 word titles, mixed case, sorted like the build scripts sort them."""
+    rng = random.Random(seed)
+    keys = set()
+    while len(keys) < num_keys:
+        words = []
+        for _ in range(rng.choice((1, 1, 2, 2, 2, 3))):
+            words.append("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4))))
+        key = " ".join(words)
+        if rng.random() < 0.5:
+            key = key.capitalize()
+        keys.add(key)
+    return sorted(keys, key=str.lower)
+
+
+def prepare_index(work_dir, num_keys, seed):
+    """Write manifest.json + index JSON into a bucket directory (reused when present)."""
+    bucket_dir = Path(work_dir) / f"index-{num_keys}-{seed}"
+    manifest_path = bucket_dir / "manifest.json"
+    if manifest_path.exists():
+        return bucket_dir
+
+    print(f"Generating {num_keys:,} keys...")
+    start = time.perf_counter()
+    keys = generate_keys(num_keys, seed)
+    rng = random.Random(seed + 1)
+    index_key = f"dict/bench/index-{num_keys}.json"
+    index_path = bucket_dir / index_key
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Streamed: a 50M entry dict would not fit next to the key list
+    offset = 0
+    with open(index_path, "w", encoding="utf-8") as f:
+        f.write("{")
+        for i, key in enumerate(keys):
+            length = rng.randint(200, 6000)
+            if i:
+                f.write(",")
+            f.write(f'{json.dumps(key)}:{{"offset":{offset},"length":{length}}}')
+            offset += length + 8
+        f.write("}")
+    del keys
+
+    # No file_path: the loader only reads the index, nothing is prefetched or held in memory
+    manifest = {
+        "version": "benchmark",
+        "index_file_path": index_key,
+        "total_entries": num_keys,
+    }
+    manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+    print(f"  {index_path.stat().st_size / (1024 ** 2):,.0f} MB index written in "
+          f"{time.perf_counter() - start:.1f}s")
+    return bucket_dir
+
+
+def best_ns_per_op(fn, keys, repeat):
+    """Best-of-`repeat` nanoseconds per call of `fn(key)` over `keys`."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for key in keys:
+            fn(key)
+        elapsed = (time.perf_counter_ns() - start) / len(keys)
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def measure_index(bucket_dir, lookups, queries, repeat, seed, layout):
+    """Load `bucket_dir` with IndexLoader and measure it (runs in a child process)."""
+    from src.config.load_indexes import IndexLoader
+    from src.storage import LocalStorageBackend, set_storage_backend
+
+    set_storage_backend(LocalStorageBackend(str(bucket_dir)))
+    gc.collect()
+    rss_before, _ = process_memory_mb()
+
+    start = time.perf_counter()
+    loader = IndexLoader(layout=layout)
+    load_seconds = time.perf_counter() - start
+
+    _, peak_rss = process_memory_mb()
+    gc.collect()
+    steady_rss, _ = process_memory_mb()
+
+    rng = random.Random(seed)
+    key_at = loader.indexes.key_at if layout == "packed" else loader.sorted_keys.__getitem__
+    num_keys = len(loader.indexes)
+    present = [key_at(rng.randrange(num_keys)) for _ in range(lookups)]
+    missing = [key + "\x00" for key in present]
+    lookup = {
+        "hit_ns_per_op": best_ns_per_op(loader.get_value_by_key, present, repeat),
+        "miss_ns_per_op": best_ns_per_op(loader.get_value_by_key, missing, repeat),
+    }
+
+    autosuggest = []
+    for prefix_length in PREFIX_LENGTHS:
+        # Prefixes users would type: the start of existing titles, in their original case
+        prefixes = [key_at(rng.randrange(num_keys))[:prefix_length] for _ in range(queries)]
+        for limit in LIMITS:
+            suggest = loader.autosuggest_keys
+            best = None
+            for _ in range(repeat):
+                returned = 0
+                start = time.perf_counter()
+                for prefix in prefixes:
+                    returned += len(suggest(prefix, max_suggestions=limit))
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            autosuggest.append({
+                "prefix_length": prefix_length,
+                "limit": limit,
+                "ops_per_sec": queries / best,
+                "us_per_op": best / queries * 1e6,
+                "mean_results": returned / queries,
+            })
+
+    return {
+        "keys": num_keys,
+        "layout": layout,
+        "load_seconds": load_seconds,
+        "rss_before_mb": rss_before,
+        "peak_rss_mb": peak_rss,
+        "steady_rss_mb": steady_rss,
+        "index_bytes_per_key": ((steady_rss - rss_before) * 1024 ** 2 / num_keys
+                                if steady_rss and rss_before else None),
+        "lookup": lookup,
+        "autosuggest": autosuggest,
+    }
+
+
+def run_child(bucket_dir, args):
+    """Measure one index in a fresh interpreter; returns the result dict."""
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        result_path = f.name
+    command = [
+        sys.executable, __file__, "--child", str(bucket_dir), "--child-output", result_path,
+        "--lookups", str(args.lookups), "--queries", str(args.queries),
+        "--repeat", str(args.repeat), "--seed", str(args.seed), "--layout", args.layout,
+    ]
+    try:
+        subprocess.run(command, check=True, cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL)
+        with open(result_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        os.unlink(result_path)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_result(result):
+    lookup = result["lookup"]
+    print(f"  load {result['load_seconds']:.2f}s  RSS before {result['rss_before_mb']:,.0f} MB"
+          f"  peak {result['peak_rss_mb']:,.0f} MB  steady {result['steady_rss_mb']:,.0f} MB"
+          f"  (~{result['index_bytes_per_key']:,.0f} B/key)")
+    print(f"  get_value_by_key  hit {lookup['hit_ns_per_op']:,.0f} ns/op"
+          f"  miss {lookup['miss_ns_per_op']:,.0f} ns/op")
+    print("  autosuggest_keys  prefix  limit       ops/s    µs/op  results")
+    for row in result["autosuggest"]:
+        print(f"                    {row['prefix_length']:>6}  {row['limit']:>5}"
+              f"  {row['ops_per_sec']:>10,.0f}  {row['us_per_op']:>7.2f}  {row['mean_results']:>7.1f}")
+
+
+def compare(results, previous):
+    """Print current/previous ratios for sizes present in both runs."""
+    before = {r["keys"]: r for r in previous.get("sizes", []) if not r.get("skipped")}
+    layouts = (results["config"]["layout"], previous.get("config", {}).get("layout", "dict"))
+    print(f"\nCompared with {previous.get('commit') or 'previous run'} (current / previous, {'/'.join(layouts)}):")
+    for result in results["sizes"]:
+        old = before.get(result["keys"])
+        if result.get("skipped") or old is None:
+            continue
+        print(f"  {format_size(result['keys'])}: load {result['load_seconds'] / old['load_seconds']:.2f}x"
+              f"  steady RSS {result['steady_rss_mb'] / old['steady_rss_mb']:.2f}x"
+              f"  lookup hit {result['lookup']['hit_ns_per_op'] / old['lookup']['hit_ns_per_op']:.2f}x")
+        old_rows = {(r["prefix_length"], r["limit"]): r for r in old["autosuggest"]}
+        for row in result["autosuggest"]:
+            old_row = old_rows.get((row["prefix_length"], row["limit"]))
+            if old_row:
+                print(f"    autosuggest prefix {row['prefix_length']} limit {row['limit']}:"
+                      f" {row['ops_per_sec'] / old_row['ops_per_sec']:.2f}x ops/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IndexLoader micro-benchmark")
+    parser.add_argument("--sizes", default="1M,10M,50M", help="Comma-separated key counts (default: 1M,10M,50M)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for keys and samples (default: 42)")
+    parser.add_argument("--lookups", type=int, default=200000, help="Keys per lookup pass (default: 200000)")
+    parser.add_argument("--queries", type=int, default=20000, help="Prefixes per autosuggest case (default: 20000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes per measurement, best is kept (default: 5)")
+    parser.add_argument("--layout", choices=("dict", "packed"), default="dict", help="Index layout (default: dict)")
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "wikidict-bench"),
+                        help="Where synthetic indexes are generated and cached")
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    parser.add_argument("--compare", help="Previous --output file to compare with")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--child-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = measure_index(args.child, args.lookups, args.queries, args.repeat, args.seed, args.layout)
+        with open(args.child_output, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        return
+
+    os.makedirs(args.work_dir, exist_ok=True)
+    results = {
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "config": {"lookups": args.lookups, "queries": args.queries, "repeat": args.repeat,
+                   "seed": args.seed, "layout": args.layout},
+        "sizes": [],
+    }
+    bytes_per_key = DEFAULT_BYTES_PER_KEY
+    for num_keys in [parse_size(s) for s in args.sizes.split(",")]:
+        label = format_size(num_keys)
+        available = available_memory_mb()
+        needed = num_keys * bytes_per_key / 1024 ** 2
+        if available is not None and needed > available:
+            print(f"\n{label} keys: skipped (needs ~{needed:,.0f} MB, {available:,.0f} MB available)")
+            results["sizes"].append({"keys": num_keys, "skipped": True, "estimated_mb": needed})
+            continue
+
+        bucket_dir = prepare_index(args.work_dir, num_keys, args.seed)
+        print(f"\n{label} keys:")
+        result = run_child(bucket_dir, args)
+        print_result(result)
+        results["sizes"].append(result)
+        if result["index_bytes_per_key"]:
+            # Peak during load is higher than steady; scale the next estimate by it
+            bytes_per_key = result["peak_rss_mb"] * 1024 ** 2 / num_keys
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(results, json.load(f))
+    write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+'''
+End-to-end load benchmark.
+
+1. Generates a dataset with scripts/generate_fake_dataset.py (seeded) and
+   builds the binary data file + index (benchmarks/legacy_build.py)
+2. Serves it from a local S3-compatible stand-in (benchmarks/s3_standin.py)
+   with injected latency
+3. Starts the real server (uvicorn main:app) against the stand-in
+4. Drives /search and /autocomplete with open-loop Poisson arrivals over a
+   Zipfian word popularity; latency is measured from the scheduled send time,
+   so a slow server cannot hide queueing (no coordinated omission)
+5. Reports throughput, p50/p95/p99, errors, S3 GETs per request and server
+   RSS, and compares them with a stored baseline
+
+Usage:
+    python benchmarks/bench_load.py
+    python benchmarks/bench_load.py --rows 50000 --rate 500 --duration 60 --s3-latency-ms 20
+    python benchmarks/bench_load.py --save-baseline     # record the current numbers
+    python benchmarks/bench_load.py --check             # exit 1 on regression
+
+Baselines are machine-specific: record one on the machine (or CI runner)
+that runs the check.
+'''
+
+import argparse
+import asyncio
+import bisect
+import json
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import yaml
+
+from common import PROJECT_ROOT, process_memory_mb, write_results
+from s3_standin import S3StandIn
+
+SCRIPTS_DIR = PROJECT_ROOT / "scripts"
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "load_baseline.json"
+BUCKET = "benchmark"
+DATA_PREFIX = "dict/benchmark"
+ENDPOINTS = ("search", "autocomplete")
+
+
+def prepare_dataset(work_dir, num_rows, seed):
+    """Generate and build a bucket directory (reused when it already exists)."""
+    bucket_dir = Path(work_dir) / f"bucket-{num_rows}-{seed}"
+    manifest_path = bucket_dir / "manifest.json"
+    if manifest_path.exists():
+        print(f"Reusing dataset {bucket_dir}")
+        return bucket_dir
+
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    import generate_fake_dataset
+    import legacy_build
+    from record_format import DATA_FILE_NAME, DATA_FORMAT, INDEX_FILE_NAME
+
+    data_dir = bucket_dir / DATA_PREFIX
+    data_dir.mkdir(parents=True, exist_ok=True)
+    csv_path = Path(work_dir) / f"fake-{num_rows}-{seed}.csv"
+
+    print(f"Generating {num_rows:,} rows...")
+    random.seed(seed)
+    generate_fake_dataset.fake.seed_instance(seed)
+    if not generate_fake_dataset.generate_fake_dataset(str(csv_path), num_rows=num_rows):
+        raise RuntimeError("Dataset generation failed")
+
+    data_path = data_dir / DATA_FILE_NAME
+    index_path = data_dir / INDEX_FILE_NAME
+    legacy_build.create_index(str(csv_path), str(data_path), str(index_path))
+    csv_path.unlink()
+
+    manifest = {
+        "service_name": "wikidict",
+        "file_path": f"{DATA_PREFIX}/{DATA_FILE_NAME}",
+        "index_file_path": f"{DATA_PREFIX}/{INDEX_FILE_NAME}",
+        "data_format": DATA_FORMAT,
+        "file_size": data_path.stat().st_size,
+        "changelog_file_path": "",
+        "last_updated_at": "benchmark",
+        "version": f"benchmark-{num_rows}-{seed}",
+    }
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return bucket_dir
+
+
+def write_server_config(path, in_memory):
+    """config.yaml with the S3 backend forced (and in-memory serving off unless asked)."""
+    with open(PROJECT_ROOT / "config.yaml", "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    storage = config.setdefault("storage", {})
+    storage["backend"] = "s3"
+    if not in_memory:
+        storage["in_memory_max_bytes"] = 0
+    config["debug"] = False
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(config, f)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(config_path, endpoint_url, port, log_file, workers):
+    env = dict(os.environ)
+    env.update({
+        "WIKIDICT_CONFIG": str(config_path),
+        "AWS_ENDPOINT_URL": endpoint_url,
+        "AWS_ACCESS_KEY": "benchmark",
+        "AWS_SECRET_KEY": "benchmark",
+        "AWS_REGION": "us-east-1",
+        "AWS_BUCKET_NAME": BUCKET,
+    })
+    command = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+               "--port", str(port), "--log-level", "warning"]
+    if workers > 1:
+        command += ["--workers", str(workers)]
+    process = subprocess.Popen(command, cwd=PROJECT_ROOT, env=env, stdout=log_file, stderr=subprocess.STDOUT)
+
+    deadline = time.monotonic() + 300
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited during startup (see {log_file.name})")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/api/v1/ready", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("Server did not become healthy in time")
+
+
+class Zipf:
+    """Sampler over ranks 0..n-1 with P(rank k) proportional to 1/(k+1)^s."""
+
+    def __init__(self, n, s, rng):
+        self.rng = rng
+        self.cdf = []
+        total = 0.0
+        for k in range(1, n + 1):
+            total += 1.0 / (k ** s)
+            self.cdf.append(total)
+        self.total = total
+
+    def sample(self):
+        return bisect.bisect_left(self.cdf, self.rng.random() * self.total)
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_load(base_url, words, rate, duration, autocomplete_ratio, zipf_s, seed, accept_encoding):
+    """Open-loop load: Poisson arrivals at `rate` req/s for `duration` seconds."""
+    rng = random.Random(seed)
+    popularity = list(words)
+    rng.shuffle(popularity)
+    zipf = Zipf(len(popularity), zipf_s, rng)
+
+    latencies = {name: [] for name in ENDPOINTS}
+    errors = {name: 0 for name in ENDPOINTS}
+    loop = asyncio.get_running_loop()
+    limits = httpx.Limits(max_connections=512, max_keepalive_connections=512)
+    headers = {"Accept-Encoding": accept_encoding}
+
+    async def one(client, endpoint, params, scheduled):
+        try:
+            response = await client.get(f"/api/v1/{endpoint}", params=params, headers=headers)
+            ok = response.status_code in (200, 304)
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            latencies[endpoint].append(loop.time() - scheduled)
+        else:
+            errors[endpoint] += 1
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        tasks = []
+        start = loop.time()
+        next_at = start
+        while next_at - start < duration:
+            next_at += rng.expovariate(rate)
+            delay = next_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            word = popularity[zipf.sample()]
+            if rng.random() < autocomplete_ratio:
+                endpoint, params = "autocomplete", {"q": word[:rng.randint(1, 4)], "limit": 10}
+            else:
+                endpoint, params = "search", {"word": word}
+            tasks.append(asyncio.create_task(one(client, endpoint, params, next_at)))
+        await asyncio.gather(*tasks)
+        elapsed = loop.time() - start
+
+    results = {}
+    for endpoint in ENDPOINTS:
+        values = sorted(latencies[endpoint])
+        total = len(values) + errors[endpoint]
+        results[endpoint] = {
+            "requests": total,
+            "errors": errors[endpoint],
+            "error_rate": errors[endpoint] / total if total else 0.0,
+            "throughput": len(values) / elapsed,
+            "p50_ms": percentile(values, 50) * 1000 if values else None,
+            "p95_ms": percentile(values, 95) * 1000 if values else None,
+            "p99_ms": percentile(values, 99) * 1000 if values else None,
+        }
+    return results, elapsed
+
+
+def check_regressions(results, baseline, tolerance):
+    """Return a list of human-readable regressions against the baseline."""
+    failures = []
+    for endpoint in ENDPOINTS:
+        current, base = results["endpoints"][endpoint], baseline["endpoints"][endpoint]
+        if base["p99_ms"] and current["p99_ms"] and current["p99_ms"] > base["p99_ms"] * (1 + tolerance):
+            failures.append(f"{endpoint} p99 {current['p99_ms']:.1f}ms > baseline {base['p99_ms']:.1f}ms")
+        if current["throughput"] < base["throughput"] * (1 - tolerance):
+            failures.append(f"{endpoint} throughput {current['throughput']:.0f} < baseline {base['throughput']:.0f} req/s")
+        if current["error_rate"] > base["error_rate"] + 0.001:
+            failures.append(f"{endpoint} error rate {current['error_rate']:.2%} > baseline {base['error_rate']:.2%}")
+
+    if results["s3_gets_per_request"] > baseline["s3_gets_per_request"] * (1 + tolerance) + 0.01:
+        failures.append(f"S3 GETs/request {results['s3_gets_per_request']:.3f} > "
+                        f"baseline {baseline['s3_gets_per_request']:.3f}")
+    if results["rss_mb"] and baseline.get("rss_mb") and results["rss_mb"] > baseline["rss_mb"] * (1 + tolerance):
+        failures.append(f"RSS {results['rss_mb']:.0f}MB > baseline {baseline['rss_mb']:.0f}MB")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end load benchmark with a local S3 stand-in")
+    parser.add_argument("--rows", type=int, default=20000, help="Dataset rows (default: 20000)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for data and traffic (default: 42)")
+    parser.add_argument("--rate", type=float, default=100, help="Offered load in req/s (default: 100)")
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds (default: 30)")
+    parser.add_argument("--warmup", type=float, default=5, help="Unmeasured warm-up seconds (default: 5)")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of word popularity (default: 1.1)")
+    parser.add_argument("--autocomplete-ratio", type=float, default=0.2, help="Share of /autocomplete (default: 0.2)")
+    parser.add_argument("--accept-encoding", default="gzip", help="Accept-Encoding sent by the client (default: gzip)")
+    parser.add_argument("--s3-latency-ms", type=float, default=15, help="Stand-in base latency (default: 15)")
+    parser.add_argument("--s3-jitter-ms", type=float, default=5, help="Stand-in uniform jitter (default: 5)")
+    parser.add_argument("--s3-tail-ratio", type=float, default=0.0, help="Share of slow stand-in requests (default: 0)")
+    parser.add_argument("--s3-tail-ms", type=float, default=250, help="Latency of slow requests (default: 250)")
+    parser.add_argument("--in-memory", action="store_true", help="Allow in-memory serving of the data file")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers (default: 1)")
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "wikidict-bench"),
+                        help="Where datasets are generated and cached")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (default: 0.2)")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 on regression")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    # The build scripts configure logging at INFO; keep httpx from logging every request
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    os.makedirs(args.work_dir, exist_ok=True)
+    bucket_dir = prepare_dataset(args.work_dir, args.rows, args.seed)
+    manifest = json.loads((bucket_dir / "manifest.json").read_text(encoding="utf-8"))
+    with open(bucket_dir / manifest["index_file_path"], "r", encoding="utf-8") as f:
+        words = list(json.load(f))
+
+    standin = S3StandIn(
+        bucket_dir.parent, BUCKET,
+        latency_ms=args.s3_latency_ms, jitter_ms=args.s3_jitter_ms,
+        tail_ratio=args.s3_tail_ratio, tail_ms=args.s3_tail_ms, seed=args.seed,
+    )
+    # The stand-in serves <root>/<bucket>/<key>; expose the bucket dir under the bucket name
+    bucket_link = bucket_dir.parent / BUCKET
+    if bucket_link.is_symlink() or bucket_link.exists():
+        bucket_link.unlink()
+    bucket_link.symlink_to(bucket_dir.name)
+    standin.root_dir = str(bucket_link.resolve())
+    standin.start()
+
+    config_path = Path(args.work_dir) / "config.bench.yaml"
+    write_server_config(config_path, args.in_memory)
+    port = free_port()
+    log_path = Path(args.work_dir) / "server.log"
+
+    with open(log_path, "w") as log_file:
+        print(f"Starting server on :{port} (S3 stand-in {standin.endpoint_url}, "
+              f"{args.s3_latency_ms}ms + {args.s3_jitter_ms}ms jitter)...")
+        startup_start = time.perf_counter()
+        server = start_server(config_path, standin.endpoint_url, port, log_file, args.workers)
+        startup_seconds = time.perf_counter() - startup_start
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            if args.warmup > 0:
+                print(f"Warm-up {args.warmup:.0f}s...")
+                asyncio.run(run_load(base_url, words, args.rate, args.warmup, args.autocomplete_ratio,
+                                     args.zipf, args.seed + 1, args.accept_encoding))
+
+            s3_before = standin.stats()
+            print(f"Measuring {args.duration:.0f}s at {args.rate:.0f} req/s offered...")
+            endpoints, elapsed = asyncio.run(run_load(
+                base_url, words, args.rate, args.duration, args.autocomplete_ratio,
+                args.zipf, args.seed, args.accept_encoding,
+            ))
+            s3_after = standin.stats()
+            rss_mb, peak_rss_mb = process_memory_mb(server.pid)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+            standin.stop()
+
+    total_requests = sum(e["requests"] for e in endpoints.values())
+    results = {
+        "config": {
+            "rows": args.rows, "rate": args.rate, "duration": args.duration, "zipf": args.zipf,
+            "autocomplete_ratio": args.autocomplete_ratio, "s3_latency_ms": args.s3_latency_ms,
+            "s3_jitter_ms": args.s3_jitter_ms, "s3_tail_ratio": args.s3_tail_ratio,
+            "workers": args.workers, "in_memory": args.in_memory,
+        },
+        "startup_seconds": startup_seconds,
+        "elapsed_seconds": elapsed,
+        "endpoints": endpoints,
+        "s3_gets_per_request": (s3_after["gets"] - s3_before["gets"]) / total_requests if total_requests else 0.0,
+        "rss_mb": rss_mb,
+        "peak_rss_mb": peak_rss_mb,
+    }
+
+    print(f"\nServer startup: {startup_seconds:.1f}s")
+    for endpoint, r in endpoints.items():
+        if r["p50_ms"] is None:
+            print(f"  /{endpoint:<13} no successful requests ({r['errors']} errors)")
+            continue
+        print(f"  /{endpoint:<13} {r['throughput']:>8,.0f} req/s  p50 {r['p50_ms']:>7.1f}ms  "
+              f"p95 {r['p95_ms']:>7.1f}ms  p99 {r['p99_ms']:>7.1f}ms  errors {r['errors']}")
+    print(f"  S3 GETs/request: {results['s3_gets_per_request']:.3f}")
+    if rss_mb is not None:
+        print(f"  Server RSS: {rss_mb:.0f} MB (peak {peak_rss_mb:.0f} MB)")
+
+    write_results(args.output, results)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        write_results(args.baseline, results)
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}; run with --save-baseline first")
+            sys.exit(1)
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        failures = check_regressions(results, baseline, args.tolerance)
+        if failures:
+            print(f"\n✗ Regressions (tolerance {args.tolerance:.0%}):")
+            for failure in failures:
+                print(f"  - {failure}")
+            sys.exit(1)
+        print(f"\n✓ No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
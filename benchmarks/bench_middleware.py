@@ -0,0 +1,79 @@
+'''
+Benchmark: per-request middleware overhead.
+
+Serves the same trivial JSON route through:
+  1. none          - no middleware (baseline)
+  2. decorators    - the former `add_request_id` and `add_process_time_header`
+                     `@app.middleware("http")` functions (BaseHTTPMiddleware)
+  3. pure ASGI     - RequestContextMiddleware (src/middleware)
+
+and reports the overhead of 2 and 3 over the baseline in µs of CPU per request.
+
+Usage:
+    python benchmarks/bench_middleware.py
+    python benchmarks/bench_middleware.py --requests 20000 --output middleware.json
+'''
+
+import argparse
+import time
+import uuid
+
+from common import call_asgi, measure, write_results
+
+
+def build_app(mode):
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse
+    from src.middleware import RequestContextMiddleware
+
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping(request: Request):
+        return JSONResponse({"status": "success", "request_id": getattr(request.state, "request_id", None)})
+
+    if mode == "decorators":
+        @app.middleware("http")
+        async def add_request_id(request: Request, call_next):
+            request_id = request.headers.get("X-Request-ID")
+            if not request_id:
+                request_id = f"req_{uuid.uuid4().hex[:16]}"
+            request.state.request_id = request_id
+            response = await call_next(request)
+            response.headers["X-Request-ID"] = request_id
+            return response
+
+        @app.middleware("http")
+        async def add_process_time_header(request: Request, call_next):
+            start_time = time.time()
+            response = await call_next(request)
+            process_time = time.time() - start_time
+            response.headers["X-Process-Time"] = f"{process_time:.4f}"
+            return response
+    elif mode == "asgi":
+        app.add_middleware(RequestContextMiddleware)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Middleware overhead benchmark")
+    parser.add_argument("--requests", type=int, default=10000, help="Requests per scenario (default: 10000)")
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    print(f"{args.requests:,} requests per scenario")
+    results = []
+    for mode, label in (("none", "no middleware"), ("decorators", "2x @app.middleware"), ("asgi", "RequestContextMiddleware")):
+        app = build_app(mode)
+        results.append(measure(label, args.requests, lambda app=app: call_asgi(app, "/ping")))
+
+    baseline = results[0]["cpu_us_per_request"]
+    for result in results[1:]:
+        result["overhead_us_per_request"] = result["cpu_us_per_request"] - baseline
+        print(f"  {result['label']:<40} +{result['overhead_us_per_request']:,.1f} µs/req over baseline")
+
+    write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
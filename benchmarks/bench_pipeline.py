@@ -0,0 +1,250 @@
+'''
+Benchmark: build pipeline wall-clock time, build then upload vs streaming.
+
+Both build scripts run against the local S3 stand-in, whose upload bandwidth
+is capped like a network link, on a synthetic CSV (see bench_build.py):
+
+full build (scripts/build_wikidict_full.py)
+- sequential  sort into local data.bin + index.json, then
+              `s3_client.upload_file` each (the previous flow)
+- streaming   `build_and_upload`: the merge writes into multipart uploads,
+              parts upload while later rows are merged
+
+incremental update (scripts/build_wikidict.py), on the full build's output
+and a changelog updating `--changelog-ratio` of the rows and adding as many
+- sequential  download data file, index and changelog, merge into local
+              files, upload both (the previous flow)
+- streaming   `build_updated_wikidict`: inputs read from S3 and outputs
+              uploaded while the merge runs
+- delta       `build_delta`: only the changelog is read, published as a delta
+              segment next to the base (the default mode)
+- compact     `build_compacted_wikidict`: fold that delta into a new base, as
+              the periodic compaction does
+
+Reported per run: merge, transfer and total seconds and the local disk the
+pipeline used for data and index files. Streamed objects are compared with
+the sequential ones.
+
+Usage:
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --sizes 512 --upload-mbps 50 --part-size-mb 8 --output pipeline.json
+'''
+
+import argparse
+import csv
+import filecmp
+import json
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from bench_build import prepare_csv
+from common import write_results
+from s3_standin import S3StandIn
+
+BUCKET = "benchmark"
+
+
+def full_sequential(build, input_csv, args, tmp_dir):
+    """Previous full-build flow: build local files, then upload them."""
+    data_file = os.path.join(tmp_dir, "data.bin")
+    index_file = os.path.join(tmp_dir, "index.json")
+    start = time.perf_counter()
+    with open(data_file, "wb", buffering=build.SORT_IO_BUFFER) as data_out, \
+         open(index_file, "w", encoding="utf-8", buffering=build.SORT_IO_BUFFER) as index_out:
+        build.build_sorted_data(str(input_csv), data_out, index_out, args.chunk_rows, args.workers)
+    built = time.perf_counter()
+    build.s3_client.upload_file(data_file, BUCKET, "sequential/data.bin")
+    build.s3_client.upload_file(index_file, BUCKET, "sequential/index.json")
+    uploaded = time.perf_counter()
+    local_bytes = os.path.getsize(data_file) + os.path.getsize(index_file)
+    return {"merge": built - start, "transfer": uploaded - built, "total": uploaded - start,
+            "local_bytes": local_bytes}, ("sequential/data.bin", "sequential/index.json")
+
+
+def full_streaming(build, input_csv, args, tmp_dir):
+    """build_and_upload: merge straight into multipart uploads."""
+    start = time.perf_counter()
+    data_key, index_key, _ = build.build_and_upload(
+        str(input_csv), args.chunk_rows, args.workers,
+        part_size=int(args.part_size_mb * 1024 * 1024), max_in_flight=args.concurrency)
+    total = time.perf_counter() - start
+    return {"merge": total, "transfer": 0.0, "total": total, "local_bytes": 0}, (data_key, index_key)
+
+
+def write_changelog(bucket_dir, index_key, ratio, seed):
+    """Sorted changelog CSV in the bucket, updating `ratio` of the rows and adding as many."""
+    with open(os.path.join(bucket_dir, index_key), "r", encoding="utf-8") as f:
+        titles = list(json.load(f))
+    rng = random.Random(seed)
+    count = max(1, int(len(titles) * ratio))
+    value = " ".join(rng.choice(("lorem", "ipsum", "dolor", "sit", "amet")) for _ in range(1600))
+    rows = [(title, f"updated {value}") for title in rng.sample(titles, count)]
+    rows += [(f"{title} {seed}", f"added {value}") for title in rng.sample(titles, count)]
+    rows.sort(key=lambda row: row[0].lower())
+
+    changelog_key = f"changelog/changelog-{seed}.csv"
+    os.makedirs(os.path.join(bucket_dir, "changelog"), exist_ok=True)
+    with open(os.path.join(bucket_dir, changelog_key), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["title", "value"])
+        writer.writerows(rows)
+    return changelog_key
+
+
+def update_sequential(update, manifest, args, tmp_dir):
+    """Previous incremental flow: download, merge into local files, upload."""
+    existing_file = os.path.join(tmp_dir, "existing.bin")
+    changelog_file = os.path.join(tmp_dir, "changelog.csv")
+    data_file = os.path.join(tmp_dir, "data.bin")
+    index_file = os.path.join(tmp_dir, "index.json")
+
+    start = time.perf_counter()
+    update.s3_client.download_file(BUCKET, manifest["file_path"], existing_file)
+    update.s3_client.download_file(BUCKET, manifest["index_file_path"], os.path.join(tmp_dir, "existing.json"))
+    update.s3_client.download_file(BUCKET, manifest["changelog_file_path"], changelog_file)
+    downloaded = time.perf_counter()
+    with open(existing_file, "rb") as existing, open(changelog_file, "r", encoding="utf-8") as changelog, \
+         open(data_file, "wb") as data_out, open(index_file, "w", encoding="utf-8") as index_out:
+        update.update_wikidict(existing, changelog, data_out, index_out)
+    built = time.perf_counter()
+    update.s3_client.upload_file(data_file, BUCKET, "sequential-update/data.bin")
+    update.s3_client.upload_file(index_file, BUCKET, "sequential-update/index.json")
+    uploaded = time.perf_counter()
+
+    local_bytes = sum(os.path.getsize(os.path.join(tmp_dir, name)) for name in os.listdir(tmp_dir))
+    return {"merge": built - downloaded, "transfer": (downloaded - start) + (uploaded - built),
+            "total": uploaded - start, "local_bytes": local_bytes}, \
+        ("sequential-update/data.bin", "sequential-update/index.json")
+
+
+def update_streaming(update, manifest, args, tmp_dir):
+    """build_updated_wikidict: stream from S3, merge, stream to S3."""
+    start = time.perf_counter()
+    update.build_updated_wikidict(dict(manifest), part_size=int(args.part_size_mb * 1024 * 1024),
+                                  max_in_flight=args.concurrency)
+    total = time.perf_counter() - start
+    published = update.load_manifest_from_s3()
+    return {"merge": total, "transfer": 0.0, "total": total, "local_bytes": 0}, \
+        (published["file_path"], published["index_file_path"])
+
+
+def update_delta(update, manifest, args, tmp_dir):
+    """build_delta: publish the changelog as a delta segment; the base is not read."""
+    start = time.perf_counter()
+    update.build_delta(dict(manifest), part_size=int(args.part_size_mb * 1024 * 1024),
+                       max_in_flight=args.concurrency)
+    total = time.perf_counter() - start
+    delta = update.load_manifest_from_s3()["deltas"][-1]
+    return {"merge": total, "transfer": 0.0, "total": total, "local_bytes": 0}, \
+        (delta["file_path"], delta["index_file_path"])
+
+
+def update_compact(update, args, tmp_dir):
+    """build_compacted_wikidict: merge the base and the published delta into a new base."""
+    start = time.perf_counter()
+    update.build_compacted_wikidict(update.load_manifest_from_s3(), part_size=int(args.part_size_mb * 1024 * 1024),
+                                    max_in_flight=args.concurrency)
+    total = time.perf_counter() - start
+    published = update.load_manifest_from_s3()
+    return {"merge": total, "transfer": 0.0, "total": total, "local_bytes": 0}, \
+        (published["file_path"], published["index_file_path"])
+
+
+def run(results, work_dir, input_mb, pipeline, mode, runner, *run_args):
+    """One timed run; prints and records it, returns the uploaded (data, index) keys."""
+    tmp_dir = tempfile.mkdtemp(prefix="wikidict-pipeline-", dir=work_dir)
+    try:
+        seconds, keys = runner(*run_args, tmp_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    results["runs"].append({"input_mb": input_mb, "pipeline": pipeline, "mode": mode, **seconds})
+    print(f"  {input_mb:>6,.0f}MB {pipeline:>7} {mode:>10} {seconds['merge']:>8.1f} {seconds['transfer']:>10.1f}"
+          f" {seconds['total']:>8.1f} {seconds['local_bytes'] / 1024 ** 2:>9,.0f}")
+    return keys
+
+
+def check_same(bucket_dir, streamed_keys, sequential_keys):
+    for streamed, reference in zip(streamed_keys, sequential_keys):
+        if not filecmp.cmp(os.path.join(bucket_dir, streamed), os.path.join(bucket_dir, reference), shallow=False):
+            raise AssertionError(f"Streamed {streamed} differs from the sequential {reference}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build pipeline time: build then upload vs streaming")
+    parser.add_argument("--sizes", default="128,512", help="Comma-separated input sizes in MB (default: 128,512)")
+    parser.add_argument("--upload-mbps", type=float, default=100.0,
+                        help="Upload bandwidth of the S3 stand-in in MB/s (default: 100)")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="S3 request latency (default: 20)")
+    parser.add_argument("--part-size-mb", type=float, default=16.0, help="Streaming part size in MB (default: 16)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Streaming parts in flight (default: 4)")
+    parser.add_argument("--changelog-ratio", type=float, default=0.05,
+                        help="Share of rows the update changes, and adds (default: 0.05)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Sort worker processes (default: CPU count)")
+    parser.add_argument("--chunk-rows", type=int, default=25000, help="Rows per sorted chunk (default: 25000)")
+    parser.add_argument("--seed", type=int, default=42, help="Dataset seed (default: 42)")
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "wikidict-bench"),
+                        help="Where datasets are generated and cached")
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    os.makedirs(args.work_dir, exist_ok=True)
+    bucket_dir = tempfile.mkdtemp(prefix="wikidict-pipeline-s3-", dir=args.work_dir)
+    standin = S3StandIn(root_dir=bucket_dir, bucket=BUCKET, latency_ms=args.latency_ms,
+                        upload_mb_per_s=args.upload_mbps).start()
+    # The build scripts create their S3 client at import time
+    os.environ.update({
+        "AWS_ENDPOINT_URL": standin.endpoint_url,
+        "AWS_BUCKET_NAME": BUCKET,
+        "AWS_ACCESS_KEY_ID": "benchmark",
+        "AWS_SECRET_ACCESS_KEY": "benchmark",
+        "AWS_DEFAULT_REGION": "us-east-1",
+    })
+    import build_wikidict as update
+    import build_wikidict_full as build
+    for name in (build.__name__, update.__name__, "botocore"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    # Synthetic titles differing only in case trip the update's index-size warning
+    logging.getLogger(update.__name__).setLevel(logging.ERROR)
+
+    results = {"upload_mbps": args.upload_mbps, "latency_ms": args.latency_ms, "part_size_mb": args.part_size_mb,
+               "concurrency": args.concurrency, "changelog_ratio": args.changelog_ratio,
+               "workers": args.workers, "runs": []}
+    print(f"S3 stand-in: {args.upload_mbps:.0f} MB/s upload, {args.latency_ms:.0f} ms latency; "
+          f"{args.workers} sort worker(s); streaming {args.part_size_mb:.0f} MB parts x {args.concurrency}")
+    print(f"  {'size':>8} {'build':>7} {'mode':>10} {'merge s':>8} {'transfer s':>10} {'total s':>8} {'local MB':>9}")
+    try:
+        for size_mb in [int(s) for s in args.sizes.split(",")]:
+            input_csv = prepare_csv(args.work_dir, size_mb, args.seed)
+            input_mb = input_csv.stat().st_size / (1024 ** 2)
+
+            sequential_keys = run(results, args.work_dir, input_mb, "full", "sequential", full_sequential,
+                                  build, input_csv, args)
+            streamed_keys = run(results, args.work_dir, input_mb, "full", "streaming", full_streaming,
+                                build, input_csv, args)
+            check_same(bucket_dir, streamed_keys, sequential_keys)
+
+            manifest = {"file_path": sequential_keys[0], "index_file_path": sequential_keys[1],
+                        "changelog_file_path": write_changelog(bucket_dir, sequential_keys[1],
+                                                               args.changelog_ratio, args.seed)}
+            sequential_keys = run(results, args.work_dir, input_mb, "update", "sequential", update_sequential,
+                                  update, manifest, args)
+            streamed_keys = run(results, args.work_dir, input_mb, "update", "streaming", update_streaming,
+                                update, manifest, args)
+            check_same(bucket_dir, streamed_keys, sequential_keys)
+            run(results, args.work_dir, input_mb, "update", "delta", update_delta, update, manifest, args)
+            run(results, args.work_dir, input_mb, "update", "compact", update_compact, update, args)
+    finally:
+        standin.stop()
+        shutil.rmtree(bucket_dir, ignore_errors=True)
+
+    results["s3"] = standin.stats()
+    write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
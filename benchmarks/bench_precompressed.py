@@ -0,0 +1,65 @@
+'''
+Benchmark: precompressed /search bodies vs GZipMiddleware recompression.
+
+Compares, for the same cached meaning:
+  1. identity      - no Accept-Encoding, plain JSON (no compression work)
+  2. middleware    - precompression disabled, GZipMiddleware compresses every response
+  3. precompressed - cached gzip prefix + spliced per-request tail
+  4. precompressed brotli (only if the `brotli` package is installed)
+
+Usage:
+    python benchmarks/bench_precompressed.py
+    python benchmarks/bench_precompressed.py --requests 20000 --meaning-size 12000 --output precompressed.json
+'''
+
+import argparse
+import gzip
+
+from common import StandInIndexLoader, call_asgi, make_meaning, measure, write_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompressed response benchmark")
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per scenario (default: 5000)")
+    parser.add_argument("--meaning-size", type=int, default=8000, help="Meaning size in bytes (default: 8000)")
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    import main as server
+    import src.config.load_indexes as load_indexes
+    import src.controller.search_controller as search_controller
+    from src.config import app_settings
+    from src.utils.compression import brotli
+
+    meaning = make_meaning(args.meaning_size)
+    load_indexes._index_loader = StandInIndexLoader()
+    search_controller.read_meaning = lambda offset, length, **kwargs: meaning
+
+    path = f"{app_settings.api_prefix}/search"
+    params = {"word": "word000042"}
+
+    def request(accept_encoding):
+        headers = {"Accept-Encoding": accept_encoding} if accept_encoding else {}
+        return lambda: call_asgi(server.app, path, params, headers)
+
+    # Sanity check: precompressed bodies decode to valid JSON
+    import asyncio
+    _, _, body = asyncio.run(call_asgi(server.app, path, params, {"Accept-Encoding": "gzip"}))
+    assert gzip.decompress(body).startswith(b'{"status":"success"')
+
+    print(f"Meaning size: {args.meaning_size:,} bytes, {args.requests:,} requests per scenario")
+    results = [measure("identity (no compression)", args.requests, request(None))]
+
+    app_settings.compression.enabled = False
+    results.append(measure("gzip via GZipMiddleware", args.requests, request("gzip")))
+
+    app_settings.compression.enabled = True
+    results.append(measure("gzip precompressed passthrough", args.requests, request("gzip")))
+    if brotli is not None:
+        results.append(measure("br precompressed passthrough", args.requests, request("br")))
+
+    write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
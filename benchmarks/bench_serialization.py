@@ -0,0 +1,110 @@
+'''
+Benchmark: fast JSON responses vs validated dict responses.
+
+Compares, for a cached meaning and identity encoding (no compression):
+  1. validated - the handler returns a dict (AutocompleteItem models for
+     /autocomplete); FastAPI validates it against response_model and
+     serializes it (how the routes worked before FastJSONResponse)
+  2. fast      - the real routes: pre-shaped dicts encoded by FastJSONResponse
+     (orjson when installed)
+
+Requests/sec are single-threaded, i.e. per core.
+
+Usage:
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --requests 20000 --output serialization.json
+'''
+
+import argparse
+from datetime import datetime, timezone
+
+from common import StandInIndexLoader, call_asgi, make_meaning, measure, write_results
+
+
+def build_validated_router(meaning):
+    """Same routes and response models, returning dicts through FastAPI validation."""
+    from fastapi import APIRouter, Query, Request
+    from src.config import get_index_loader
+    from src.models import SuccessResponse, SearchMeaning, AutocompleteItem
+
+    router = APIRouter()
+
+    @router.get("/search", response_model=SuccessResponse[SearchMeaning])
+    async def search(request: Request, word: str = Query(..., min_length=1, max_length=50)):
+        result = get_index_loader().get_value_by_key(word)
+        return {
+            "status": "success",
+            "data": {"word": word, "meaning": meaning},
+            "result_count": 1,
+            "message": "Word found successfully",
+            "request_id": None,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        } if result else None
+
+    @router.get("/autocomplete", response_model=SuccessResponse[list[AutocompleteItem]])
+    async def autocomplete(request: Request, q: str = Query(...), limit: int = Query(default=10, ge=1, le=50)):
+        result = [
+            AutocompleteItem(word=word, highlighted=f"<b>{word[:len(q)]}</b>{word[len(q):]}")
+            for word in get_index_loader().autosuggest_keys(q, max_suggestions=limit)
+        ]
+        return {
+            "status": "success",
+            "data": result,
+            "result_count": len(result),
+            "message": f"{len(result)} suggestions found",
+            "request_id": None,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+
+    return router
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response serialization benchmark")
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per scenario (default: 5000)")
+    parser.add_argument("--meaning-size", type=int, default=8000, help="Meaning size in bytes (default: 8000)")
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    import main as server
+    import src.config.load_indexes as load_indexes
+    import src.controller.search_controller as search_controller
+    from src.config import app_settings
+    from src.utils.serialization import orjson
+
+    meaning = make_meaning(args.meaning_size)
+    load_indexes._index_loader = StandInIndexLoader()
+    search_controller.read_meaning = lambda offset, length, **kwargs: meaning
+    # Mounted on the real app so both variants pass through the same middleware
+    server.app.include_router(build_validated_router(meaning), prefix="/bench-validated")
+    prefix = app_settings.api_prefix
+    validated = f"{prefix}/bench-validated"
+    search_params = {"word": "word000042"}
+    autocomplete_params = {"q": "word0001", "limit": 10}
+
+    # Sanity check: both variants answer with the same JSON shape
+    import asyncio
+    import json
+    for path, params in (("search", search_params), ("autocomplete", autocomplete_params)):
+        fast = asyncio.run(call_asgi(server.app, f"{prefix}/{path}", params))
+        slow = asyncio.run(call_asgi(server.app, f"{validated}/{path}", params))
+        assert fast[0] == slow[0] == 200, (fast[0], slow[0])
+        assert list(json.loads(fast[2])) == list(json.loads(slow[2]))
+
+    print(f"Encoder: {'orjson' if orjson is not None else 'json (stdlib)'}, "
+          f"meaning size: {args.meaning_size:,} bytes, {args.requests:,} requests per scenario")
+    results = [
+        measure("/search validated", args.requests,
+                lambda: call_asgi(server.app, f"{validated}/search", search_params)),
+        measure("/search fast", args.requests,
+                lambda: call_asgi(server.app, f"{prefix}/search", search_params)),
+        measure("/autocomplete validated", args.requests,
+                lambda: call_asgi(server.app, f"{validated}/autocomplete", autocomplete_params)),
+        measure("/autocomplete fast", args.requests,
+                lambda: call_asgi(server.app, f"{prefix}/autocomplete", autocomplete_params)),
+    ]
+    write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
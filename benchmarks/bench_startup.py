@@ -0,0 +1,114 @@
+'''
+Benchmark: import time and time to first byte of a fresh server.
+
+Each measurement runs in a new interpreter, as a new pod or test process would:
+
+- import time of `src.config`, `src.utils`, `src.storage` and `main`
+- time from `uvicorn main:app` spawn to the first 200 from /health (live) and
+  from /ready (index loaded and storage verified), with the local storage
+  backend on a generated dataset (no S3 latency)
+
+The server itself logs a per-phase breakdown ("Startup phases") at startup.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 10 --rows 20000 --output startup.json
+'''
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import yaml
+
+from bench_load import free_port, prepare_dataset
+from common import PROJECT_ROOT, write_results
+
+MODULES = ("src.config", "src.storage", "src.utils", "main")
+# Timing goes to stderr: modules may print to stdout while importing
+IMPORT_SNIPPET = "import sys, time; t = time.perf_counter(); import {module}; sys.stderr.write(repr(time.perf_counter() - t))"
+
+
+def import_seconds(module):
+    """Import time of `module` in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET.format(module=module)],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    return float(result.stderr.strip().splitlines()[-1])
+
+
+def time_to_first_byte(config_path, port):
+    """Seconds from spawning uvicorn to the first 200 from /health, then from /ready."""
+    env = dict(os.environ, WIKIDICT_CONFIG=str(config_path))
+    command = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+               "--port", str(port), "--log-level", "warning"]
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=PROJECT_ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    timings = []
+    try:
+        for probe in ("health", "ready"):
+            while True:
+                if process.poll() is not None:
+                    raise RuntimeError("Server exited during startup")
+                try:
+                    if httpx.get(f"http://127.0.0.1:{port}/api/v1/{probe}", timeout=1).status_code == 200:
+                        timings.append(time.perf_counter() - start)
+                        break
+                except httpx.HTTPError:
+                    pass
+                time.sleep(0.01)
+        return timings
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import and startup time benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement (default: 5)")
+    parser.add_argument("--rows", type=int, default=20000, help="Dataset rows for the server (default: 20000)")
+    parser.add_argument("--seed", type=int, default=42, help="Dataset seed (default: 42)")
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "wikidict-bench"),
+                        help="Where datasets are generated and cached")
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    results = {"runs": args.runs, "imports": {}}
+    print(f"Import time (median of {args.runs} fresh interpreters):")
+    for module in MODULES:
+        samples = [import_seconds(module) for _ in range(args.runs)]
+        results["imports"][module] = statistics.median(samples)
+        print(f"  {module:<12} {statistics.median(samples) * 1000:>8.1f} ms")
+
+    os.makedirs(args.work_dir, exist_ok=True)
+    bucket_dir = prepare_dataset(args.work_dir, args.rows, args.seed)
+    with open(PROJECT_ROOT / "config.yaml", "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    config["debug"] = False
+    # Data file left on disk: loading it into memory would dominate the measurement
+    config.setdefault("storage", {}).update(backend="local", local_root=str(bucket_dir), in_memory_max_bytes=0)
+
+    with tempfile.TemporaryDirectory(prefix="wikidict-startup-") as tmp:
+        config_path = os.path.join(tmp, "config.yaml")
+        with open(config_path, "w", encoding="utf-8") as f:
+            yaml.safe_dump(config, f)
+        samples = [time_to_first_byte(config_path, free_port()) for _ in range(args.runs)]
+
+    results["time_to_first_byte"] = statistics.median(live for live, _ in samples)
+    results["time_to_ready"] = statistics.median(ready for _, ready in samples)
+    results["rows"] = args.rows
+    print(f"\nTime to first byte ({args.rows:,} rows, local backend, median of {args.runs}):"
+          f" /health {results['time_to_first_byte'] * 1000:,.0f} ms,"
+          f" /ready {results['time_to_ready'] * 1000:,.0f} ms")
+    write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
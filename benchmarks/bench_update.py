@@ -0,0 +1,141 @@
+'''
+Benchmark: incremental update merge throughput (rows/s).
+
+`update_wikidict` from scripts/build_wikidict.py merges an existing binary-v1
+data file with a sorted changelog CSV into a new data file and index. This
+runs it on local files, so only the merge engine is measured (no S3).
+
+For each size a base data file of about `size_mb` MB is generated once into
+`--work-dir`: Wikipedia-like titles (see bench_index.py) sorted
+case-insensitively, values of about `--value-bytes`. Its changelog updates
+`--changelog-ratio` of the titles and adds as many new ones; a few values
+hold commas, quotes and newlines. Reported per size: seconds, rows/s and MB/s
+of output, and SHA-256 digests of the data file and index, so runs on
+different commits can be checked for byte-identical output.
+
+Usage:
+    python benchmarks/bench_update.py
+    python benchmarks/bench_update.py --sizes 2048 --value-bytes 400 --output update.json
+'''
+
+import argparse
+import csv
+import hashlib
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_index import generate_keys
+from common import PROJECT_ROOT, write_results
+
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+
+WORDS = ("lorem", "ipsum", "dolor", "sit", "amet,", "consectetur", "adipiscing", "elit.",
+         "sed", "do", "eiusmod", "tempor", "incididunt", "ut", "labore", "et", "dolore")
+
+
+def prepare_inputs(work_dir, size_mb, value_bytes, ratio, seed):
+    """Base data file and changelog CSV of about `size_mb` MB (reused when present)."""
+    from record_format import RecordWriter
+
+    base_dir = Path(work_dir) / f"update-{size_mb}mb-{value_bytes}b-{ratio}-{seed}"
+    data_path = base_dir / "existing.bin"
+    changelog_path = base_dir / "changelog.csv"
+    if changelog_path.exists():
+        return data_path, changelog_path
+
+    rng = random.Random(seed)
+    rows = size_mb * 1024 * 1024 // (value_bytes + 40)
+    print(f"Generating {rows:,} rows ({size_mb} MB)...")
+    titles = generate_keys(rows, seed)
+    text = " ".join(rng.choice(WORDS) for _ in range(value_bytes * 2))
+
+    def value():
+        start = rng.randrange(len(text) // 2)
+        return text[start:start + rng.randint(value_bytes // 2, value_bytes * 3 // 2)]
+
+    base_dir.mkdir(parents=True, exist_ok=True)
+    with open(data_path, "wb", buffering=1024 * 1024) as f:
+        writer = RecordWriter(f)
+        for title in titles:
+            writer.write(title, value())
+
+    count = max(1, int(rows * ratio))
+    existing = set(titles)
+    changes = [(title, f"updated {value()}") for title in rng.sample(titles, count)]
+    for title in rng.sample(titles, count):
+        added = f"{title} {seed}"
+        if added not in existing:
+            changes.append((added, f'added "{title}",\nnew {value()}'))
+    changes.sort(key=lambda row: row[0].lower())
+    with open(changelog_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["title", "value"])
+        writer.writerows(changes)
+    return data_path, changelog_path
+
+
+def sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental update merge throughput")
+    parser.add_argument("--sizes", default="256,2048", help="Comma-separated base sizes in MB (default: 256,2048)")
+    parser.add_argument("--value-bytes", type=int, default=400, help="Average value size (default: 400)")
+    parser.add_argument("--changelog-ratio", type=float, default=0.05,
+                        help="Share of titles the changelog updates, and adds (default: 0.05)")
+    parser.add_argument("--seed", type=int, default=42, help="Dataset seed (default: 42)")
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "wikidict-bench"),
+                        help="Where inputs are generated and cached")
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    import build_wikidict as update
+    # Synthetic titles differing only in case trip the update's index-size warning
+    logging.getLogger(update.__name__).setLevel(logging.ERROR)
+
+    results = {"value_bytes": args.value_bytes, "changelog_ratio": args.changelog_ratio, "runs": []}
+    print(f"  {'base':>8} {'rows':>11} {'seconds':>8} {'rows/s':>9} {'MB/s':>6}  data / index sha256")
+    for size_mb in [int(s) for s in args.sizes.split(",")]:
+        data_path, changelog_path = prepare_inputs(args.work_dir, size_mb, args.value_bytes,
+                                                   args.changelog_ratio, args.seed)
+        tmp_dir = tempfile.mkdtemp(prefix="wikidict-update-", dir=args.work_dir)
+        output_path = os.path.join(tmp_dir, "data.bin")
+        index_path = os.path.join(tmp_dir, "index.json")
+        try:
+            start = time.perf_counter()
+            with open(data_path, "rb") as existing, \
+                 open(changelog_path, "r", encoding="utf-8") as changelog, \
+                 open(output_path, "wb") as output, \
+                 open(index_path, "w", encoding="utf-8") as index:
+                output_size = update.update_wikidict(existing, changelog, output, index)
+            seconds = time.perf_counter() - start
+            with open(index_path, "rb") as f:
+                # One entry per title: its `"offset"` line
+                rows = sum(block.count(b'"offset"') for block in iter(lambda: f.read(1024 * 1024), b""))
+            digests = (sha256(output_path), sha256(index_path))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        base_mb = data_path.stat().st_size / (1024 ** 2)
+        results["runs"].append({"base_mb": base_mb, "rows": rows, "seconds": seconds, "rows_per_sec": rows / seconds,
+                                "output_mb_per_sec": output_size / (1024 ** 2) / seconds,
+                                "data_sha256": digests[0], "index_sha256": digests[1]})
+        print(f"  {base_mb:>6,.0f}MB {rows:>11,} {seconds:>8.1f} {rows / seconds:>9,.0f}"
+              f" {output_size / (1024 ** 2) / seconds:>6.1f}  {digests[0][:12]} / {digests[1][:12]}")
+
+    write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
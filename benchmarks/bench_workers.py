@@ -0,0 +1,174 @@
+'''
+Benchmark: memory of the server as the number of workers grows.
+
+Each configuration serves the same synthetic index (see bench_index.py) from
+the local storage backend; the data file is not involved. For every worker
+count the server is started, driven with autocomplete and search requests over
+fresh connections (so every worker takes traffic) and then measured across
+its whole process tree:
+
+- RSS summed over processes (shared pages counted once per process)
+- PSS summed over processes (shared pages split between them: real usage)
+- private memory summed over processes (pages copied or allocated per worker)
+
+Modes:
+    uvicorn         `uvicorn main:app --workers N`: every worker loads the index
+    prefork-dict    `python -m src.server`, index loaded once as a dict
+    prefork-packed  `python -m src.server`, index loaded once in flat buffers
+
+Usage:
+    python benchmarks/bench_workers.py
+    python benchmarks/bench_workers.py --keys 1M --workers 1,2,4,8 --output workers.json
+'''
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import yaml
+
+from bench_index import format_size, generate_keys, parse_size, prepare_index
+from bench_load import free_port
+from common import PROJECT_ROOT, process_memory_mb, process_pss_mb, write_results
+
+MODES = ("uvicorn", "prefork-dict", "prefork-packed")
+
+
+def process_tree(root_pid):
+    """`root_pid` and all of its descendants."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                # The command name may contain spaces; fields resume after ')'
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    pids, pending = [], [root_pid]
+    while pending:
+        pid = pending.pop()
+        pids.append(pid)
+        pending.extend(children.get(pid, []))
+    return pids
+
+
+def tree_memory_mb(root_pid):
+    totals = {"processes": 0, "rss_mb": 0.0, "pss_mb": 0.0, "private_mb": 0.0}
+    for pid in process_tree(root_pid):
+        rss, _ = process_memory_mb(pid)
+        pss, private = process_pss_mb(pid)
+        if rss is None or pss is None:
+            continue
+        totals["processes"] += 1
+        totals["rss_mb"] += rss
+        totals["pss_mb"] += pss
+        totals["private_mb"] += private
+    return totals
+
+
+def write_config(path, bucket_dir, mode, workers):
+    with open(PROJECT_ROOT / "config.yaml", "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    config.update(debug=False, workers=workers)
+    config["index"] = {"layout": "packed" if mode == "prefork-packed" else "dict"}
+    config.setdefault("storage", {}).update(backend="local", local_root=str(bucket_dir), in_memory_max_bytes=0)
+    # The response caches would grow with the traffic and blur the comparison
+    config.setdefault("cache", {}).update(enabled=False, response_enabled=False)
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(config, f)
+
+
+def start(mode, workers, config_path, port, log_path):
+    env = dict(os.environ, WIKIDICT_CONFIG=str(config_path))
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    if mode == "uvicorn":
+        command = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+                   "--port", str(port), "--log-level", "warning"]
+        if workers > 1:
+            command += ["--workers", str(workers)]
+    else:
+        command = [sys.executable, "-m", "src.server", "--host", "127.0.0.1", "--port", str(port),
+                   "--workers", str(workers), "--log-level", "warning"]
+
+    with open(log_path, "w") as log_file:
+        process = subprocess.Popen(command, cwd=PROJECT_ROOT, env=env, stdout=log_file, stderr=subprocess.STDOUT)
+
+    # Every worker prints this line once its lifespan has run
+    deadline = time.monotonic() + 600
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited during startup (see {log_path})")
+        with open(log_path, "r", encoding="utf-8", errors="replace") as f:
+            if f.read().count("Server ready with") >= workers:
+                return process
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Server did not start within 10 minutes (see {log_path})")
+
+
+def drive(port, words, requests):
+    """Autocomplete and search requests, one connection each so they spread over workers."""
+    base = f"http://127.0.0.1:{port}/api/v1"
+    for i in range(requests):
+        word = words[i % len(words)]
+        if i % 2:
+            httpx.get(f"{base}/autocomplete", params={"q": word[:3]}, timeout=10)
+        else:
+            httpx.get(f"{base}/search", params={"word": word}, timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server memory vs worker count")
+    parser.add_argument("--keys", default="500k", help="Index size (default: 500k)")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts (default: 1,2,4)")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"Comma-separated modes (default: all of {', '.join(MODES)})")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests sent before measuring (default: 2000)")
+    parser.add_argument("--seed", type=int, default=42, help="Index seed (default: 42)")
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "wikidict-bench"),
+                        help="Where synthetic indexes are generated and cached")
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    num_keys = parse_size(args.keys)
+    os.makedirs(args.work_dir, exist_ok=True)
+    bucket_dir = prepare_index(args.work_dir, num_keys, args.seed)
+    words = generate_keys(min(num_keys, 5000), args.seed + 2)
+
+    results = {"keys": num_keys, "requests": args.requests, "runs": []}
+    print(f"{format_size(num_keys)} keys, {args.requests} requests before measuring")
+    print(f"  {'mode':<15} {'workers':>7} {'procs':>5} {'RSS MB':>9} {'PSS MB':>9} {'private MB':>10} {'PSS/worker':>10}")
+    with tempfile.TemporaryDirectory(prefix="wikidict-workers-") as tmp:
+        config_path = os.path.join(tmp, "config.yaml")
+        log_path = os.path.join(tmp, "server.log")
+        for mode in args.modes.split(","):
+            for workers in [int(w) for w in args.workers.split(",")]:
+                write_config(config_path, bucket_dir, mode, workers)
+                port = free_port()
+                process = start(mode, workers, config_path, port, log_path)
+                try:
+                    drive(port, words, args.requests)
+                    time.sleep(1)
+                    memory = tree_memory_mb(process.pid)
+                finally:
+                    process.terminate()
+                    process.wait()
+
+                memory.update(mode=mode, workers=workers)
+                results["runs"].append(memory)
+                print(f"  {mode:<15} {workers:>7} {memory['processes']:>5} {memory['rss_mb']:>9,.0f}"
+                      f" {memory['pss_mb']:>9,.0f} {memory['private_mb']:>10,.0f}"
+                      f" {memory['pss_mb'] / workers:>10,.0f}")
+
+    write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
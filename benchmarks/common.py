@@ -0,0 +1,179 @@
+'''
+Shared helpers for the SM-WikiDict benchmarks.
+
+The benchmarks drive the ASGI app in-process (no sockets, no HTTP client) so
+the numbers reflect server-side CPU only. S3 and the index are replaced with
+deterministic stand-ins so results are reproducible on a laptop.
+
+Run from the repository root, e.g.:
+    python benchmarks/bench_precompressed.py
+'''
+
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# Settings require AWS variables; benchmarks never talk to AWS.
+for _name, _value in {
+    "AWS_ACCESS_KEY": "benchmark",
+    "AWS_SECRET_KEY": "benchmark",
+    "AWS_REGION": "us-east-1",
+    "AWS_BUCKET_NAME": "benchmark",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+
+def make_meaning(size_bytes=8000, seed=0):
+    """Deterministic meaning text of roughly `size_bytes` bytes."""
+    rng = random.Random(seed)
+    words = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing",
+             "elit", "sed", "do", "eiusmod", "tempor", "incididunt", "labore"]
+    parts = []
+    size = 0
+    while size < size_bytes:
+        word = rng.choice(words)
+        parts.append(word)
+        size += len(word) + 1
+    return " ".join(parts)
+
+
+class StandInIndexLoader:
+    """Minimal IndexLoader replacement backed by a dict of synthetic words."""
+
+    def __init__(self, num_words=1000, file_path="dict/benchmark/data.csv"):
+        self.manifest = {"file_path": file_path, "version": "benchmark", "data_format": "binary-v1"}
+        self.data_format = "binary-v1"
+        self.generation = "benchmark"
+        self.indexes = {}
+        offset = 0
+        for i in range(num_words):
+            self.indexes[f"word{i:06d}"] = {"offset": offset, "length": 8000}
+            offset += 8000
+        self.sorted_keys = list(self.indexes)
+        self.sorted_keys_lower = [k.lower() for k in self.sorted_keys]
+
+    def get_value_by_key(self, key):
+        return self.indexes.get(key)
+
+    def autosuggest_keys(self, query, max_suggestions=10, case_sensitive=False):
+        return [k for k in self.sorted_keys if k.startswith(query)][:max_suggestions]
+
+
+async def call_asgi(app, path, params=None, headers=None):
+    """Send one GET request through an ASGI app and return (status, headers, body)."""
+    raw_headers = [(b"host", b"benchmark")]
+    for name, value in (headers or {}).items():
+        raw_headers.append((name.lower().encode("latin-1"), value.encode("latin-1")))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("latin-1"),
+        "query_string": urlencode(params or {}).encode("latin-1"),
+        "root_path": "",
+        "headers": raw_headers,
+        "client": ("127.0.0.1", 12345),
+        "server": ("benchmark", 80),
+        "state": {},
+    }
+    response = {"status": None, "headers": [], "body": bytearray()}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    await app(scope, receive, send)
+    return response["status"], response["headers"], bytes(response["body"])
+
+
+def measure(label, requests, fn):
+    """
+    Run `fn()` (a coroutine factory) `requests` times and report throughput
+    and CPU time per request.
+    """
+    async def run():
+        for _ in range(requests):
+            await fn()
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(fn())  # warm-up, fills caches
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        loop.run_until_complete(run())
+        cpu = time.process_time() - cpu_start
+        wall = time.perf_counter() - wall_start
+    finally:
+        loop.close()
+
+    result = {
+        "label": label,
+        "requests": requests,
+        "requests_per_sec": requests / wall,
+        "cpu_us_per_request": cpu / requests * 1e6,
+    }
+    print(f"  {label:<40} {result['requests_per_sec']:>10,.0f} req/s"
+          f"  {result['cpu_us_per_request']:>9,.1f} µs CPU/req")
+    return result
+
+
+def process_memory_mb(pid="self"):
+    """Current and peak RSS of a process (Linux /proc; default: this one), in MB."""
+    rss = peak = None
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    rss = int(line.split()[1]) / 1024
+                elif line.startswith("VmHWM:"):
+                    peak = int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return rss, peak
+
+
+def process_pss_mb(pid):
+    """
+    Proportional and private memory of a process (Linux smaps_rollup), in MB.
+
+    PSS divides each shared page between the processes mapping it, so summing
+    PSS over the workers of a pre-fork server counts the shared index once.
+    """
+    values = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                if name in ("Pss", "Private_Clean", "Private_Dirty"):
+                    values[name] = int(rest.split()[0]) / 1024
+    except OSError:
+        return None, None
+    return values.get("Pss"), values.get("Private_Clean", 0) + values.get("Private_Dirty", 0)
+
+
+def write_results(path, results):
+    """Write benchmark results as JSON for comparison across commits."""
+    if not path:
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {path}")
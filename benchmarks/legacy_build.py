@@ -0,0 +1,110 @@
+'''
+The two-pass full build, kept for benchmarks only.
+
+scripts/build_wikidict_full.py used to sort the CSV into a sorted CSV
+(`sort_csv_external`) and then read that back into the binary data file and
+its index (`create_index`). The build now merges straight into the data file
+(`build_sorted_data`); bench_build.py still times the two-pass path against
+it, and bench_load.py builds its dataset with `create_index`.
+
+The chunk sort, merge and record writing are shared with the build script.
+'''
+
+import csv
+import os
+import sys
+import time
+
+from common import PROJECT_ROOT
+
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+
+from build_wikidict_full import (
+    SORT_IO_BUFFER,
+    external_merge_sort,
+    logger,
+    merge_chunk_records,
+    write_data_and_index,
+)
+
+
+def sort_csv_external(input_file, output_file, chunk_size=100000, workers=None):
+    """
+    Sort CSV file using external merge sort (memory-efficient for large files).
+
+    Args:
+        input_file (str): Path to input CSV file
+        output_file (str): Path to output sorted CSV file
+        chunk_size (int): Rows per chunk
+        workers (int): Processes sorting chunks (default: CPU count; 1 sorts in-process)
+
+    Returns:
+        bool: Success status
+    """
+    def merge(chunk_files, header):
+        merge_sorted_chunks(chunk_files, output_file, header)
+        return os.path.getsize(output_file)
+
+    return external_merge_sort(input_file, merge, chunk_size, workers)
+
+
+def csv_field(field):
+    """Quote a UTF-8 field the way csv.writer does by default (QUOTE_MINIMAL)."""
+    if b'"' in field:
+        return b'"' + field.replace(b'"', b'""') + b'"'
+    if b',' in field or b'\n' in field or b'\r' in field:
+        return b'"' + field + b'"'
+    return field
+
+
+def merge_sorted_chunks(chunk_files, output_file, header):
+    """Merge sorted chunks into the sorted CSV file, written as bytes (no decoding)."""
+    total_written = 0
+    with open(output_file, 'wb', buffering=SORT_IO_BUFFER) as outfile:
+        write = outfile.write
+        write(b','.join(csv_field(name.encode('utf-8')) for name in header) + b'\r\n')
+
+        for title, value in merge_chunk_records(chunk_files):
+            write(csv_field(title) + b',' + csv_field(value) + b'\r\n')
+            total_written += 1
+
+            if total_written % 100000 == 0:
+                logger.info(f"  Merged {total_written:,} rows")
+
+    logger.info(f"  Total rows merged: {total_written:,}")
+
+
+def create_index(csv_file_path, data_file_path, index_file_path):
+    """
+    Write the binary data file (binary-v1) and its JSON index from an already
+    sorted CSV.
+
+    Args:
+        csv_file_path (str): Path to sorted CSV file
+        data_file_path (str): Path to output binary data file
+        index_file_path (str): Path to output index JSON file
+
+    Returns:
+        bool: Success status
+    """
+    start_time = time.time()
+
+    logger.info("Creating data file and index...")
+
+    with open(csv_file_path, 'r', encoding='utf-8', newline='') as infile, \
+         open(data_file_path, 'wb', buffering=SORT_IO_BUFFER) as data_out, \
+         open(index_file_path, 'w', encoding='utf-8', buffering=SORT_IO_BUFFER) as index_out:
+        records = ((row['title'].encode('utf-8'), row['value'].encode('utf-8'))
+                   for row in csv.DictReader(infile))
+        row_count, _ = write_data_and_index(records, data_out, index_out)
+
+    index_size_mb = os.path.getsize(index_file_path) / (1024 ** 2)
+    elapsed = time.time() - start_time
+
+    logger.info(f"✓ Index created successfully!")
+    logger.info(f"  Total rows indexed: {row_count:,}")
+    logger.info(f"  Data file size: {os.path.getsize(data_file_path) / (1024 ** 2):.2f} MB")
+    logger.info(f"  Index file size: {index_size_mb:.2f} MB")
+    logger.info(f"  Time taken: {elapsed:.1f} seconds")
+
+    return True
@@ -0,0 +1,324 @@
+'''
+Local S3-compatible stand-in for benchmarks.
+
+Serves objects from a directory over HTTP with the subset of the S3 REST API
+the server uses (path-style GetObject with optional Range, HeadObject) and
+the build scripts use (PutObject, multipart uploads), and injects
+configurable latency and upload bandwidth. Point boto3 at it with
+AWS_ENDPOINT_URL.
+
+    standin = S3StandIn(root_dir="bench-data", bucket="benchmark", latency_ms=15)
+    standin.start()
+    ...
+    print(standin.stats())
+    standin.stop()
+'''
+
+import email.utils
+import os
+import random
+import re
+import shutil
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+RANGE_RE = re.compile(r"bytes=(\d+)-(\d*)")
+PART_NUMBER_RE = re.compile(rb"<PartNumber>(\d+)</PartNumber>")
+UPLOADS_DIR = ".uploads"
+
+NO_SUCH_KEY = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    "<Error><Code>NoSuchKey</Code><Message>The specified key does not exist.</Message></Error>"
+)
+
+
+class S3StandIn:
+    """
+    Args:
+        root_dir: Directory mirroring the bucket (root_dir/<key>)
+        bucket: Bucket name expected in request paths
+        latency_ms: Base latency added to every request
+        jitter_ms: Uniform random extra latency (0..jitter_ms)
+        tail_ratio: Fraction of requests that get `tail_ms` instead
+        tail_ms: Latency of the slow tail
+        upload_mb_per_s: Upload bandwidth shared by all requests, like one network link (0 = unlimited)
+        seed: Seed for the latency generator
+    """
+
+    def __init__(self, root_dir, bucket, latency_ms=0.0, jitter_ms=0.0,
+                 tail_ratio=0.0, tail_ms=0.0, upload_mb_per_s=0.0, host="127.0.0.1", port=0, seed=0):
+        self.root_dir = os.path.abspath(root_dir)
+        self.bucket = bucket
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tail_ratio = tail_ratio
+        self.tail_ms = tail_ms
+        self.upload_mb_per_s = upload_mb_per_s
+        self._link_free_at = 0.0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.gets = 0
+        self.range_gets = 0
+        self.heads = 0
+        self.bytes_sent = 0
+        self.puts = 0
+        self.parts = 0
+        self.bytes_received = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def endpoint_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "gets": self.gets,
+                "range_gets": self.range_gets,
+                "heads": self.heads,
+                "bytes_sent": self.bytes_sent,
+                "puts": self.puts,
+                "parts": self.parts,
+                "bytes_received": self.bytes_received,
+            }
+
+    def _delay(self):
+        with self._lock:
+            if self.tail_ratio and self._rng.random() < self.tail_ratio:
+                delay_ms = self.tail_ms
+            else:
+                delay_ms = self.latency_ms + self._rng.uniform(0, self.jitter_ms)
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+
+    def _throttle(self, size):
+        """Hold an upload until the shared link has carried its bytes (first come, first served)."""
+        if self.upload_mb_per_s <= 0:
+            return
+        with self._lock:
+            now = time.perf_counter()
+            self._link_free_at = max(now, self._link_free_at) + size / (self.upload_mb_per_s * 1024 * 1024)
+            done_at = self._link_free_at
+        time.sleep(max(0.0, done_at - time.perf_counter()))
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _object_path(self, must_exist=True):
+                path = unquote(urlsplit(self.path).path).lstrip("/")
+                bucket, _, key = path.partition("/")
+                if bucket != standin.bucket or not key:
+                    return None
+                full_path = os.path.realpath(os.path.join(standin.root_dir, key))
+                if not full_path.startswith(standin.root_dir + os.sep):
+                    return None
+                if must_exist and not os.path.isfile(full_path):
+                    return None
+                return full_path
+
+            def _query(self):
+                return parse_qs(urlsplit(self.path).query, keep_blank_values=True)
+
+            def _read_body(self):
+                """Request body; aws-chunked bodies (streamed checksums) are decoded."""
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if "aws-chunked" in self.headers.get("Content-Encoding", "") or \
+                        self.headers.get("x-amz-content-sha256", "").startswith("STREAMING-"):
+                    body = decode_aws_chunked(body)
+                standin._throttle(len(body))
+                return body
+
+            def _upload_dir(self, upload_id):
+                upload_dir = os.path.join(standin.root_dir, UPLOADS_DIR, os.path.basename(upload_id))
+                return upload_dir if upload_id and os.path.isdir(upload_dir) else None
+
+            def _reply(self, status, body=b"", headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+
+            def _not_found(self, with_body=True):
+                body = NO_SUCH_KEY.encode("utf-8")
+                self.send_response(404)
+                self.send_header("Content-Type", "application/xml")
+                self.send_header("Content-Length", str(len(body) if with_body else 0))
+                self.end_headers()
+                if with_body:
+                    self.wfile.write(body)
+
+            def _object_headers(self, full_path, size):
+                stat = os.stat(full_path)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(size))
+                self.send_header("ETag", f'"{int(stat.st_mtime_ns):x}-{stat.st_size:x}"')
+                self.send_header("Last-Modified", email.utils.formatdate(stat.st_mtime, usegmt=True))
+                self.send_header("Accept-Ranges", "bytes")
+
+            def do_HEAD(self):
+                standin._delay()
+                with standin._lock:
+                    standin.heads += 1
+                full_path = self._object_path()
+                if full_path is None:
+                    self._not_found(with_body=False)
+                    return
+                self.send_response(200)
+                self._object_headers(full_path, os.path.getsize(full_path))
+                self.end_headers()
+
+            def do_GET(self):
+                standin._delay()
+                full_path = self._object_path()
+                if full_path is None:
+                    with standin._lock:
+                        standin.gets += 1
+                    self._not_found()
+                    return
+
+                total = os.path.getsize(full_path)
+                match = RANGE_RE.fullmatch(self.headers.get("Range", ""))
+                start, end = 0, total - 1
+                if match:
+                    start = int(match.group(1))
+                    end = min(int(match.group(2)) if match.group(2) else total - 1, total - 1)
+
+                with open(full_path, "rb") as f:
+                    f.seek(start)
+                    body = f.read(end - start + 1)
+
+                with standin._lock:
+                    standin.gets += 1
+                    standin.range_gets += 1 if match else 0
+                    standin.bytes_sent += len(body)
+
+                self.send_response(206 if match else 200)
+                self._object_headers(full_path, len(body))
+                if match:
+                    self.send_header("Content-Range", f"bytes {start}-{end}/{total}")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_PUT(self):
+                standin._delay()
+                full_path = self._object_path(must_exist=False)
+                query = self._query()
+                body = self._read_body()
+                if full_path is None:
+                    self._not_found()
+                    return
+                etag = f'"{uuid.uuid4().hex}"'
+
+                if "uploadId" in query:
+                    # UploadPart
+                    upload_dir = self._upload_dir(query["uploadId"][0])
+                    if upload_dir is None:
+                        self._not_found()
+                        return
+                    part_number = int(query["partNumber"][0])
+                    with open(os.path.join(upload_dir, f"{part_number:05d}"), "wb") as f:
+                        f.write(body)
+                    with standin._lock:
+                        standin.parts += 1
+                        standin.bytes_received += len(body)
+                else:
+                    # PutObject
+                    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                    with open(full_path, "wb") as f:
+                        f.write(body)
+                    with standin._lock:
+                        standin.puts += 1
+                        standin.bytes_received += len(body)
+                self._reply(200, headers={"ETag": etag})
+
+            def do_POST(self):
+                standin._delay()
+                full_path = self._object_path(must_exist=False)
+                query = self._query()
+                body = self._read_body()
+                if full_path is None:
+                    self._not_found()
+                    return
+                key = os.path.relpath(full_path, standin.root_dir)
+
+                if "uploads" in query:
+                    # CreateMultipartUpload
+                    upload_id = uuid.uuid4().hex
+                    os.makedirs(os.path.join(standin.root_dir, UPLOADS_DIR, upload_id))
+                    result = (f"<InitiateMultipartUploadResult><Bucket>{standin.bucket}</Bucket>"
+                              f"<Key>{key}</Key><UploadId>{upload_id}</UploadId>"
+                              f"</InitiateMultipartUploadResult>")
+                elif "uploadId" in query:
+                    # CompleteMultipartUpload: concatenate the listed parts
+                    upload_dir = self._upload_dir(query["uploadId"][0])
+                    if upload_dir is None:
+                        self._not_found()
+                        return
+                    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                    with open(full_path, "wb") as out:
+                        for part_number in PART_NUMBER_RE.findall(body):
+                            with open(os.path.join(upload_dir, f"{int(part_number):05d}"), "rb") as part:
+                                shutil.copyfileobj(part, out)
+                    shutil.rmtree(upload_dir, ignore_errors=True)
+                    result = (f"<CompleteMultipartUploadResult><Bucket>{standin.bucket}</Bucket>"
+                              f'<Key>{key}</Key><ETag>"{uuid.uuid4().hex}-1"</ETag>'
+                              f"</CompleteMultipartUploadResult>")
+                else:
+                    self._reply(400)
+                    return
+                self._reply(200, ('<?xml version="1.0" encoding="UTF-8"?>' + result).encode("utf-8"),
+                            {"Content-Type": "application/xml"})
+
+            def do_DELETE(self):
+                standin._delay()
+                query = self._query()
+                if "uploadId" in query:
+                    # AbortMultipartUpload
+                    upload_dir = self._upload_dir(query["uploadId"][0])
+                    if upload_dir is not None:
+                        shutil.rmtree(upload_dir, ignore_errors=True)
+                else:
+                    full_path = self._object_path()
+                    if full_path is not None:
+                        os.remove(full_path)
+                self._reply(204)
+
+        return Handler
+
+
+def decode_aws_chunked(body):
+    """Payload of an aws-chunked body: `<hex size>[;ext]` CRLF data CRLF ..., ending with a 0-size chunk."""
+    data = bytearray()
+    position = 0
+    while True:
+        line_end = body.index(b"\r\n", position)
+        size = int(body[position:line_end].split(b";")[0], 16)
+        if size == 0:
+            return bytes(data)
+        start = line_end + 2
+        data += body[start:start + size]
+        position = start + size + 2
@@ -2,16 +2,18 @@
 SM-WikiDict FastAPI Server
 """
 
-import time
-import uuid
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.gzip import GZipMiddleware
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from src.controller import health_router, search_router
-from src.config import app_settings
-from src.config.load_indexes import get_index_loader
+from src.controller import admin_router, health_router, search_router
+from src.config import app_settings, env_settings
+from src.config.load_indexes import get_index_load_state, get_index_loader, load_index_in_background, poll_deltas
+from src.storage import get_storage_backend
+from src.middleware import RequestContextMiddleware
+from src.metrics import PhaseTimer, mark_worker_exit, process_age_seconds
+from src.utils import get_last_known_meanings, get_meaning_reader, get_search_responses
 from src.errors import (
     AppException,
     app_exception_handler,
@@ -24,15 +26,50 @@ from src.errors import (
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifecycle manager for startup and shutdown events."""
-    # Startup: Load index from S3
-    try:
-        loader = get_index_loader()
+    startup = PhaseTimer()
+    # Settings are parsed lazily, in practice while this module builds the app
+    settings_seconds = sum(s.load_seconds or 0 for s in (app_settings, env_settings))
+    process_age = process_age_seconds()
+    if process_age is not None:
+        # Interpreter start, uvicorn and the imports of this module (mostly FastAPI)
+        startup.add("interpreter_and_imports", max(process_age - settings_seconds, 0))
+    startup.add("settings", settings_seconds)
+
+    with startup.phase("storage"):
+        get_storage_backend()
+
+    def finish_startup(loader):
+        startup.add("index", loader.load_seconds, loader.phases)
+        # Build the caches now rather than on the first request
+        with startup.phase("caches"):
+            get_meaning_reader()
+            get_search_responses()
+            get_last_known_meanings()
+        startup.publish()
+        print(f"Startup phases:\n{startup.report()}")
         print(f"✓ Server ready with {len(loader.indexes):,} entries loaded")
-    except Exception as e:
-        print(f"✗ Failed to load index: {e}")
-        raise
+        if app_settings.index.delta_poll_seconds > 0:
+            poll_deltas(app_settings.index.delta_poll_seconds)
+
+    # Startup: Load index from the configured storage backend
+    if get_index_load_state().is_ready:
+        # Pre-fork worker: the master loaded the index before forking
+        finish_startup(get_index_loader())
+    elif app_settings.index.background_load:
+        # /health answers during the load; /ready and the search routes return 503 until it is done
+        load_index_in_background(finish_startup)
+        print("Loading index in the background - GET /ready reports progress")
+    else:
+        try:
+            loader = get_index_loader()
+        except Exception as e:
+            print(f"✗ Failed to load index: {e}")
+            raise
+        finish_startup(loader)
     yield
-    # Shutdown: cleanup if needed
+    # Shutdown: release storage handles (file descriptors, mappings)
+    get_storage_backend().close()
+    mark_worker_exit()
     print("Server shutting down")
 
 
@@ -45,47 +82,18 @@ app = FastAPI(
 
 app.router.prefix = app_settings.api_prefix
 
-# Add gzip compression for responses larger than 0.5KB
-app.add_middleware(GZipMiddleware, minimum_size=500)
-
-# Add request ID middleware for tracking and debugging
-@app.middleware("http")
-async def add_request_id(request: Request, call_next):
-    """
-    Add unique request ID to each request for tracking and correlation.
-
-    - Checks for existing X-Request-ID header from client
-    - Generates UUID if not provided
-    - Adds to both request state and response headers
-    - Used in error responses for debugging
-    """
-    # Check if client provided a request ID
-    request_id = request.headers.get("X-Request-ID")
-
-    # Generate new UUID if not provided
-    if not request_id:
-        request_id = f"req_{uuid.uuid4().hex[:16]}"
-
-    # Store in request state for access in route handlers
-    request.state.request_id = request_id
-
-    # Process request
-    response = await call_next(request)
-
-    # Add request ID to response headers
-    response.headers["X-Request-ID"] = request_id
-
-    return response
+# Add gzip compression for responses larger than the configured minimum size.
+# /search and /autocomplete compress their own bodies (their ETags name the
+# coding) and set Content-Encoding, so the middleware passes those through.
+if app_settings.compression.enabled:
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=app_settings.compression.minimum_size,
+    )
 
-# Add timing middleware for performance monitoring
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    """Add X-Process-Time header to track request processing time."""
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = f"{process_time:.4f}"
-    return response
+# Request ID propagation and X-Process-Time timing in one pure-ASGI layer.
+# Added last, so it wraps GZipMiddleware and times the whole response start.
+app.add_middleware(RequestContextMiddleware)
 
 # Register exception handlers
 app.add_exception_handler(AppException, app_exception_handler)
@@ -96,6 +104,7 @@ app.add_exception_handler(Exception, generic_exception_handler)
 # Register routers
 app.include_router(health_router)
 app.include_router(search_router)
+app.include_router(admin_router)
 
 
 if __name__ == "__main__":
@@ -5,13 +5,25 @@ steps to build
  1. Pull manifest.json file from S3 bucket
  2. parse manifest.json
  3. Check if file exist which is mentioned in manifest.json as file_path
- 4. If file exist, download the file from S3
-       4.1 Download changelog file from S3
-       4.2 Create new updated wikidict file via changelog file
+ 4. If file exist, build incrementally (--mode delta, the default)
+       4.1 Stream changelog file from S3 (title,value rows; an optional op column set to
+           "delete" removes the title)
+       4.2 Write the changes as a delta segment: a small sorted data file (binary-v1) and
+           a delta index, where deleted titles map to null. The base data file is not read.
+       4.3 Verify the uploads and append the delta to the manifest's `deltas` list
+           (oldest first); the server looks keys up in the newest delta first, then the base
+       4.4 Compact when the manifest holds --max-deltas deltas, or their data outgrows
+           --max-delta-ratio of the base (or with --compact): merge the base and all deltas
+           into a new base data file and index, and clear `deltas`
+    Or rewrite the whole file (--mode rewrite), streaming from S3 (nothing is downloaded to local disk)
+       4.1 Stream changelog file from S3
+       4.2 Create new updated wikidict file (binary-v1, see record_format.py) via changelog file,
+           uploaded to S3 as a multipart upload while it is written (see s3_stream.py)
             4.2.1 If key exist in both files, update the value from changelog file
             4.2.2 If key does not exist in existing file but exists in changelog file, add the key-value pair from changelog file
-        4.3 Upload the updated wikidict file to S3
-        4.4 Update the manifest.json file with new file_path, last_updated_at, version and upload to S3
+            4.2.3 If the changelog row's op is "delete", drop the key (like a delta would)
+        4.3 Verify the uploaded wikidict file and index file
+        4.4 Update the manifest.json file with new file_path, file_size, last_updated_at, version and upload to S3
  5. If not trigger full rebuild by calling build_full_wikidict.py script
 '''
 
@@ -20,11 +32,17 @@ import sys
 import json
 import boto3
 import csv
+import heapq
+import io
+import argparse
 from datetime import datetime
 import subprocess
 import logging
 from dotenv import load_dotenv
 from botocore.exceptions import ClientError
+from record_format import (DATA_FORMAT, DATA_FILE_NAME, INDEX_FILE_NAME, IndexWriter, RecordWriter, iter_raw_records,
+                           iter_records, write_indented_index)
+from s3_stream import DEFAULT_MAX_IN_FLIGHT, DEFAULT_PART_SIZE, MultipartUploadWriter, open_s3_object
 
 load_dotenv()
 
@@ -49,6 +67,12 @@ s3_client = boto3.client('s3',
                 aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
                 region_name=AWS_DEFAULT_REGION)
 
+# Changelog rows with this op delete the title
+DELETE_OP = 'delete'
+# Compaction triggers (see main)
+DEFAULT_MAX_DELTAS = 8
+DEFAULT_MAX_DELTA_RATIO = 0.25
+
 # load manifest.json file from S3
 def load_manifest_from_s3():
     try:
@@ -77,245 +101,152 @@ def update_manifest_in_s3(manifest):
         logger.error(f"Error updating manifest in S3: {e}")
         raise
 
-# upload updated wikidict file to S3 with index file and verify
-def upload_file_to_s3(file_path, manifest):
-    try:
-        # Hardcoded names for security - only accept data.csv and index.json
-        index_local_path = file_path.replace("data.csv", "index.json")
-
-        # Verify files exist
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"Data file not found: {file_path}")
-        if not os.path.exists(index_local_path):
-            raise FileNotFoundError(f"Index file not found: {index_local_path}")
-
-        # Hardcoded S3 paths for security
-        s3_file_path = "dict/" + datetime.now().strftime("%Y%m%d") + "/data.csv"
-        index_file_path = "dict/" + datetime.now().strftime("%Y%m%d") + "/index.json"
-
-        # Upload data file
-        logger.info("Uploading data.csv to S3...")
-        s3_client.upload_file(file_path, S3_BUCKET, s3_file_path)
-
-        # Upload index file
-        logger.info("Uploading index.json to S3...")
-        s3_client.upload_file(index_local_path, S3_BUCKET, index_file_path)
-
-        # Verify uploads
-        logger.info("Verifying uploads...")
-        try:
-            s3_client.head_object(Bucket=S3_BUCKET, Key=s3_file_path)
-            s3_client.head_object(Bucket=S3_BUCKET, Key=index_file_path)
-            logger.info("✓ Upload verification successful")
-        except ClientError:
-            logger.error("✗ Upload verification failed!")
-            raise
-
-        # Update manifest
-        manifest['file_path'] = s3_file_path
-        manifest['last_updated_at'] = datetime.now().isoformat()
-        manifest['version'] = datetime.now().strftime("%Y%m%d")
-        manifest['index_file_path'] = index_file_path
-
-        logger.info(f"✓ Uploaded to s3://{S3_BUCKET}/{s3_file_path}")
-        logger.info(f"✓ Uploaded to s3://{S3_BUCKET}/{index_file_path}")
-
-    except FileNotFoundError as e:
-        logger.error(f"Error: {e}")
-        raise
-    except Exception as e:
-        logger.error(f"Error uploading files to S3: {e}")
-        raise
-
-# download existing wikidict file from S3 with index file
-def download_file_from_s3(s3_file_path):
+# open a file in S3 for streaming reads (nothing is downloaded to local disk)
+def open_from_s3(s3_file_path):
     try:
-        file_name = os.path.basename(s3_file_path)
-        file_path = os.path.join("data/" + s3_file_path)
-
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-
-        logger.info(f"Downloading {file_name} from S3...")
-        s3_client.download_file(S3_BUCKET, s3_file_path, file_path)
-
-        # Download index file (hardcoded names for security)
-        index_s3_file_path = s3_file_path.replace("data.csv", "index.json")
-        index_file_path = file_path.replace("data.csv", "index.json")
-
-        s3_client.download_file(S3_BUCKET, index_s3_file_path, index_file_path)
-
-        logger.info(f"✓ Downloaded {file_name} to {file_path}")
-        logger.info(f"✓ Downloaded index file to {index_file_path}")
-        return file_path
-
+        logger.info(f"Streaming s3://{S3_BUCKET}/{s3_file_path}...")
+        return open_s3_object(s3_client, S3_BUCKET, s3_file_path)
     except ClientError as e:
-        if e.response['Error']['Code'] == '404':
+        if e.response['Error']['Code'] in ('NoSuchKey', '404'):
             logger.error(f"File not found in S3: {s3_file_path}")
         else:
-            logger.error(f"Error downloading from S3: {e}")
+            logger.error(f"Error reading from S3: {e}")
         raise
-    except Exception as e:
-        logger.error(f"Unexpected error downloading file: {e}")
-        raise
-
-# download changelog file from S3
-def download_changelog_from_s3(changelog_file_path):
-    try:
-        file_path = os.path.join("data/" + changelog_file_path)
-
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
-        logger.info("Downloading changelog from S3...")
-        s3_client.download_file(S3_BUCKET, changelog_file_path, file_path)
-        logger.info(f"✓ Downloaded changelog {changelog_file_path} to {file_path}")
-        return file_path
+# load a JSON file (a delta index) from S3
+def load_json_from_s3(s3_file_path):
+    with open_from_s3(s3_file_path) as f:
+        return json.load(f)
 
-    except ClientError as e:
-        if e.response['Error']['Code'] == '404':
-            logger.error(f"Changelog file not found in S3: {changelog_file_path}")
-        else:
-            logger.error(f"Error downloading changelog from S3: {e}")
-        raise
-    except Exception as e:
-        logger.error(f"Unexpected error downloading changelog: {e}")
+# verify the uploaded wikidict file and index file
+def verify_upload(s3_file_path, index_file_path, file_size):
+    logger.info("Verifying uploads...")
+    try:
+        uploaded_size = s3_client.head_object(Bucket=S3_BUCKET, Key=s3_file_path)['ContentLength']
+        s3_client.head_object(Bucket=S3_BUCKET, Key=index_file_path)
+    except ClientError:
+        logger.error("✗ Upload verification failed!")
         raise
-
-# Update wikidict file using changelog file and build index
-def update_wikidict(existing_file_path, changelog_file_path, output_file_path):
+    if uploaded_size != file_size:
+        raise RuntimeError(f"Uploaded {DATA_FILE_NAME} is {uploaded_size:,} bytes, expected {file_size:,}")
+    logger.info("✓ Upload verification successful")
+
+# Data files published before binary-v1 are CSV; their manifests carry no data_format
+# (the server's decode_meaning reads them the same way). The file name says nothing.
+def is_legacy_csv(manifest):
+    return manifest.get('data_format') != DATA_FORMAT
+
+# Rows of the existing data file as (sort key, title, title bytes, value bytes).
+# Values stay encoded: they are copied to the output as they are.
+def existing_rows(existing_file, legacy_csv=False):
+    if legacy_csv:
+        # Increase CSV field size limit
+        csv.field_size_limit(sys.maxsize)
+        for row in csv.DictReader(io.TextIOWrapper(existing_file, encoding='utf-8', newline='')):
+            title = row['title']
+            yield title.lower(), title, title.encode('utf-8'), row['value'].encode('utf-8')
+        return
+    for title_bytes, value_bytes in iter_raw_records(existing_file):
+        title = title_bytes.decode('utf-8')
+        yield title.lower(), title, title_bytes, value_bytes
+
+# Rows of the changelog CSV as (sort key, title, title bytes, value bytes);
+# value bytes is None for rows whose op column is "delete". Of consecutive rows for
+# the same title (case-insensitively) only the last is kept, as read_changelog does.
+def changelog_rows(changelog_file):
     # Increase CSV field size limit
     csv.field_size_limit(sys.maxsize)
+    reader = csv.reader(changelog_file)
+    header = next(reader, None)
+    if header is None:
+        return
+    title_column = header.index('title')
+    value_column = header.index('value')
+    op_column = header.index('op') if 'op' in header else None
+    pending = None
+    for row in reader:
+        # Blank lines, skipped like csv.DictReader does
+        if not row:
+            continue
+        title = row[title_column]
+        if op_column is not None and op_column < len(row) and row[op_column].strip().lower() == DELETE_OP:
+            value_bytes = None
+        else:
+            # A short row has no value, as csv.DictReader (read_changelog) reads it
+            value = row[value_column] if value_column < len(row) else ''
+            value_bytes = value.encode('utf-8')
+        lower = title.lower()
+        if pending is not None and pending[0] != lower:
+            yield pending
+        pending = (lower, title, title.encode('utf-8'), value_bytes)
+    if pending is not None:
+        yield pending
 
-    updated_index_file_path = output_file_path.replace("data.csv", "index.json")
-
-    logger.info("Starting sorted merge of two sorted CSV files and building index...")
+# Update wikidict file using changelog file and build index
+# existing_file: binary, changelog_file: text, output_file: binary, index_file: text;
+# local files or S3 streams (s3_stream.py)
+def update_wikidict(existing_file, changelog_file, output_file, index_file, legacy_csv=False):
+    logger.info("Starting sorted merge of existing data file and sorted changelog CSV, building index...")
 
-    # Index to be built during merge
+    # Index to be built during merge: title -> (value offset, value length)
     index = {}
 
-    # Open both files and the output file
-    with open(existing_file_path, 'r', encoding='utf-8') as existing_file, \
-         open(changelog_file_path, 'r', encoding='utf-8') as changelog_file, \
-         open(output_file_path, 'w', encoding='utf-8', newline='') as output_file:
-
-        existing_reader = csv.DictReader(existing_file)
-        changelog_reader = csv.DictReader(changelog_file)
-        writer = csv.DictWriter(output_file, fieldnames=['title', 'value'])
-        writer.writeheader()
-
-        # Get first row from each file
-        existing_row = next(existing_reader, None)
-        changelog_row = next(changelog_reader, None)
-
-        existing_count = 0
-        changelog_count = 0
-        updated_count = 0
-        added_count = 0
-        total_count = 0
-
-        # Merge the two sorted files (like merge sort)
-        while existing_row is not None or changelog_row is not None:
-            # Track byte position before writing
-            row_start = output_file.tell()
-
-            # If one file is exhausted, write from the other
-            if existing_row is None:
-                # Only changelog left
-                writer.writerow({'title': changelog_row['title'], 'value': changelog_row['value']})
-                row_end = output_file.tell()
-
-                # Add to index
-                index[changelog_row['title']] = {
-                    "offset": row_start,
-                    "length": row_end - row_start
-                }
-
-                added_count += 1
-                total_count += 1
-                changelog_row = next(changelog_reader, None)
-                changelog_count += 1
-
-            elif changelog_row is None:
-                # Only existing left
-                writer.writerow({'title': existing_row['title'], 'value': existing_row['value']})
-                row_end = output_file.tell()
-
-                # Add to index
-                index[existing_row['title']] = {
-                    "offset": row_start,
-                    "length": row_end - row_start
-                }
-
-                total_count += 1
-                existing_row = next(existing_reader, None)
-                existing_count += 1
-
-            else:
-                # Both files have data, compare titles (case-insensitive)
-                existing_title_lower = existing_row['title'].lower()
-                changelog_title_lower = changelog_row['title'].lower()
-
-                if existing_title_lower < changelog_title_lower:
-                    # Existing title comes first alphabetically
-                    writer.writerow({'title': existing_row['title'], 'value': existing_row['value']})
-                    row_end = output_file.tell()
-
-                    # Add to index
-                    index[existing_row['title']] = {
-                        "offset": row_start,
-                        "length": row_end - row_start
-                    }
-
-                    total_count += 1
-                    existing_row = next(existing_reader, None)
-                    existing_count += 1
-
-                elif existing_title_lower > changelog_title_lower:
-                    # Changelog title comes first alphabetically (new entry)
-                    writer.writerow({'title': changelog_row['title'], 'value': changelog_row['value']})
-                    row_end = output_file.tell()
-
-                    # Add to index
-                    index[changelog_row['title']] = {
-                        "offset": row_start,
-                        "length": row_end - row_start
-                    }
-
-                    added_count += 1
-                    total_count += 1
-                    changelog_row = next(changelog_reader, None)
-                    changelog_count += 1
-
-                else:
-                    # Same title - use value from changelog (update)
-                    writer.writerow({'title': changelog_row['title'], 'value': changelog_row['value']})
-                    row_end = output_file.tell()
-
-                    # Add to index
-                    index[changelog_row['title']] = {
-                        "offset": row_start,
-                        "length": row_end - row_start
-                    }
-
-                    updated_count += 1
-                    total_count += 1
-                    existing_row = next(existing_reader, None)
-                    changelog_row = next(changelog_reader, None)
-                    existing_count += 1
-                    changelog_count += 1
-
-            # Progress reporting
-            if total_count % 100000 == 0:
-                logger.info(f"  Merged {total_count:,} entries...")
+    # Existing data is binary-v1; data files published before it are CSV (legacy_csv)
+    existing_reader = existing_rows(existing_file, legacy_csv)
+    changelog_reader = changelog_rows(changelog_file)
+    writer = RecordWriter(output_file)
+    write_record = writer.write_bytes
+
+    # Rows carry their lowercased title (computed once) as the sort key
+    existing_row = next(existing_reader, None)
+    changelog_row = next(changelog_reader, None)
+
+    existing_count = 0
+    changelog_count = 0
+    updated_count = 0
+    added_count = 0
+    deleted_count = 0
+    total_count = 0
+
+    # Merge the two sorted files (like merge sort), comparing titles case-insensitively
+    while existing_row is not None or changelog_row is not None:
+        if changelog_row is None or (existing_row is not None and existing_row[0] < changelog_row[0]):
+            # Existing title comes first (or only existing left)
+            row = existing_row
+            existing_row = next(existing_reader, None)
+            existing_count += 1
+        elif existing_row is None or changelog_row[0] < existing_row[0]:
+            # Changelog title comes first (new entry, or only changelog left)
+            row = changelog_row
+            changelog_row = next(changelog_reader, None)
+            changelog_count += 1
+            if row[3] is None:
+                # Deleting a title that does not exist
+                continue
+            added_count += 1
+        else:
+            # Same title - use value from changelog (update), or drop it (delete)
+            row = changelog_row
+            existing_row = next(existing_reader, None)
+            changelog_row = next(changelog_reader, None)
+            existing_count += 1
+            changelog_count += 1
+            if row[3] is None:
+                deleted_count += 1
+                continue
+            updated_count += 1
+
+        # Add to index (points at the value bytes only)
+        index[row[1]] = write_record(row[2], row[3])
+        total_count += 1
+
+        # Progress reporting
+        if total_count % 100000 == 0:
+            logger.info(f"  Merged {total_count:,} entries...")
 
     # Write index file
-    logger.info(f"Writing index to {updated_index_file_path}...")
-    with open(updated_index_file_path, 'w', encoding='utf-8') as idx_f:
-        json.dump(index, idx_f, ensure_ascii=False, indent=2)
-
-    index_size = os.path.getsize(updated_index_file_path)
-    index_size_mb = index_size / (1024 ** 2)
+    logger.info("Writing index...")
+    write_indented_index(index, index_file)
 
     # Validate index
     if len(index) != total_count:
@@ -331,31 +262,26 @@ def update_wikidict(existing_file_path, changelog_file_path, output_file_path):
     logger.info(f"  Processed {changelog_count:,} entries from changelog file")
     logger.info(f"  Updated {updated_count:,} existing entries")
     logger.info(f"  Added {added_count:,} new entries")
+    logger.info(f"  Deleted {deleted_count:,} entries")
     logger.info(f"  Total entries in output: {total_count:,}")
-    logger.info(f"  Updated wikidict saved to {output_file_path}")
-    logger.info(f"  Index saved to {updated_index_file_path} ({index_size_mb:.2f} MB)")
+    logger.info(f"  Updated wikidict size: {writer.position / (1024 ** 2):.2f} MB")
     logger.info("  Output file is SORTED ✓")
     logger.info("  Index created ✓")
 
-# cleanup downloaded files and processed files from local storage
-def cleanup_local_files():
-    data_dir = "data/dict/"
-    if os.path.exists(data_dir):
-        for root, dirs, files in os.walk(data_dir, topdown=False):
-            for name in files:
-                os.remove(os.path.join(root, name))
-            for name in dirs:
-                os.rmdir(os.path.join(root, name))
-        logger.info(f"Cleaned up local data directory: {data_dir}")
+    return writer.position
 
 # Build updated wikidict file
-def build_updated_wikidict(manifest):
+def build_updated_wikidict(manifest, part_size=DEFAULT_PART_SIZE, max_in_flight=DEFAULT_MAX_IN_FLIGHT):
     # Validate manifest structure
     required_fields = ['file_path', 'changelog_file_path']
     for field in required_fields:
         if field not in manifest or not manifest[field]:
             raise ValueError(f"Missing or empty required field in manifest: {field}")
 
+    if manifest.get('deltas'):
+        # The rewrite merges the changelog into the base only; compact the deltas first
+        raise ValueError(f"Manifest has {len(manifest['deltas'])} pending delta(s); compact them before a rewrite")
+
     existing_file_path = manifest['file_path']
     changelog_file_path = manifest['changelog_file_path']
 
@@ -364,19 +290,38 @@ def build_updated_wikidict(manifest):
     logger.info(f"  Changelog file: {changelog_file_path}")
 
     try:
-        # Download existing wikidict file
-        existing_file_local_path = download_file_from_s3(existing_file_path)
-
-        # Download changelog file
-        changelog_local_path = download_changelog_from_s3(changelog_file_path)
-
-        # Create updated wikidict file
-        updated_wikidict_path = os.path.join("data/dict/" + datetime.now().strftime("%Y%m%d") + "/data.csv")
-        os.makedirs(os.path.dirname(updated_wikidict_path), exist_ok=True)
-        update_wikidict(existing_file_local_path, changelog_local_path, updated_wikidict_path)
+        # Hardcoded S3 paths for security
+        date_str = datetime.now().strftime("%Y%m%d")
+        s3_file_path = "dict/" + date_str + "/" + DATA_FILE_NAME
+        index_file_path = "dict/" + date_str + "/" + INDEX_FILE_NAME
+
+        # Inputs are read from S3 and outputs uploaded while the merge runs:
+        # nothing is written to local disk. Uploads complete when the block
+        # exits (data first) and are aborted if the merge fails.
+        logger.info(f"Streaming {DATA_FILE_NAME} to s3://{S3_BUCKET}/{s3_file_path}...")
+        logger.info(f"Streaming {INDEX_FILE_NAME} to s3://{S3_BUCKET}/{index_file_path}...")
+        with open_from_s3(existing_file_path) as existing_file, \
+             open_from_s3(changelog_file_path) as changelog_stream, \
+             MultipartUploadWriter(s3_client, S3_BUCKET, index_file_path, part_size, max_in_flight) as index_upload, \
+             MultipartUploadWriter(s3_client, S3_BUCKET, s3_file_path, part_size, max_in_flight) as data_upload:
+            changelog_file = io.TextIOWrapper(changelog_stream, encoding='utf-8')
+            index_file = io.TextIOWrapper(index_upload, encoding='utf-8')
+            file_size = update_wikidict(existing_file, changelog_file, data_upload, index_file,
+                                        legacy_csv=is_legacy_csv(manifest))
+            # Flush without closing: closing completes the upload
+            index_file.detach()
+
+        verify_upload(s3_file_path, index_file_path, file_size)
+        logger.info(f"✓ Uploaded to s3://{S3_BUCKET}/{s3_file_path}")
+        logger.info(f"✓ Uploaded to s3://{S3_BUCKET}/{index_file_path}")
 
-        # Upload updated wikidict file to S3
-        upload_file_to_s3(updated_wikidict_path, manifest)
+        # Update manifest
+        manifest['file_path'] = s3_file_path
+        manifest['last_updated_at'] = datetime.now().isoformat()
+        manifest['version'] = date_str
+        manifest['index_file_path'] = index_file_path
+        manifest['data_format'] = DATA_FORMAT
+        manifest['file_size'] = file_size
 
         # Update manifest in S3 (only if upload succeeded)
         update_manifest_in_s3(manifest)
@@ -387,14 +332,236 @@ def build_updated_wikidict(manifest):
         logger.error(f"✗ Build failed: {e}")
         logger.error("Original files in S3 remain unchanged (no rollback needed)")
         raise
-    finally:
-        # Always cleanup local files to prevent storage cost accumulation
-        # Safe because manifest.json is only updated on success, so API continues using old files on failure
-        cleanup_local_files()
 
 
+# Read a changelog into {lowercased title: (title, value)}, with None for deleted titles.
+# Titles match case-insensitively, like the rewrite merge: the last row for a title wins
+# and its spelling replaces the previous one.
+def read_changelog(changelog_file):
+    # Increase CSV field size limit
+    csv.field_size_limit(sys.maxsize)
+
+    changes = {}
+    for row in csv.DictReader(changelog_file):
+        title = row['title']
+        if (row.get('op') or '').strip().lower() == DELETE_OP:
+            changes[title.lower()] = (title, None)
+        else:
+            changes[title.lower()] = (title, row['value'] or '')
+    return changes
+
+# Write a delta segment: changed titles sorted (case-insensitive) into a binary-v1 data
+# file, and a delta index where deleted titles map to null
+# output_file: binary, index_file: text
+def write_delta(changes, output_file, index_file):
+    writer = RecordWriter(output_file)
+    index = IndexWriter(index_file)
+    for key in sorted(changes):
+        title, value = changes[key]
+        if value is None:
+            index.delete(title)
+        else:
+            value_offset, value_length = writer.write(title, value)
+            index.add(title, value_offset, value_length)
+    index.close()
+    return writer.position
+
+# Build a delta segment from the changelog and append it to the manifest.
+# Reads only the changelog: the cost scales with the changes, not the dictionary.
+def build_delta(manifest, part_size=DEFAULT_PART_SIZE, max_in_flight=DEFAULT_MAX_IN_FLIGHT):
+    for field in ('file_path', 'changelog_file_path'):
+        if field not in manifest or not manifest[field]:
+            raise ValueError(f"Missing or empty required field in manifest: {field}")
+
+    changelog_file_path = manifest['changelog_file_path']
+    logger.info("Starting delta build...")
+    logger.info(f"  Base file: {manifest['file_path']} (+{len(manifest.get('deltas', []))} delta(s))")
+    logger.info(f"  Changelog file: {changelog_file_path}")
+
+    try:
+        with open_from_s3(changelog_file_path) as changelog_stream:
+            changes = read_changelog(io.TextIOWrapper(changelog_stream, encoding='utf-8'))
+        deleted_count = sum(1 for _, value in changes.values() if value is None)
+        logger.info(f"  {len(changes) - deleted_count:,} added or updated, {deleted_count:,} deleted")
+        if not changes:
+            logger.info("Changelog is empty, nothing to publish")
+            return
+
+        # Hardcoded S3 paths for security; several deltas may be published on one day
+        now = datetime.now()
+        date_str = now.strftime("%Y%m%d")
+        delta_name = "delta-" + now.strftime("%Y%m%d-%H%M%S")
+        s3_file_path = "dict/" + date_str + "/" + delta_name + ".bin"
+        index_file_path = "dict/" + date_str + "/" + delta_name + ".json"
+
+        with MultipartUploadWriter(s3_client, S3_BUCKET, index_file_path, part_size, max_in_flight) as index_upload, \
+             MultipartUploadWriter(s3_client, S3_BUCKET, s3_file_path, part_size, max_in_flight) as data_upload:
+            index_file = io.TextIOWrapper(index_upload, encoding='utf-8')
+            file_size = write_delta(changes, data_upload, index_file)
+            # Flush without closing: closing completes the upload
+            index_file.detach()
+
+        verify_upload(s3_file_path, index_file_path, file_size)
+        logger.info(f"✓ Uploaded delta to s3://{S3_BUCKET}/{s3_file_path} ({file_size / (1024 ** 2):.2f} MB)")
+
+        # Deltas are listed oldest first; file_path stays the base
+        manifest.setdefault('deltas', []).append({
+            'file_path': s3_file_path,
+            'index_file_path': index_file_path,
+            'data_format': DATA_FORMAT,
+            'file_size': file_size,
+            'entries': len(changes) - deleted_count,
+            'deleted': deleted_count,
+            'created_at': now.isoformat(),
+        })
+        manifest['last_updated_at'] = now.isoformat()
+        manifest['version'] = date_str
+        update_manifest_in_s3(manifest)
+
+        logger.info(f"✓ Delta build completed successfully ({len(manifest['deltas'])} delta(s) pending compaction)")
+
+    except Exception as e:
+        logger.error(f"✗ Delta build failed: {e}")
+        logger.error("Original files in S3 remain unchanged (no rollback needed)")
+        raise
+
+# Whether the deltas should be folded into the base
+def needs_compaction(manifest, max_deltas=DEFAULT_MAX_DELTAS, max_delta_ratio=DEFAULT_MAX_DELTA_RATIO):
+    deltas = manifest.get('deltas') or []
+    if not deltas:
+        return False
+    if len(deltas) >= max_deltas:
+        return True
+    base_size = manifest.get('file_size')
+    return bool(base_size) and sum(delta['file_size'] for delta in deltas) > base_size * max_delta_ratio
+
+# Merge the base data file and its deltas into a new base data file and index.
+# base_file and delta_files: binary, delta_indexes: parsed delta indexes, oldest first
+# output_file: binary, index_file: text
+def compact_wikidict(base_file, delta_files, delta_indexes, output_file, index_file, legacy_csv=False):
+    logger.info(f"Starting compaction of the base data file and {len(delta_files)} delta(s)...")
+
+    # Newest delta mentioning each title, by lowercased title (titles match
+    # case-insensitively, like the rewrite merge): (its number, the title as it spells
+    # it), or None when it deleted the title. Only changed titles are held in memory.
+    latest = {}
+    for number, delta_index in enumerate(delta_indexes):
+        for title, entry in delta_index.items():
+            latest[title.lower()] = (number, title) if entry is not None else None
+
+    if legacy_csv:
+        csv.field_size_limit(sys.maxsize)
+        base_records = csv.DictReader(io.TextIOWrapper(base_file, encoding='utf-8', newline=''))
+    else:
+        base_records = iter_records(base_file)
+
+    def tagged(records, number):
+        for record in records:
+            yield number, record['title'], record['value']
+
+    # All inputs are sorted case-insensitively; on ties heapq.merge keeps input order,
+    # so base titles stay ahead of titles the deltas added
+    sources = [tagged(base_records, -1)]
+    sources += [tagged(iter_records(delta_file), number) for number, delta_file in enumerate(delta_files)]
+    merged = heapq.merge(*sources, key=lambda item: item[1].lower())
+
+    writer = RecordWriter(output_file)
+    index = IndexWriter(index_file)
+    base_count = 0
+    kept_count = 0
+    for number, title, value in merged:
+        if number < 0:
+            base_count += 1
+            if title.lower() in latest:
+                continue
+        elif latest.get(title.lower()) != (number, title):
+            continue
+        value_offset, value_length = writer.write(title, value)
+        index.add(title, value_offset, value_length)
+        kept_count += 1
+
+        if kept_count % 100000 == 0:
+            logger.info(f"  Compacted {kept_count:,} entries...")
+    index.close()
+
+    deleted_count = sum(1 for number in latest.values() if number is None)
+    logger.info("Compaction complete!")
+    logger.info(f"  Processed {base_count:,} entries from the base file")
+    logger.info(f"  Applied {len(latest) - deleted_count:,} added or updated and {deleted_count:,} deleted titles")
+    logger.info(f"  Total entries in output: {kept_count:,}")
+    logger.info(f"  Compacted wikidict size: {writer.position / (1024 ** 2):.2f} MB")
+    return writer.position
+
+# Fold the manifest's deltas into a new base and publish it
+def build_compacted_wikidict(manifest, part_size=DEFAULT_PART_SIZE, max_in_flight=DEFAULT_MAX_IN_FLIGHT):
+    deltas = manifest.get('deltas') or []
+    if not deltas:
+        logger.info("No deltas to compact")
+        return
+
+    base_file_path = manifest['file_path']
+    logger.info("Starting compaction...")
+    logger.info(f"  Base file: {base_file_path}")
+    for delta in deltas:
+        logger.info(f"  Delta: {delta['file_path']}")
+
+    try:
+        # Hardcoded S3 paths for security; a new prefix, so the live base is never overwritten
+        now = datetime.now()
+        date_str = now.strftime("%Y%m%d")
+        prefix = "dict/" + date_str + "/compacted-" + now.strftime("%H%M%S") + "/"
+        s3_file_path = prefix + DATA_FILE_NAME
+        index_file_path = prefix + INDEX_FILE_NAME
+
+        delta_indexes = [load_json_from_s3(delta['index_file_path']) for delta in deltas]
+        delta_files = [open_from_s3(delta['file_path']) for delta in deltas]
+        try:
+            with open_from_s3(base_file_path) as base_file, \
+                 MultipartUploadWriter(s3_client, S3_BUCKET, index_file_path, part_size, max_in_flight) as index_upload, \
+                 MultipartUploadWriter(s3_client, S3_BUCKET, s3_file_path, part_size, max_in_flight) as data_upload:
+                index_file = io.TextIOWrapper(index_upload, encoding='utf-8')
+                file_size = compact_wikidict(base_file, delta_files, delta_indexes, data_upload, index_file,
+                                             legacy_csv=is_legacy_csv(manifest))
+                # Flush without closing: closing completes the upload
+                index_file.detach()
+        finally:
+            for delta_file in delta_files:
+                delta_file.close()
+
+        verify_upload(s3_file_path, index_file_path, file_size)
+        logger.info(f"✓ Uploaded to s3://{S3_BUCKET}/{s3_file_path}")
+        logger.info(f"✓ Uploaded to s3://{S3_BUCKET}/{index_file_path}")
+
+        manifest['file_path'] = s3_file_path
+        manifest['last_updated_at'] = now.isoformat()
+        manifest['version'] = date_str
+        manifest['index_file_path'] = index_file_path
+        manifest['data_format'] = DATA_FORMAT
+        manifest['file_size'] = file_size
+        manifest['deltas'] = []
+        update_manifest_in_s3(manifest)
+
+        logger.info("✓ Compaction completed successfully!")
+
+    except Exception as e:
+        logger.error(f"✗ Compaction failed: {e}")
+        logger.error("Original files in S3 remain unchanged (no rollback needed)")
+        raise
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Incremental SM-WikiDict build")
+    parser.add_argument('--mode', choices=('delta', 'rewrite'), default='delta',
+                        help="delta: publish the changelog as a delta segment (default); "
+                             "rewrite: merge it into a new full data file")
+    parser.add_argument('--compact', action='store_true', help="Fold all deltas into the base now")
+    parser.add_argument('--max-deltas', type=int, default=DEFAULT_MAX_DELTAS,
+                        help=f"Compact once this many deltas are pending (default: {DEFAULT_MAX_DELTAS})")
+    parser.add_argument('--max-delta-ratio', type=float, default=DEFAULT_MAX_DELTA_RATIO,
+                        help="Compact once the deltas' data exceeds this share of the base "
+                             f"(default: {DEFAULT_MAX_DELTA_RATIO})")
+    args = parser.parse_args()
+
     manifest = load_manifest_from_s3()
 
     # Check if manifest has valid file_path (exists, non-empty, and not just whitespace)
@@ -406,8 +573,17 @@ def main():
     )
 
     if has_valid_file_path:
-        logger.info("Incremental update detected. Building updated wikidict...")
-        build_updated_wikidict(manifest)
+        if args.mode == 'rewrite':
+            if manifest.get('deltas'):
+                build_compacted_wikidict(manifest)
+            logger.info("Incremental update detected. Building updated wikidict...")
+            build_updated_wikidict(manifest)
+            return
+
+        logger.info("Incremental update detected. Building delta...")
+        build_delta(manifest)
+        if args.compact or needs_compaction(manifest, args.max_deltas, args.max_delta_ratio):
+            build_compacted_wikidict(manifest)
     else:
         logger.info("No existing file found in manifest. Triggering full rebuild...")
         subprocess.run(['python', 'scripts/build_wikidict_full.py'], check=True)
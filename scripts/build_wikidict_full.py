@@ -5,10 +5,11 @@ It generates fake data, sorts it, creates an index, and uploads everything to S3
 
 Steps:
  1. Generate fake dataset using Faker module
- 2. Sort the CSV file by title (case-insensitive) using external merge sort
- 3. Create index file (JSON format) for fast byte-range lookups
- 4. Upload data.csv and index.json to S3
- 5. Create and upload manifest.json to S3
+ 2. Sort the CSV file by title (case-insensitive) using external merge sort,
+    sorting chunks in a process pool; the merge writes the binary data file
+    (see record_format.py) and its JSON index in the same pass, streamed to
+    S3 as multipart uploads while it runs (see s3_stream.py)
+ 3. Create and upload manifest.json to S3
 
 Usage:
     python scripts/build_wikidict_full.py [--target-size GB]
@@ -17,19 +18,26 @@ Usage:
 '''
 
 import os
+import io
 import sys
 import json
 import boto3
 import csv
+import struct
 import tempfile
 import heapq
 import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
 import logging
 from dotenv import load_dotenv
 from botocore.exceptions import ClientError
 from faker import Faker
+from record_format import DATA_FORMAT, DATA_FILE_NAME, INDEX_FILE_NAME, IndexWriter, RecordWriter
+from s3_stream import DEFAULT_MAX_IN_FLIGHT, DEFAULT_PART_SIZE, MultipartUploadWriter
 
 load_dotenv()
 
@@ -267,23 +275,70 @@ def generate_unsorted_dataset(output_file, num_rows):
     return True
 
 
-def sort_csv_external(input_file, output_file, chunk_size=100000):
+# Sorted chunk records: lowercased title (the sort key), title and value as
+# UTF-8, each length-prefixed. UTF-8 bytes order like the code points they
+# encode, so the merge compares keys without decoding them.
+CHUNK_RECORD_HEADER = struct.Struct('<III')
+SORT_IO_BUFFER = 1024 * 1024
+
+
+def build_sorted_data(input_file, data_out, index_out, chunk_size=100000, workers=None):
+    """
+    Sort the CSV and write the binary data file and its index in one pass.
+
+    The merge writes records straight to the data file, tracking offsets as
+    it goes, instead of writing a sorted CSV that is then read back (the
+    old two-pass build, kept in benchmarks/legacy_build.py for comparison):
+    the data is written once and never re-read. The outputs can be
+    local files or streaming S3 uploads (s3_stream.MultipartUploadWriter).
+
+    Args:
+        input_file (str): Path to unsorted CSV file
+        data_out (file): Binary file object for the data file
+        index_out (file): Text file object for the index JSON
+        chunk_size (int): Rows per chunk
+        workers (int): Processes sorting chunks (default: CPU count; 1 sorts in-process)
+
+    Returns:
+        int: Data file size in bytes
+    """
+    data_size = 0
+
+    def merge(chunk_files, header):
+        nonlocal data_size
+        row_count, data_size = write_data_and_index(merge_chunk_records(chunk_files), data_out, index_out)
+        logger.info(f"  Total rows written: {row_count:,}")
+        logger.info(f"  Data file size: {data_size / (1024 ** 2):.2f} MB")
+        return data_size
+
+    external_merge_sort(input_file, merge, chunk_size, workers)
+    return data_size
+
+
+def external_merge_sort(input_file, merge, chunk_size=100000, workers=None):
     """
-    Sort CSV file using external merge sort (memory-efficient for large files).
+    Split the input into sorted chunks, then hand them to `merge`.
+
+    Chunks are sorted in parallel by a process pool; the main process only
+    cuts the input into row-aligned byte blocks. Memory use is about
+    (workers + 1) chunks.
 
     Args:
         input_file (str): Path to input CSV file
-        output_file (str): Path to output sorted CSV file
+        merge (callable): merge(chunk_files, header) writes the output and returns its size in bytes
         chunk_size (int): Rows per chunk
+        workers (int): Processes sorting chunks (default: CPU count; 1 sorts in-process)
 
     Returns:
         bool: Success status
     """
     import time
     start_time = time.time()
+    workers = workers or os.cpu_count() or 1
+    input_mb = os.path.getsize(input_file) / (1024 ** 2)
 
     logger.info("Starting external merge sort...")
-    logger.info(f"  Chunk size: {chunk_size:,} rows")
+    logger.info(f"  Chunk size: {chunk_size:,} rows, {workers} worker(s)")
 
     # Create temp directory
     temp_dir = tempfile.mkdtemp(prefix='csv_sort_')
@@ -292,19 +347,23 @@ def sort_csv_external(input_file, output_file, chunk_size=100000):
     try:
         # Phase 1: Split into sorted chunks
         logger.info("Phase 1: Splitting into sorted chunks...")
-        chunk_files, header = split_and_sort_chunks(input_file, temp_dir, chunk_size)
+        chunk_files, header = split_and_sort_chunks(input_file, temp_dir, chunk_size, workers)
 
         phase1_time = time.time() - start_time
-        logger.info(f"✓ Phase 1 completed in {phase1_time:.1f} seconds")
+        logger.info(f"✓ Phase 1 completed in {phase1_time:.1f} seconds "
+                    f"({input_mb / max(phase1_time, 1e-9):.1f} MB/s)")
         logger.info(f"  Created {len(chunk_files)} sorted chunks")
 
         # Phase 2: Merge sorted chunks
         logger.info("Phase 2: Merging sorted chunks...")
-        merge_sorted_chunks(chunk_files, output_file, header)
+        output_size = merge(chunk_files, header)
 
         total_time = time.time() - start_time
-        logger.info(f"✓ Phase 2 completed in {total_time - phase1_time:.1f} seconds")
-        logger.info(f"✓ Total sorting time: {total_time:.1f} seconds ({total_time/60:.1f} minutes)")
+        phase2_time = total_time - phase1_time
+        logger.info(f"✓ Phase 2 completed in {phase2_time:.1f} seconds "
+                    f"({output_size / (1024 ** 2) / max(phase2_time, 1e-9):.1f} MB/s)")
+        logger.info(f"✓ Total sorting time: {total_time:.1f} seconds ({total_time/60:.1f} minutes), "
+                    f"{input_mb / max(total_time, 1e-9):.1f} MB/s")
 
         return True
 
@@ -315,227 +374,242 @@ def sort_csv_external(input_file, output_file, chunk_size=100000):
         shutil.rmtree(temp_dir, ignore_errors=True)
 
 
-def split_and_sort_chunks(input_file, temp_dir, chunk_size):
-    """Split input file into sorted chunks."""
-    chunk_files = []
-    chunk_number = 0
-    header = None
-
-    with open(input_file, 'r', encoding='utf-8') as infile:
-        reader = csv.DictReader(infile)
-        header = reader.fieldnames
-
-        chunk_data = []
-        total_rows = 0
-
-        for row in reader:
-            chunk_data.append(row)
-            total_rows += 1
-
-            if len(chunk_data) >= chunk_size:
-                chunk_file = write_sorted_chunk(chunk_data, temp_dir, chunk_number, header)
-                chunk_files.append(chunk_file)
-                chunk_number += 1
-                logger.info(f"  Created chunk {chunk_number}: {total_rows:,} rows processed")
-                chunk_data = []
-
-        # Write remaining data
-        if chunk_data:
-            chunk_file = write_sorted_chunk(chunk_data, temp_dir, chunk_number, header)
-            chunk_files.append(chunk_file)
-            chunk_number += 1
-            logger.info(f"  Created chunk {chunk_number}: {total_rows:,} rows processed")
-
-    return chunk_files, header
-
-
-def write_sorted_chunk(data, temp_dir, chunk_number, header):
-    """Sort data and write to temp chunk file."""
-    # Sort by title (case-insensitive)
-    data.sort(key=lambda row: row['title'].lower())
+def iter_row_blocks(infile, chunk_size):
+    """
+    Yield (header_line, None) and then raw byte blocks of `chunk_size` CSV rows.
 
-    chunk_file = os.path.join(temp_dir, f'chunk_{chunk_number:04d}.csv')
-    with open(chunk_file, 'w', encoding='utf-8', newline='') as outfile:
-        writer = csv.DictWriter(outfile, fieldnames=header)
-        writer.writeheader()
-        writer.writerows(data)
+    Rows are cut on line ends outside quoted fields: an odd number of quotes
+    so far means the line ends inside a quoted value.
+    """
+    header_line = infile.readline()
+    yield header_line, None
+
+    lines = []
+    rows = 0
+    inside_quotes = False
+    for line in infile:
+        lines.append(line)
+        if line.count(b'"') & 1:
+            inside_quotes = not inside_quotes
+        if inside_quotes:
+            continue
+        rows += 1
+        if rows >= chunk_size:
+            yield b''.join(lines), rows
+            lines = []
+            rows = 0
+    if lines:
+        yield b''.join(lines), rows
+
+
+def sort_chunk(block, columns, chunk_file):
+    """
+    Parse one block of CSV rows, sort it by title (case-insensitive) and write
+    it as binary chunk records. Runs in a worker process.
 
+    Returns:
+        str: chunk_file
+    """
+    title_column, value_column = columns
+    reader = csv.reader(io.StringIO(block.decode('utf-8'), newline=''))
+    rows = [(row[title_column].lower(), row[title_column], row[value_column]) for row in reader if row]
+    # Stable: equal keys keep their input order
+    rows.sort(key=itemgetter(0))
+
+    pack = CHUNK_RECORD_HEADER.pack
+    with open(chunk_file, 'wb', buffering=SORT_IO_BUFFER) as outfile:
+        for key, title, value in rows:
+            key_bytes = key.encode('utf-8')
+            title_bytes = title.encode('utf-8')
+            value_bytes = value.encode('utf-8')
+            outfile.write(pack(len(key_bytes), len(title_bytes), len(value_bytes)))
+            outfile.write(key_bytes)
+            outfile.write(title_bytes)
+            outfile.write(value_bytes)
     return chunk_file
 
 
-def merge_sorted_chunks(chunk_files, output_file, header):
-    """Merge sorted chunks using k-way merge with min-heap."""
-    chunk_readers = []
-    heap = []
+def split_and_sort_chunks(input_file, temp_dir, chunk_size, workers=1):
+    """Split input file into sorted chunks, sorting up to `workers` chunks at once."""
+    chunk_files = []
+    total_rows = 0
+
+    with open(input_file, 'rb', buffering=SORT_IO_BUFFER) as infile:
+        blocks = iter_row_blocks(infile, chunk_size)
+        header_line, _ = next(blocks)
+        header = next(csv.reader([header_line.decode('utf-8')]))
+        columns = (header.index('title'), header.index('value'))
+
+        def chunk_path():
+            return os.path.join(temp_dir, f'chunk_{len(chunk_files):04d}.bin')
+
+        if workers <= 1:
+            for block, rows in blocks:
+                chunk_files.append(sort_chunk(block, columns, chunk_path()))
+                total_rows += rows
+                logger.info(f"  Created chunk {len(chunk_files)}: {total_rows:,} rows processed")
+            return chunk_files, ['title', 'value']
+
+        # At most `workers` blocks wait in the pool besides the one being read
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for block, rows in blocks:
+                path = chunk_path()
+                chunk_files.append(path)
+                pending.append((pool.submit(sort_chunk, block, columns, path), rows))
+                del block
+                if len(pending) >= workers:
+                    future, rows_done = pending.popleft()
+                    future.result()
+                    total_rows += rows_done
+                    logger.info(f"  Sorted chunk: {total_rows:,} rows processed")
+            for future, rows_done in pending:
+                future.result()
+                total_rows += rows_done
+                logger.info(f"  Sorted chunk: {total_rows:,} rows processed")
+
+    return chunk_files, ['title', 'value']
+
+
+def iter_chunk_records(chunk_file):
+    """Yield (key, title, value) byte strings from a sorted chunk file."""
+    header_size = CHUNK_RECORD_HEADER.size
+    unpack = CHUNK_RECORD_HEADER.unpack
+    with open(chunk_file, 'rb', buffering=SORT_IO_BUFFER) as infile:
+        read = infile.read
+        while True:
+            header = read(header_size)
+            if not header:
+                return
+            key_length, title_length, value_length = unpack(header)
+            body = read(key_length + title_length + value_length)
+            title_end = key_length + title_length
+            yield body[:key_length], body[key_length:title_end], body[title_end:]
 
-    try:
-        # Initialize readers and heap
-        for idx, chunk_file in enumerate(chunk_files):
-            reader = csv.DictReader(open(chunk_file, 'r', encoding='utf-8'))
-            chunk_readers.append(reader)
-
-            try:
-                row = next(reader)
-                sort_key = row['title'].lower()
-                heapq.heappush(heap, (sort_key, idx, row))
-            except StopIteration:
-                pass
-
-        # Write merged output
-        total_written = 0
-        with open(output_file, 'w', encoding='utf-8', newline='') as outfile:
-            writer = csv.DictWriter(outfile, fieldnames=header)
-            writer.writeheader()
-
-            while heap:
-                sort_key, chunk_idx, row = heapq.heappop(heap)
-                writer.writerow(row)
-                total_written += 1
-
-                if total_written % 100000 == 0:
-                    logger.info(f"  Merged {total_written:,} rows")
-
-                # Get next row from same chunk
-                try:
-                    next_row = next(chunk_readers[chunk_idx])
-                    next_sort_key = next_row['title'].lower()
-                    heapq.heappush(heap, (next_sort_key, chunk_idx, next_row))
-                except StopIteration:
-                    pass
-
-        logger.info(f"  Total rows merged: {total_written:,}")
 
-    finally:
-        for reader in chunk_readers:
-            if hasattr(reader, 'close'):
-                reader.close()
+def merge_chunk_records(chunk_files):
+    """
+    K-way merge of sorted chunk files.
 
+    Heap entries are (key, chunk index, title, value) tuples: ties on the key
+    are broken by chunk index, i.e. input order, so titles are never compared.
 
-def create_index(csv_file_path, index_file_path):
+    Yields:
+        tuple: (title, value) as UTF-8 bytes
+    """
+    sources = [iter_chunk_records(chunk_file) for chunk_file in chunk_files]
+    heap = []
+    for idx, source in enumerate(sources):
+        record = next(source, None)
+        if record is not None:
+            heap.append((record[0], idx, record[1], record[2]))
+    heapq.heapify(heap)
+
+    while heap:
+        _, idx, title, value = heap[0]
+        yield title, value
+        record = next(sources[idx], None)
+        if record is None:
+            heapq.heappop(heap)
+        else:
+            heapq.heapreplace(heap, (record[0], idx, record[1], record[2]))
+
+
+def write_data_and_index(records, data_out, index_out):
     """
-    Create JSON index file for byte-range lookups.
+    Write sorted (title, value) UTF-8 byte pairs to the binary data file and
+    stream the index entries alongside.
 
     Args:
-        csv_file_path (str): Path to sorted CSV file
-        index_file_path (str): Path to output index JSON file
+        records (iterable): (title, value) byte pairs in sort order
+        data_out (file): Binary file object for the data file
+        index_out (file): Text file object for the index JSON
 
     Returns:
-        bool: Success status
+        tuple: (rows written, data file size in bytes)
     """
-    import time
-    start_time = time.time()
-
-    logger.info("Creating index file...")
-
-    index = {}
+    writer = RecordWriter(data_out)
+    index = IndexWriter(index_out)
+    write_record = writer.write_bytes
+    add_entry = index.add
     row_count = 0
 
-    with open(csv_file_path, 'rb') as f:
-        # Skip header
-        header_line = f.readline()
-        header_end = f.tell()
-        logger.info(f"  Header ends at byte {header_end}")
-
-        while True:
-            row_start = f.tell()
-            raw_line = f.readline()
-
-            if not raw_line:
-                break
-
-            row_end = f.tell()
-            row_length = row_end - row_start
-
-            try:
-                # Parse CSV line to extract title
-                line_str = raw_line.decode('utf-8')
-                import io
-                line_reader = csv.DictReader(io.StringIO('title,value\n' + line_str))
-                row = next(line_reader)
-                key = row['title']
-
-                # Add to index
-                index[key] = {
-                    "offset": row_start,
-                    "length": row_length
-                }
+    for title, value in records:
+        # Index points at the value bytes only
+        value_offset, value_length = write_record(title, value)
+        add_entry(title.decode('utf-8'), value_offset, value_length)
 
-                row_count += 1
+        row_count += 1
+        if row_count % 100000 == 0:
+            logger.info(f"  Wrote {row_count:,} rows...")
 
-                if row_count % 100000 == 0:
-                    logger.info(f"  Indexed {row_count:,} rows...")
+    index.close()
+    return row_count, writer.position
 
-            except Exception as e:
-                logger.warning(f"Error parsing row at position {row_start}: {e}")
-                continue
-
-    # Write index to JSON
-    logger.info(f"Writing index to {index_file_path}...")
-    with open(index_file_path, 'w', encoding='utf-8') as f:
-        json.dump(index, f, ensure_ascii=False, indent=2)
-
-    index_size = os.path.getsize(index_file_path)
-    index_size_mb = index_size / (1024 ** 2)
-
-    elapsed = time.time() - start_time
 
-    logger.info(f"✓ Index created successfully!")
-    logger.info(f"  Total rows indexed: {row_count:,}")
-    logger.info(f"  Index file size: {index_size_mb:.2f} MB")
-    logger.info(f"  Time taken: {elapsed:.1f} seconds")
-
-    return True
-
-
-def upload_to_s3(data_file_path, index_file_path):
+def build_and_upload(input_file, chunk_size, workers, part_size=DEFAULT_PART_SIZE,
+                     max_in_flight=DEFAULT_MAX_IN_FLIGHT):
     """
-    Upload data.csv and index.json to S3.
+    Sort the CSV into data.bin and index.json, streamed to S3 as they are
+    written: parts upload while later rows are still being merged, and
+    neither file is written to local disk.
 
     Args:
-        data_file_path (str): Local path to data.csv
-        index_file_path (str): Local path to index.json
+        input_file (str): Path to unsorted CSV file
+        chunk_size (int): Rows per sorted chunk
+        workers (int): Processes sorting chunks
+        part_size (int): Multipart upload part size in bytes
+        max_in_flight (int): Parts uploading at once per file
 
     Returns:
-        tuple: (s3_data_path, s3_index_path)
+        tuple: (s3_data_path, s3_index_path, data_file_size)
     """
-    logger.info("Uploading files to S3...")
-
     # Generate S3 paths with current date
     date_str = datetime.now().strftime("%Y%m%d")
-    s3_data_path = f"dict/{date_str}/data.csv"
-    s3_index_path = f"dict/{date_str}/index.json"
+    s3_data_path = f"dict/{date_str}/{DATA_FILE_NAME}"
+    s3_index_path = f"dict/{date_str}/{INDEX_FILE_NAME}"
 
-    # Upload data.csv
-    logger.info(f"  Uploading data.csv to s3://{S3_BUCKET}/{s3_data_path}...")
-    s3_client.upload_file(data_file_path, S3_BUCKET, s3_data_path)
+    logger.info(f"  Streaming {DATA_FILE_NAME} to s3://{S3_BUCKET}/{s3_data_path}")
+    logger.info(f"  Streaming {INDEX_FILE_NAME} to s3://{S3_BUCKET}/{s3_index_path}")
+    logger.info(f"  Part size: {part_size / (1024 ** 2):.0f} MB, {max_in_flight} part(s) in flight per file")
 
-    # Upload index.json
-    logger.info(f"  Uploading index.json to s3://{S3_BUCKET}/{s3_index_path}...")
-    s3_client.upload_file(index_file_path, S3_BUCKET, s3_index_path)
+    # Uploads complete when their block exits (data first), or abort on error
+    with MultipartUploadWriter(s3_client, S3_BUCKET, s3_index_path, part_size, max_in_flight) as index_upload, \
+         MultipartUploadWriter(s3_client, S3_BUCKET, s3_data_path, part_size, max_in_flight) as data_upload:
+        index_out = io.TextIOWrapper(index_upload, encoding='utf-8')
+        data_size = build_sorted_data(input_file, data_upload, index_out, chunk_size, workers)
+        # Flush without closing: closing completes the upload
+        index_out.detach()
+
+    logger.info(f"  Uploaded {data_upload.parts} data part(s); "
+                f"merge waited {data_upload.wait_seconds:.1f}s for upload slots")
 
     # Verify uploads
     logger.info("  Verifying uploads...")
     try:
-        s3_client.head_object(Bucket=S3_BUCKET, Key=s3_data_path)
+        uploaded_size = s3_client.head_object(Bucket=S3_BUCKET, Key=s3_data_path)['ContentLength']
         s3_client.head_object(Bucket=S3_BUCKET, Key=s3_index_path)
-        logger.info("✓ Upload verification successful")
     except ClientError:
         logger.error("✗ Upload verification failed!")
         raise
+    if uploaded_size != data_size:
+        raise RuntimeError(f"Uploaded {DATA_FILE_NAME} is {uploaded_size:,} bytes, expected {data_size:,}")
+    logger.info("✓ Upload verification successful")
 
     logger.info(f"✓ Uploaded to s3://{S3_BUCKET}/{s3_data_path}")
     logger.info(f"✓ Uploaded to s3://{S3_BUCKET}/{s3_index_path}")
 
-    return s3_data_path, s3_index_path
+    return s3_data_path, s3_index_path, data_size
 
 
-def create_and_upload_manifest(s3_data_path, s3_index_path):
+def create_and_upload_manifest(s3_data_path, s3_index_path, data_file_size):
     """
     Create manifest.json and upload to S3.
 
     Args:
-        s3_data_path (str): S3 path to data.csv
+        s3_data_path (str): S3 path to data.bin
         s3_index_path (str): S3 path to index.json
+        data_file_size (int): Size of data.bin in bytes (lets the API pick in-memory serving)
 
     Returns:
         bool: Success status
@@ -548,7 +622,10 @@ def create_and_upload_manifest(s3_data_path, s3_index_path):
         "service_author": "Saurabh Maurya",
         "file_path": s3_data_path,
         "index_file_path": s3_index_path,
+        "data_format": DATA_FORMAT,
+        "file_size": data_file_size,
         "changelog_file_path": "",  # Empty for initial setup
+        "deltas": [],  # Delta segments published by build_wikidict.py, oldest first
         "last_updated_at": datetime.now().isoformat(),
         "version": datetime.now().strftime("%Y%m%d")
     }
@@ -592,10 +669,10 @@ def main():
         epilog='''
 This script performs initial setup by:
   1. Generating fake data with Faker
-  2. Sorting the CSV file externally
-  3. Creating byte-range index
-  4. Uploading to S3
-  5. Creating and uploading manifest.json
+  2. Sorting the CSV file externally into the binary data file and
+     byte-range index (one pass, no sorted CSV), uploaded to S3 while
+     they are written
+  3. Creating and uploading manifest.json
 
 Examples:
   # Generate 5GB dataset (default)
@@ -606,6 +683,9 @@ Examples:
 
   # Generate smaller test dataset
   python scripts/build_wikidict_full.py --target-size 1
+
+  # Sort with 8 processes
+  python scripts/build_wikidict_full.py --target-size 10 --sort-workers 8
         '''
     )
 
@@ -616,6 +696,34 @@ Examples:
         help='Target dataset size in GB (default: 5.0)'
     )
 
+    parser.add_argument(
+        '--sort-workers',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='Processes sorting chunks in parallel (default: CPU count)'
+    )
+
+    parser.add_argument(
+        '--chunk-rows',
+        type=int,
+        default=25000,
+        help='Rows per sorted chunk; memory is about (workers + 1) chunks (default: 25000, ~200 MB)'
+    )
+
+    parser.add_argument(
+        '--part-size-mb',
+        type=float,
+        default=DEFAULT_PART_SIZE / (1024 ** 2),
+        help='S3 multipart upload part size in MB, at least 5 (default: 16)'
+    )
+
+    parser.add_argument(
+        '--upload-concurrency',
+        type=int,
+        default=DEFAULT_MAX_IN_FLIGHT,
+        help='Parts uploading at once; upload memory is about part size x (concurrency + 1) (default: 4)'
+    )
+
     args = parser.parse_args()
 
     # Validate AWS credentials
@@ -642,17 +750,17 @@ Examples:
         date_str = datetime.now().strftime("%Y%m%d")
         data_dir = f"data/dict/{date_str}"
         unsorted_file = f"{data_dir}/data_unsorted.csv"
-        sorted_file = f"{data_dir}/data.csv"
-        index_file = f"{data_dir}/index.json"
 
         # Step 1: Generate unsorted dataset
         logger.info("Step 1: Generating fake dataset...")
         generate_unsorted_dataset(unsorted_file, num_rows)
         logger.info("")
 
-        # Step 2: Sort the dataset
-        logger.info("Step 2: Sorting dataset...")
-        sort_csv_external(unsorted_file, sorted_file, chunk_size=100000)
+        # Step 2: Sort straight into the data file and index, streamed to S3
+        logger.info("Step 2: Sorting dataset and streaming data file and index to S3...")
+        s3_data_path, s3_index_path, data_file_size = build_and_upload(
+            unsorted_file, args.chunk_rows, args.sort_workers,
+            part_size=int(args.part_size_mb * 1024 * 1024), max_in_flight=args.upload_concurrency)
         logger.info("")
 
         # Remove unsorted file to save space
@@ -660,19 +768,9 @@ Examples:
         os.remove(unsorted_file)
         logger.info("")
 
-        # Step 3: Create index
-        logger.info("Step 3: Creating index...")
-        create_index(sorted_file, index_file)
-        logger.info("")
-
-        # Step 4: Upload to S3
-        logger.info("Step 4: Uploading to S3...")
-        s3_data_path, s3_index_path = upload_to_s3(sorted_file, index_file)
-        logger.info("")
-
-        # Step 5: Create and upload manifest
-        logger.info("Step 5: Creating and uploading manifest...")
-        create_and_upload_manifest(s3_data_path, s3_index_path)
+        # Step 3: Create and upload manifest
+        logger.info("Step 3: Creating and uploading manifest...")
+        create_and_upload_manifest(s3_data_path, s3_index_path, data_file_size)
         logger.info("")
 
         # Success
@@ -0,0 +1,166 @@
+'''
+SM-WikiDict binary data file format (binary-v1)
+
+The data file is a sequence of length-prefixed records sorted by title
+(case-insensitive), preceded by an 8-byte magic header:
+
+    MAGIC                      b"WDICTv1\n"
+    repeated:
+        title_length           uint32, little-endian
+        title                  UTF-8 bytes
+        value_length           uint32, little-endian
+        value                  UTF-8 bytes
+
+The index maps each title to {"offset", "length"} of the value bytes only,
+so the API fetches exactly the meaning with a single byte-range read - no
+title, no CSV quoting, no post-processing. It is written as compact JSON.
+
+Delta segments (incremental builds, see build_wikidict.py) use the same data
+format. Their index may also map a title to null: the title was deleted.
+
+Changelog and generated source files remain CSV; only the published data
+file uses this format.
+'''
+
+import json
+import struct
+from itertools import islice
+
+DATA_FORMAT = "binary-v1"
+DATA_FILE_NAME = "data.bin"
+INDEX_FILE_NAME = "index.json"
+
+MAGIC = b"WDICTv1\n"
+LENGTH = struct.Struct("<I")
+# Index entries formatted per write by write_indented_index
+INDEX_WRITE_BATCH = 10000
+
+
+class RecordWriter:
+    """
+    Write length-prefixed records and track byte offsets without calling tell().
+    """
+
+    def __init__(self, file_obj):
+        self.file = file_obj
+        self.file.write(MAGIC)
+        self.position = len(MAGIC)
+
+    def write(self, title, value):
+        """
+        Append one record.
+
+        Returns:
+            tuple: (value_offset, value_length) for the index
+        """
+        return self.write_bytes(title.encode('utf-8'), value.encode('utf-8'))
+
+    def write_bytes(self, title_bytes, value_bytes):
+        """Append one record from UTF-8 encoded title and value; see write()."""
+        title_length = len(title_bytes)
+        value_length = len(value_bytes)
+        # Titles are short: one write for both prefixes and the title
+        self.file.write(LENGTH.pack(title_length) + title_bytes + LENGTH.pack(value_length))
+        self.file.write(value_bytes)
+
+        value_offset = self.position + 2 * LENGTH.size + title_length
+        self.position = value_offset + value_length
+        return value_offset, value_length
+
+
+class IndexWriter:
+    """
+    Stream the JSON index in compact form (no indentation), one entry at a
+    time, so the index is never held in memory. A repeated title is written
+    twice; JSON loaders keep the last one, as a dict would.
+    """
+
+    def __init__(self, file_obj):
+        self.file = file_obj
+        self.file.write('{')
+        self.count = 0
+
+    def add(self, title, value_offset, value_length):
+        separator = ',' if self.count else ''
+        self.file.write(f'{separator}{json.dumps(title, ensure_ascii=False)}:'
+                        f'{{"offset":{value_offset},"length":{value_length}}}')
+        self.count += 1
+
+    def delete(self, title):
+        """Record a deletion (delta indexes only): the title maps to null."""
+        separator = ',' if self.count else ''
+        self.file.write(f'{separator}{json.dumps(title, ensure_ascii=False)}:null')
+        self.count += 1
+
+    def close(self):
+        self.file.write('}')
+
+
+def write_indented_index(index, file_obj):
+    """
+    Write {title: (value_offset, value_length)} as JSON with two-space
+    indentation, byte-identical to json.dump(..., ensure_ascii=False, indent=2)
+    of the {"offset", "length"} dicts. json.dump only uses its C encoder
+    without indentation; this formats the entries directly, in batches.
+    """
+    if not index:
+        file_obj.write('{}')
+        return
+
+    encode = json.encoder.encode_basestring
+    items = iter(index.items())
+    separator = '{\n'
+    while True:
+        batch = [f'  {encode(title)}: {{\n    "offset": {offset},\n    "length": {length}\n  }}'
+                 for title, (offset, length) in islice(items, INDEX_WRITE_BATCH)]
+        if not batch:
+            break
+        file_obj.write(separator + ',\n'.join(batch))
+        separator = ',\n'
+    file_obj.write('\n}')
+
+
+def iter_raw_records(file_obj):
+    """
+    Iterate over a binary data file opened in 'rb' mode, without decoding.
+
+    Yields:
+        tuple: (title_bytes, value_bytes)
+
+    Raises:
+        ValueError: bad magic, or a file that ends inside a record
+    """
+    magic = file_obj.read(len(MAGIC))
+    if magic != MAGIC:
+        raise ValueError(f"Not a {DATA_FORMAT} data file (bad magic: {magic!r})")
+
+    read = file_obj.read
+    unpack = LENGTH.unpack_from
+    size = LENGTH.size
+    while True:
+        prefix = read(size)
+        if not prefix:
+            return
+        if len(prefix) != size:
+            raise ValueError(f"Truncated {DATA_FORMAT} record (incomplete title length)")
+        # The title and the value's length prefix in one read
+        title_length = unpack(prefix)[0]
+        title_and_prefix = read(title_length + size)
+        if len(title_and_prefix) != title_length + size:
+            raise ValueError(f"Truncated {DATA_FORMAT} record (incomplete title or value length)")
+        value_length = unpack(title_and_prefix, title_length)[0]
+        value = read(value_length)
+        if len(value) != value_length:
+            raise ValueError(f"Truncated {DATA_FORMAT} record (value is {len(value)} of {value_length} bytes)")
+        yield title_and_prefix[:title_length], value
+
+
+def iter_records(file_obj):
+    """
+    Iterate over a binary data file opened in 'rb' mode.
+
+    Yields:
+        dict: {'title': str, 'value': str}
+    """
+    for title, value in iter_raw_records(file_obj):
+        yield {'title': title.decode('utf-8'), 'value': value.decode('utf-8')}
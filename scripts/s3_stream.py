@@ -0,0 +1,190 @@
+'''
+SM-WikiDict streaming S3 transfers for the build scripts
+
+MultipartUploadWriter is a write-only binary file object that streams what
+is written into an S3 multipart upload: every `part_size` bytes become a part,
+uploaded by a small thread pool while the build keeps merging rows. At most
+`max_in_flight` parts are uploading at once; further writes wait for one of
+them (back-pressure), so memory stays at about part_size x (max_in_flight + 1)
+and nothing is written to local disk.
+
+The object only appears in S3 when close() completes the upload. Leaving a
+`with` block with an exception aborts it instead, so a failed build publishes
+nothing. Objects smaller than one part are sent with a single PutObject.
+
+open_s3_object is the reading side: a buffered, read-only file object over
+the streaming GetObject body.
+'''
+
+import io
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10000
+DEFAULT_PART_SIZE = 16 * 1024 * 1024
+DEFAULT_MAX_IN_FLIGHT = 4
+READ_BUFFER_SIZE = 1024 * 1024
+
+
+class MultipartUploadWriter(io.RawIOBase):
+    """
+    Write-only file object that uploads to s3://bucket/key as it is written.
+
+    Args:
+        s3_client: boto3 S3 client (shared with the upload threads)
+        bucket (str): Bucket name
+        key (str): Object key
+        part_size (int): Bytes per part, at least 5 MB (S3 minimum)
+        max_in_flight (int): Parts uploading at once
+    """
+
+    def __init__(self, s3_client, bucket, key, part_size=DEFAULT_PART_SIZE,
+                 max_in_flight=DEFAULT_MAX_IN_FLIGHT):
+        super().__init__()
+        if part_size < MIN_PART_SIZE:
+            raise ValueError(f"part_size must be at least {MIN_PART_SIZE} bytes")
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.part_size = part_size
+        self.max_in_flight = max(1, max_in_flight)
+        self.bytes_written = 0
+        # Seconds write() spent waiting for a free upload slot
+        self.wait_seconds = 0.0
+        self._buffer = bytearray()
+        self._upload_id = None
+        self._pool = None
+        self._parts = []
+        self._pending = set()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        if self.closed:
+            raise ValueError(f"Upload to s3://{self.bucket}/{self.key} is closed")
+        self._buffer += data
+        self.bytes_written += len(data)
+        if len(self._buffer) >= self.part_size:
+            part = bytes(self._buffer)
+            self._buffer = bytearray()
+            self._submit(part)
+        return len(data)
+
+    def _submit(self, part):
+        if self._upload_id is None:
+            response = self.s3_client.create_multipart_upload(Bucket=self.bucket, Key=self.key)
+            self._upload_id = response['UploadId']
+            self._pool = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix='s3-upload')
+
+        part_number = len(self._parts) + 1
+        if part_number > MAX_PARTS:
+            raise ValueError(f"More than {MAX_PARTS} parts for s3://{self.bucket}/{self.key}; increase part_size")
+
+        # Back-pressure: hold the caller until a slot frees up
+        if len(self._pending) >= self.max_in_flight:
+            start = time.perf_counter()
+            while len(self._pending) >= self.max_in_flight:
+                done, self._pending = wait(self._pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            self.wait_seconds += time.perf_counter() - start
+
+        future = self._pool.submit(self._upload_part, part_number, part)
+        self._parts.append(future)
+        self._pending.add(future)
+
+    def _upload_part(self, part_number, part):
+        response = self.s3_client.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+            PartNumber=part_number, Body=part,
+        )
+        return {'PartNumber': part_number, 'ETag': response['ETag']}
+
+    @property
+    def parts(self):
+        """Parts submitted so far (0 when sent with PutObject)."""
+        return len(self._parts)
+
+    def close(self):
+        """Upload the last part and complete the upload (aborted if that fails)."""
+        if self.closed:
+            return
+        try:
+            if self._upload_id is None:
+                self.s3_client.put_object(Bucket=self.bucket, Key=self.key, Body=bytes(self._buffer))
+            else:
+                if self._buffer:
+                    self._submit(bytes(self._buffer))
+                parts = [future.result() for future in self._parts]
+                self.s3_client.complete_multipart_upload(
+                    Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+                    MultipartUpload={'Parts': parts},
+                )
+        except BaseException:
+            self.abort()
+            raise
+        self._buffer = bytearray()
+        self._shutdown()
+        super().close()
+
+    def abort(self):
+        """Drop the upload: pending parts are cancelled and S3 discards the uploaded ones."""
+        if self.closed:
+            return
+        self._buffer = bytearray()
+        self._shutdown(cancel=True)
+        if self._upload_id is not None:
+            try:
+                self.s3_client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id)
+            except Exception as e:
+                logger.warning(f"Could not abort upload to s3://{self.bucket}/{self.key}: {e}")
+        super().close()
+
+    def _shutdown(self, cancel=False):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=cancel)
+            self._pool = None
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+    def __del__(self):
+        # Never complete a half-written object from the garbage collector
+        if not self.closed:
+            self.abort()
+
+
+class S3ObjectReader(io.RawIOBase):
+    """Unbuffered read-only file object over a GetObject streaming body."""
+
+    def __init__(self, s3_client, bucket, key):
+        super().__init__()
+        response = s3_client.get_object(Bucket=bucket, Key=key)
+        self.size = response['ContentLength']
+        self._body = response['Body']
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._body.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._body.close()
+        super().close()
+
+
+def open_s3_object(s3_client, bucket, key, buffer_size=READ_BUFFER_SIZE):
+    """Open s3://bucket/key for streaming reads (binary, buffered)."""
+    return io.BufferedReader(S3ObjectReader(s3_client, bucket, key), buffer_size)
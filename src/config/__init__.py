@@ -1,5 +1,13 @@
 from src.config.settings import env_settings, app_settings
-from src.config.load_indexes import get_index_loader
 
 __all__ = ["env_settings", "app_settings", "get_index_loader"]
 
+
+def __getattr__(name):
+    # load_indexes depends on src.storage, which itself imports src.config.settings;
+    # importing it lazily keeps `import src.storage` (or src.utils) first from
+    # hitting a partially initialized module.
+    if name == "get_index_loader":
+        from src.config.load_indexes import get_index_loader
+        return get_index_loader
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,165 @@
+'''
+Delta segments over the base index.
+
+Incremental builds (scripts/build_wikidict.py) publish each changelog as a
+delta segment: a small data file and a delta index listed in the manifest's
+`deltas`, oldest first. A delta index maps titles to {"offset", "length"} in
+its own data file, or to null when the title was deleted.
+
+Titles match case-insensitively, as in the full rewrite merge: a changelog row
+for "Apple" replaces the base title "apple", which is then no longer found.
+
+DeltaSegment holds one delta index:
+
+    entries      lowercased title -> (title, entry), where entry is
+                 {"offset", "length", "file_path", "data_format"} (the delta
+                 data file to read), or None (deleted)
+    live_lower   lowercased titles with an entry, sorted, for prefix search
+    live_keys    the same titles, original case, same order
+    all_lower    lowercased titles of every entry, deleted ones included
+
+DeltaOverlay stacks the segments newest first and is consulted before the
+base index: the first segment holding a title (in any case) answers for it,
+with its entry if the spelling matches and as deleted otherwise. Base keys
+(and older segments' keys) with a newer entry are shadowed; autocomplete drops
+them from the older results and merges in each segment's `live_keys`.
+
+Overlays are immutable. Applying a delta (`with_segment`) builds the new
+segment and returns a new overlay sharing the existing ones, in time
+proportional to the delta; readers holding the previous overlay are never
+affected. Compaction folds all segments into the base.
+'''
+
+import bisect
+import heapq
+from itertools import islice
+from typing import Iterable, Optional
+
+# Sorts after any other character, to bound a prefix range
+_PREFIX_END = "\U0010ffff"
+
+# get() default: no segment holds the title (None means deleted)
+MISSING = object()
+
+
+class DeltaSegment:
+    """One delta index, with its titles sorted for prefix search."""
+
+    def __init__(self, delta: dict, index: dict):
+        """
+        Args:
+            delta: The manifest's entry for the delta (file_path, data_format, ...)
+            index: Parsed delta index
+        """
+        self.file_path = delta["file_path"]
+        data_format = delta.get("data_format", "binary-v1")
+        self.entries: dict[str, tuple[str, Optional[dict]]] = {}
+        for key, entry in index.items():
+            if entry is not None:
+                entry = {**entry, "file_path": self.file_path, "data_format": data_format}
+            self.entries[key.lower()] = (key, entry)
+
+        self.live_keys = sorted((key for key, entry in self.entries.values() if entry is not None), key=str.lower)
+        self.live_lower = [key.lower() for key in self.live_keys]
+        self.all_lower = sorted(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def deleted(self) -> int:
+        return len(self.entries) - len(self.live_keys)
+
+    def count_prefix(self, query: str) -> int:
+        """Number of titles, deleted ones included, starting with `query` (case-insensitive)."""
+        prefix = query.lower()
+        return (bisect.bisect_right(self.all_lower, prefix + _PREFIX_END)
+                - bisect.bisect_left(self.all_lower, prefix))
+
+    def prefix_search(self, query: str, limit: int, case_sensitive: bool = False) -> list[str]:
+        """Live titles starting with `query`, in index order, at most `limit`."""
+        prefix = query.lower()
+        start = bisect.bisect_left(self.live_lower, prefix)
+        matches = []
+        for i in range(start, len(self.live_lower)):
+            if len(matches) >= limit or not self.live_lower[i].startswith(prefix):
+                break
+            key = self.live_keys[i]
+            if not case_sensitive or key.startswith(query):
+                matches.append(key)
+        return matches
+
+
+class DeltaOverlay:
+    """Delta segments, newest first; the newest entry of a title wins."""
+
+    def __init__(self, segments: Iterable[DeltaSegment] = ()):
+        """
+        Args:
+            segments: Oldest first, as listed in the manifest
+        """
+        self.segments: tuple[DeltaSegment, ...] = tuple(reversed(tuple(segments)))
+        # Per-segment entries, newest first: the lookup path only probes dicts
+        self.entry_maps = tuple(segment.entries for segment in self.segments)
+
+    @classmethod
+    def from_indexes(cls, deltas: Iterable[tuple[dict, dict]]) -> "DeltaOverlay":
+        """Overlay of (manifest delta entry, parsed delta index) pairs, oldest first."""
+        return cls(DeltaSegment(delta, index) for delta, index in deltas)
+
+    def with_segment(self, delta: dict, index: dict) -> "DeltaOverlay":
+        """New overlay with `delta` on top; this one is left unchanged."""
+        segment = DeltaSegment(delta, index)
+        overlay = DeltaOverlay()
+        overlay.segments = (segment,) + self.segments
+        overlay.entry_maps = (segment.entries,) + self.entry_maps
+        return overlay
+
+    def __bool__(self) -> bool:
+        return bool(self.segments)
+
+    @property
+    def file_paths(self) -> list[str]:
+        """Delta data files, oldest first."""
+        return [segment.file_path for segment in reversed(self.segments)]
+
+    @property
+    def changed(self) -> int:
+        """Entries over all segments (a title changed twice counts twice)."""
+        return sum(len(segment) for segment in self.segments)
+
+    @property
+    def deleted(self) -> int:
+        return sum(segment.deleted for segment in self.segments)
+
+    def get(self, key: str, default=MISSING):
+        """Entry of `key` in the newest segment holding it in any case (None: deleted), else `default`."""
+        lower = key.lower()
+        for entries in self.entry_maps:
+            found = entries.get(lower)
+            if found is not None:
+                # A title spelled differently in a newer segment replaced this one
+                return found[1] if found[0] == key else None
+        return default
+
+    def shadowed_in_prefix(self, query: str) -> int:
+        """Upper bound on the base titles starting with `query` that the segments shadow."""
+        return sum(segment.count_prefix(query) for segment in self.segments)
+
+    def merge_suggestions(self, base: list[str], query: str, limit: int, case_sensitive: bool = False) -> list[str]:
+        """
+        Apply the overlay to base prefix results.
+
+        `base` should hold `limit + shadowed_in_prefix(query)` results so that
+        `limit` remain after dropping shadowed titles.
+        """
+        segments = self.segments
+        runs = [[key for key in base if all(key.lower() not in segment.entries for segment in segments)]]
+        shadowed = 0
+        for i, segment in enumerate(segments):
+            # Titles of older segments are shadowed by the newer ones
+            newer = segments[:i]
+            matches = segment.prefix_search(query, limit + shadowed, case_sensitive)
+            runs.append([key for key in matches if all(key.lower() not in other.entries for other in newer)])
+            shadowed += segment.count_prefix(query)
+        return list(islice(heapq.merge(*runs, key=str.lower), limit))
@@ -5,39 +5,269 @@ This module is responsible for loading and managing indexes used in the applicat
 
 
 '''
-from typing import Optional
-from src.config import  env_settings
-from src.utils import read_json_from_s3, load_index_from_local
+import hashlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+from src.config.settings import app_settings
+from src.config.packed_index import PackedIndex
+from src.config.delta_index import DeltaOverlay
+from src.errors import ServiceUnavailableException
+from src.storage import get_storage_backend, set_storage_backend, load_in_memory_if_small
+from src.metrics import PhaseTimer, observe_index_load
 
+# The index JSON is parsed in chunks of about this size. One json.loads call
+# over the whole file holds the GIL for seconds, which would stall /health
+# while the index loads in the background.
+INDEX_PARSE_CHUNK_BYTES = 1024 * 1024
 
-class IndexLoader:
+# Rough share of the load time spent in each phase, in load order, for the
+# progress percentage. The packed layout runs "packing" instead of "key_lists".
+LOAD_PHASE_WEIGHTS = {
+    "manifest": 2,
+    "data_in_memory": 30,
+    "index_json": 48,
+    "deltas": 2,
+    "key_lists": 13,
+    "storage_check": 5,
+}
+
+
+class IndexLoadState:
+    """Progress of the index load, reported by /ready."""
 
     def __init__(self):
-        print("Loading manifest from S3...")
-        self.manifest = self.load_manifest()
+        self.state = "pending"  # pending | loading | ready | failed
+        self.phase: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.entries: Optional[int] = None
+        self.error: Optional[str] = None
+        self._phase_fraction = 0.0
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == "ready"
+
+    def start(self) -> None:
+        self.state = "loading"
+        self.started_at = time.monotonic()
+        self.finished_at = None
+        self.error = None
+
+    def enter(self, phase: str) -> None:
+        self.phase = phase
+        self._phase_fraction = 0.0
+
+    def advance(self, fraction: float) -> None:
+        """Progress within the current phase, 0..1."""
+        self._phase_fraction = min(max(fraction, 0.0), 1.0)
+
+    def ready(self, entries: int) -> None:
+        self.state = "ready"
+        self.phase = None
+        self.entries = entries
+        self.finished_at = time.monotonic()
+
+    def fail(self, error: Exception) -> None:
+        self.state = "failed"
+        self.error = f"{type(error).__name__}: {error}"
+        self.finished_at = time.monotonic()
+
+    @property
+    def percent(self) -> float:
+        if self.state == "ready":
+            return 100.0
+        current = "key_lists" if self.phase == "packing" else self.phase
+        done = 0.0
+        # Earlier phases are complete (or skipped, e.g. data_in_memory for large files)
+        for phase, weight in LOAD_PHASE_WEIGHTS.items():
+            if phase == current:
+                done += weight * self._phase_fraction
+                break
+            done += weight
+        else:
+            return 0.0
+        return round(min(done / sum(LOAD_PHASE_WEIGHTS.values()) * 100, 99.9), 1)
+
+    def snapshot(self) -> dict:
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = round((self.finished_at or time.monotonic()) - self.started_at, 3)
+        return {
+            "state": self.state,
+            "phase": self.phase,
+            "percent": self.percent,
+            "elapsed_seconds": elapsed,
+            "entries": self.entries,
+            "error": self.error,
+        }
+
+
+def parse_index_json(raw: bytes, on_progress: Optional[Callable[[float], None]] = None) -> dict:
+    """
+    Parse an index JSON object (`{"key": {"offset": .., "length": ..}, ...}`)
+    in chunks of about INDEX_PARSE_CHUNK_BYTES, releasing the GIL in between.
+
+    Chunks end after a `},` entry boundary. A split can only land inside a key
+    containing "},"; the chunk then ends in an unterminated string, fails to
+    parse and is extended to the next boundary.
+    """
+    body_start = raw.index(b"{") + 1
+    body_end = raw.rindex(b"}")
+    size = max(body_end - body_start, 1)
+    indexes = {}
+    start = body_start
+    while start < body_end:
+        end = raw.find(b"},", min(start + INDEX_PARSE_CHUNK_BYTES, body_end))
+        while True:
+            stop = end + 1 if 0 <= end < body_end else body_end
+            try:
+                indexes.update(json.loads(b"{" + raw[start:stop] + b"}"))
+                break
+            except ValueError:
+                if stop == body_end:
+                    raise
+                end = raw.find(b"},", stop)
+        # Skip the comma between entries
+        start = stop + 1
+        if on_progress is not None:
+            on_progress(min(start - body_start, size) / size)
+    return indexes
+
+
+def resolve_index_layout() -> str:
+    """`index.layout` from config; `auto` packs the index when forking workers."""
+    layout = app_settings.index.layout.lower()
+    if layout == "auto":
+        return "packed" if app_settings.workers > 1 else "dict"
+    if layout not in ("dict", "packed"):
+        raise ValueError(f"Unknown index layout '{layout}'. Expected one of: dict, packed, auto")
+    return layout
 
-        print("Loading index from S3...")
-        # self.indexes = load_index_from_local("../data/index.json")
-        self.indexes = self.load_indexes()
 
-        print("Building search index...")
-        # Store original keys (for returning results)
-        self.sorted_keys = list(self.indexes.keys())
-        # Store lowercase keys (for fast case-insensitive search)
-        self.sorted_keys_lower = [k.lower() for k in self.sorted_keys]
+class IndexLoader:
+
+    def __init__(self, layout: Optional[str] = None, start_downloads: bool = True,
+                 load_state: Optional[IndexLoadState] = None):
+        """
+        Args:
+            layout: `dict` or `packed` (see packed_index.py); defaults to config
+            start_downloads: False defers background downloads of the data file
+                until `storage.run_prefetch()` (pre-fork download process)
+            load_state: Updated with the current phase and progress (/ready)
+        """
+        start_time = time.perf_counter()
+        self.layout = layout or resolve_index_layout()
+        self.load_state = load_state
+        # Per-step durations, reported by the server at startup
+        self.phases = PhaseTimer()
+        self.storage = get_storage_backend()
+
+        print(f"Loading manifest from {self.storage.name} storage...")
+        with self.phase("manifest"):
+            self.manifest = self.load_manifest()
+
+        # Data files published before binary-v1 carry no data_format and are CSV
+        self.data_format = self.manifest.get("data_format", "csv")
+
+        # Identifies this index generation in response caches
+        self.generation = self.compute_generation()
+
+        # Small data files are served from one in-memory buffer
+        with self.phase("data_in_memory"):
+            self.storage = self.select_storage()
+
+        # Let the backend start warming the data file (progressive localization)
+        if self.manifest.get("file_path") and self.storage.name != "in-memory":
+            self.storage.prefetch(self.manifest["file_path"], start=start_downloads)
+
+        print(f"Loading index from {self.storage.name} storage...")
+        with self.phase("index_json"):
+            self.indexes = self.load_indexes()
+
+        # Delta segments of incremental builds, looked up before the base index
+        with self.phase("deltas"):
+            self.deltas = self.load_deltas()
+        if self.deltas:
+            print(f"✓ {len(self.deltas.segments)} delta segment(s): {self.deltas.changed:,} changed titles"
+                  f" ({self.deltas.deleted:,} deleted)")
+        # Serializes apply_delta/refresh_deltas; readers never take it
+        self._delta_lock = threading.Lock()
 
-        print(f"✓ Index ready: {len(self.indexes):,} entries")
+        if self.layout == "packed":
+            print("Packing index...")
+            with self.phase("packing"):
+                # The dict is dropped here; lookups and prefix search use the flat buffers
+                self.indexes = PackedIndex(self.indexes)
+            self.sorted_keys = None
+            self.sorted_keys_lower = None
+            print(f"✓ Packed index: {self.indexes.nbytes / (1024 ** 2):,.1f} MB")
+        else:
+            print("Building search index...")
+            with self.phase("key_lists"):
+                # Store original keys (for returning results)
+                self.sorted_keys = list(self.indexes.keys())
+                # Store lowercase keys (for fast case-insensitive search)
+                self.sorted_keys_lower = [k.lower() for k in self.sorted_keys]
+
+        with self.phase("storage_check"):
+            self.check_storage()
+
+        self.load_seconds = time.perf_counter() - start_time
+        observe_index_load(len(self.indexes), self.load_seconds)
+        print(f"✓ Index ready: {len(self.indexes):,} entries in {self.load_seconds:.2f}s")
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a load step and report it as the current phase."""
+        if self.load_state is not None:
+            self.load_state.enter(name)
+        with self.phases.phase(name):
+            yield
 
     def load_manifest(self) -> dict:
         try:
-            return read_json_from_s3(
-                bucket_name=env_settings.bucket_name,
-                file_name="manifest.json"
-            )
+            return self.storage.read_json("manifest.json")
         except Exception as e:
             print(f"Error loading manifest: {e}")
             raise e
     
+    def compute_generation(self) -> str:
+        """
+        Short id of the published manifest.
+
+        `version` is a date, so same-day republishes are told apart by
+        `last_updated_at` and the data file path; delta segments by their paths.
+        """
+        return self._generation_of(self.manifest)
+
+    @staticmethod
+    def _generation_of(manifest: dict) -> str:
+        parts = (
+            manifest.get("version"),
+            manifest.get("last_updated_at"),
+            manifest.get("file_path"),
+            *(delta.get("file_path") for delta in manifest.get("deltas") or ()),
+        )
+        return hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:16]
+
+    def select_storage(self):
+        """Switch to the in-memory data file when it is below the configured threshold."""
+        storage_config = app_settings.storage
+        storage = load_in_memory_if_small(
+            self.storage,
+            self.manifest,
+            max_bytes=storage_config.in_memory_max_bytes,
+            compression=storage_config.in_memory_compression,
+            block_size=storage_config.in_memory_block_size,
+        )
+        if storage is not self.storage:
+            set_storage_backend(storage)
+        return storage
+
     def load_indexes(self) -> dict:
         index_key = self.manifest["index_file_path"]
 
@@ -45,15 +275,102 @@ class IndexLoader:
             raise ValueError("Index file path not found in manifest.")
 
         try:
-            return read_json_from_s3(
-                bucket_name=env_settings.bucket_name,
-                file_name=index_key
-            )
+            raw = self.storage.read_bytes(index_key)
+            on_progress = self.load_state.advance if self.load_state is not None else None
+            return parse_index_json(raw, on_progress)
         except Exception as e:
-            print(f"Error loading index from S3: {e}")
+            print(f"Error loading index from {self.storage.name} storage: {e}")
             raise e
 
+    def load_deltas(self) -> DeltaOverlay:
+        """Parse the delta indexes listed in the manifest (oldest first) into one overlay."""
+        deltas = self.manifest.get("deltas") or []
+        segments = []
+        for i, delta in enumerate(deltas):
+            try:
+                raw = self.storage.read_bytes(delta["index_file_path"])
+                segments.append((delta, parse_index_json(raw)))
+            except Exception as e:
+                print(f"Error loading delta index {delta.get('index_file_path')}: {e}")
+                raise e
+            if self.load_state is not None:
+                self.load_state.advance((i + 1) / len(deltas))
+        return DeltaOverlay.from_indexes(segments)
+
+    def apply_delta(self, delta: dict, index: Optional[dict] = None, manifest: Optional[dict] = None) -> bool:
+        """
+        Apply a delta published after this index was loaded, without reloading.
+
+        Builds a new overlay with the delta on top (time proportional to the
+        delta, see delta_index.py) and swaps it in. The overlay is installed
+        before the generation: a request that reads the new generation sees
+        the new entries, so response caches never store old meanings under it.
+
+        Args:
+            delta: The manifest's entry for the delta
+            index: Parsed delta index; read from storage when omitted
+            manifest: Published manifest ending with this delta, adopted as
+                the loaded one; by default the delta is appended to it
+
+        Returns:
+            False when the delta was already applied
+        """
+        with self._delta_lock:
+            if delta["file_path"] in self.deltas.file_paths:
+                return False
+            if index is None:
+                index = parse_index_json(self.storage.read_bytes(delta["index_file_path"]))
+            deltas = self.deltas.with_segment(delta, index)
+            if manifest is None:
+                manifest = {**self.manifest, "deltas": [*(self.manifest.get("deltas") or []), delta]}
+            generation = self._generation_of(manifest)
+
+            self.manifest = manifest
+            self.deltas = deltas
+            self.generation = generation
+        print(f"✓ Applied delta {delta['file_path']}: {len(index):,} changed titles")
+        return True
+
+    def refresh_deltas(self) -> dict:
+        """
+        Apply the deltas the published manifest lists beyond the loaded ones.
+
+        A manifest with a different base (a full build or a compaction) cannot
+        be applied on top of this index; it is reported as `reload_required`.
+        """
+        manifest = self.load_manifest()
+        published = manifest.get("deltas") or []
+        loaded = self.manifest.get("deltas") or []
+        same_base = (manifest.get("file_path") == self.manifest.get("file_path")
+                     and manifest.get("index_file_path") == self.manifest.get("index_file_path"))
+        loaded_paths = [delta["file_path"] for delta in loaded]
+        if not same_base or [delta["file_path"] for delta in published[:len(loaded)]] != loaded_paths:
+            return {"status": "reload_required", "applied": 0, "generation": self.generation}
+
+        applied = 0
+        for count in range(len(loaded) + 1, len(published) + 1):
+            applied += self.apply_delta(published[count - 1], manifest={**manifest, "deltas": published[:count]})
+        return {"status": "updated" if applied else "current", "applied": applied, "generation": self.generation}
+
+    def check_storage(self) -> None:
+        """Read one byte of the data file so a broken backend fails the load, not the first request."""
+        data_key = self.manifest.get("file_path")
+        if data_key:
+            self.storage.read_range(data_key, 0, 1)
+
     def get_value_by_key(self, key: str) -> Optional[dict]:
+        """
+        Index entry of `key`, newest delta first. Delta entries carry the
+        `file_path` and `data_format` of their data file.
+        """
+        # Inlined DeltaOverlay.get: this is the /search hot path
+        entry_maps = self.deltas.entry_maps
+        if entry_maps:
+            lower = key.lower()
+            for entries in entry_maps:
+                found = entries.get(lower)
+                if found is not None:
+                    return found[1] if found[0] == key else None
         return self.indexes.get(key, None)
     
     def autosuggest_keys(self, query: str, max_suggestions: int = 10, case_sensitive: bool = False) -> list[str]:
@@ -61,6 +378,18 @@ class IndexLoader:
         if not query:
             return []
 
+        deltas = self.deltas
+        if not deltas:
+            return self._base_suggestions(query, max_suggestions, case_sensitive)
+        # Over-fetch by the titles the deltas shadow, then merge in the deltas' own
+        base = self._base_suggestions(query, max_suggestions + deltas.shadowed_in_prefix(query), case_sensitive)
+        return deltas.merge_suggestions(base, query, max_suggestions, case_sensitive)
+
+    def _base_suggestions(self, query: str, max_suggestions: int, case_sensitive: bool) -> list[str]:
+        """Prefix search over the base index only."""
+        if self.layout == "packed":
+            return self.indexes.prefix_search(query, max_suggestions, case_sensitive)
+
         suggestions = []
         query_to_check = query if case_sensitive else query.lower()
         keys_to_search = self.sorted_keys if case_sensitive else self.sorted_keys_lower
@@ -88,19 +417,98 @@ class IndexLoader:
 
 # Lazy initialization - don't create instance at module load
 _index_loader: Optional[IndexLoader] = None
+_load_state = IndexLoadState()
 
 
 def get_index_loader() -> IndexLoader:
     """
     Get or create the singleton IndexLoader instance.
     This lazy initialization allows for proper error handling during startup.
+
+    Raises:
+        ServiceUnavailableException: While the index loads in the background,
+            or after a background load failed
     """
     global _index_loader
     if _index_loader is None:
-        _index_loader = IndexLoader()
+        if _load_state.state == "loading":
+            raise ServiceUnavailableException(
+                detail=f"Index is loading ({_load_state.phase}, {_load_state.percent}%)"
+            )
+        if _load_state.state == "failed":
+            raise ServiceUnavailableException(detail="Index failed to load")
+        _load_state.start()
+        try:
+            loader = IndexLoader(load_state=_load_state)
+        except Exception as e:
+            _load_state.fail(e)
+            raise
+        set_index_loader(loader)
     return _index_loader
 
 
+def set_index_loader(loader: Optional[IndexLoader]) -> None:
+    """Install an already built loader (background load, pre-fork master, benchmarks)."""
+    global _index_loader
+    _index_loader = loader
+    if loader is not None:
+        _load_state.ready(len(loader.indexes))
+
+
+def get_index_load_state() -> IndexLoadState:
+    return _load_state
+
+
+def load_index_in_background(on_loaded: Optional[Callable[[IndexLoader], None]] = None) -> threading.Thread:
+    """
+    Load the index in a thread so the server answers /health meanwhile.
+
+    `on_loaded(loader)` runs in the thread once the loader is installed.
+    """
+    _load_state.start()
+
+    def run():
+        try:
+            loader = IndexLoader(load_state=_load_state)
+        except Exception as e:
+            _load_state.fail(e)
+            print(f"✗ Failed to load index: {e}")
+            return
+        set_index_loader(loader)
+        if on_loaded is not None:
+            on_loaded(loader)
+
+    thread = threading.Thread(target=run, name="index-load", daemon=True)
+    thread.start()
+    return thread
+
+
+def poll_deltas(interval: float) -> threading.Thread:
+    """
+    Apply newly published deltas to the installed loader every `interval`
+    seconds, in a daemon thread (per worker). Requests keep being served.
+    """
+    def run():
+        last_status = None
+        while True:
+            time.sleep(interval)
+            loader = _index_loader
+            if loader is None:
+                continue
+            try:
+                status = loader.refresh_deltas()["status"]
+            except Exception as e:
+                print(f"✗ Delta refresh failed: {e}")
+                continue
+            if status == "reload_required" and last_status != status:
+                print("⚠ Published manifest has a new base index; restart to load it")
+            last_status = status
+
+    thread = threading.Thread(target=run, name="delta-poll", daemon=True)
+    thread.start()
+    return thread
+
+
 if __name__ == "__main__":
     # Get the loader instance
     loader = get_index_loader()
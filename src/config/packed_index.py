@@ -0,0 +1,170 @@
+'''
+Packed, copy-on-write friendly index layout.
+
+The JSON index loads as a dict of `key -> {"offset", "length"}`: three to
+five Python objects per entry, each with a reference count. After a fork,
+every lookup or GC pass that touches one of them writes to its page, so each
+worker slowly ends up with a private copy of the whole index.
+
+PackedIndex keeps the same data in a handful of flat buffers:
+
+    key_bytes   UTF-8 keys in index order (sorted case-insensitively), each
+                followed by a NUL byte so a run of keys decodes in one call
+    key_starts  start of key i in `key_bytes` (n + 1 entries)
+    lower_bytes lowercased keys, same order, for prefix search
+    lower_starts
+    offsets     data file offset of entry i
+    lengths     value length of entry i
+    slots       open-addressing hash table of entry numbers (+1, 0 = empty)
+
+Lookups slice these buffers and create only short-lived objects, so the pages
+stay shared between workers forked after loading.
+
+The hash table uses Python's `hash()`, which is randomized per interpreter:
+a PackedIndex is valid in the process that built it and its forks, and is
+never persisted.
+'''
+
+from array import array
+from typing import Iterator, Optional
+
+
+def _offsets_array(max_value: int) -> array:
+    """Unsigned array wide enough for `max_value`: 4 bytes when possible, else 8."""
+    return array("I") if max_value < 2 ** 32 else array("Q")
+
+
+class PackedIndex:
+    """Read-only mapping of key -> {"offset", "length"} in flat buffers."""
+
+    def __init__(self, indexes: dict):
+        count = len(indexes)
+        keys = bytearray()
+        lower = bytearray()
+        key_starts = []
+        lower_starts = []
+        offsets = []
+        lengths = []
+
+        for key, entry in indexes.items():
+            encoded = key.encode("utf-8")
+            if b"\0" in encoded:
+                raise ValueError(f"Index keys cannot contain NUL: {key!r}")
+            key_starts.append(len(keys))
+            keys += encoded
+            keys += b"\0"
+            lower_starts.append(len(lower))
+            lower += key.lower().encode("utf-8")
+            offsets.append(entry["offset"])
+            lengths.append(entry["length"])
+        key_starts.append(len(keys))
+        lower_starts.append(len(lower))
+
+        self.key_bytes = bytes(keys)
+        self.lower_bytes = bytes(lower)
+        self.key_starts = _offsets_array(len(keys))
+        self.key_starts.extend(key_starts)
+        self.lower_starts = _offsets_array(len(lower))
+        self.lower_starts.extend(lower_starts)
+        self.offsets = _offsets_array(max(offsets, default=0))
+        self.offsets.extend(offsets)
+        self.lengths = _offsets_array(max(lengths, default=0))
+        self.lengths.extend(lengths)
+        del keys, lower, key_starts, lower_starts, offsets, lengths
+
+        # Power-of-two table at most half full: short linear probes
+        size = 1
+        while size < count * 2:
+            size *= 2
+        self._mask = size - 1
+        self.slots = _offsets_array(count + 1)
+        self.slots.frombytes(bytes(size * self.slots.itemsize))
+        for i, key in enumerate(indexes):
+            slot = hash(key) & self._mask
+            while self.slots[slot]:
+                slot = (slot + 1) & self._mask
+            self.slots[slot] = i + 1
+        self._count = count
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the buffers."""
+        arrays = (self.key_starts, self.lower_starts, self.offsets, self.lengths, self.slots)
+        return len(self.key_bytes) + len(self.lower_bytes) + sum(len(a) * a.itemsize for a in arrays)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def key_at(self, i: int) -> str:
+        return self.key_bytes[self.key_starts[i]:self.key_starts[i + 1] - 1].decode("utf-8")
+
+    def _find(self, key: str) -> int:
+        """Entry number of `key`, or -1."""
+        # The separator is part of the match, so "app" does not match "apple"
+        encoded = key.encode("utf-8") + b"\0"
+        keys, starts, slots, mask = self.key_bytes, self.key_starts, self.slots, self._mask
+        slot = hash(key) & mask
+        while True:
+            entry = slots[slot]
+            if not entry:
+                return -1
+            i = entry - 1
+            if keys.startswith(encoded, starts[i]):
+                return i
+            slot = (slot + 1) & mask
+
+    def get(self, key: str, default=None) -> Optional[dict]:
+        i = self._find(key)
+        if i < 0:
+            return default
+        return {"offset": self.offsets[i], "length": self.lengths[i]}
+
+    def __getitem__(self, key: str) -> dict:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self._find(key) >= 0
+
+    def keys(self) -> Iterator[str]:
+        """Keys in index order, decoded one at a time."""
+        for i in range(self._count):
+            yield self.key_at(i)
+
+    def __iter__(self) -> Iterator[str]:
+        return self.keys()
+
+    def prefix_search(self, query: str, limit: int, case_sensitive: bool = False) -> list[str]:
+        """Keys starting with `query` in index order, at most `limit`."""
+        prefix = query.lower().encode("utf-8")
+        lower, starts, count = self.lower_bytes, self.lower_starts, self._count
+
+        # Binary search for the first lowercased key >= prefix
+        low, high = 0, count
+        while low < high:
+            mid = (low + high) // 2
+            if lower[starts[mid]:starts[mid + 1]] < prefix:
+                low = mid + 1
+            else:
+                high = mid
+
+        # Like the dict layout, look at no more than `limit` keys past the match.
+        # Matches are contiguous: binary search for the end of the run.
+        end, high = low, min(low + limit, count)
+        while end < high:
+            mid = (end + high) // 2
+            if lower.startswith(prefix, starts[mid], starts[mid + 1]):
+                end = mid + 1
+            else:
+                high = mid
+        if end == low:
+            return []
+
+        key_starts = self.key_starts
+        suggestions = self.key_bytes[key_starts[low]:key_starts[end] - 1].decode("utf-8").split("\0")
+        if case_sensitive:
+            # Case-sensitive matches are a subset of the case-insensitive run
+            suggestions = [key for key in suggestions if key.startswith(query)]
+        return suggestions
@@ -1,17 +1,23 @@
+import os
+import time
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict, YamlConfigSettingsSource
 from pathlib import Path
-from typing import Tuple, Type
+from typing import Optional, Tuple, Type
 
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 ENV_FILE_PATH = PROJECT_ROOT / ".env"
-CONFIG_FILE_PATH = PROJECT_ROOT / "config.yaml"
+# WIKIDICT_CONFIG points at an alternative config file (e.g. for benchmarks)
+CONFIG_FILE_PATH = Path(os.environ.get("WIKIDICT_CONFIG", PROJECT_ROOT / "config.yaml"))
 
 class EnvSettings(BaseSettings):
-    access_key: str = Field(alias="AWS_ACCESS_KEY")
-    secret_key: str = Field(alias="AWS_SECRET_KEY")
-    region: str = Field(alias="AWS_REGION")
-    bucket_name: str = Field(alias="AWS_BUCKET_NAME")
+    # Only required by the S3 storage backend
+    access_key: Optional[str] = Field(None, alias="AWS_ACCESS_KEY")
+    secret_key: Optional[str] = Field(None, alias="AWS_SECRET_KEY")
+    region: Optional[str] = Field(None, alias="AWS_REGION")
+    bucket_name: Optional[str] = Field(None, alias="AWS_BUCKET_NAME")
+    # Admin endpoints (e.g. /admin/profile) are disabled unless this is set
+    admin_token: Optional[str] = Field(None, alias="ADMIN_TOKEN")
 
     model_config = SettingsConfigDict(
         env_file=str(ENV_FILE_PATH),
@@ -34,6 +40,70 @@ class CacheConfig(BaseModel):
     """LRU cache configuration for S3 meaning lookups."""
     max_size: int = 10000  # Default: 10,000 entries (~80 MB)
     enabled: bool = True
+    stale_max_size: int = 10000  # Last-known meanings by word, served while storage is down (0 disables)
+    response_enabled: bool = True  # Full /search response bodies keyed by (word, index generation)
+    response_max_entries: int = 10000
+    response_max_bytes: int = 128 * 1024 * 1024  # Raw + compressed body bytes
+
+class CompressionConfig(BaseModel):
+    """Response compression and precompressed body cache configuration."""
+    enabled: bool = True
+    minimum_size: int = 500  # Bodies smaller than this are sent uncompressed
+    level: int = 6  # gzip/brotli level used for cached bodies
+
+class HedgingConfig(BaseModel):
+    """Duplicate slow S3 range reads after a rolling latency percentile."""
+    enabled: bool = True
+    percentile: float = 95.0  # Hedge reads slower than this percentile
+    budget: float = 0.05  # At most 5% of reads are hedged
+    min_delay_ms: float = 10.0  # Never hedge earlier than this
+    initial_delay_ms: float = 100.0  # Delay used until enough samples exist
+    window: int = 1000  # Recent reads used to compute the percentile
+
+class HttpCacheConfig(BaseModel):
+    """ETag / Cache-Control headers for /search and /autocomplete."""
+    enabled: bool = True
+    search_max_age: int = 3600  # Browser lifetime (seconds)
+    autocomplete_max_age: int = 300
+    shared_max_age: Optional[int] = 86400  # s-maxage for CDNs; None omits it
+
+class ServerTimingConfig(BaseModel):
+    """Server-Timing header on /search and /autocomplete."""
+    enabled: bool = False  # Always emit the header
+    request_header: Optional[str] = "X-Server-Timing"  # Per-request opt-in header; None disables
+
+class ProfilingConfig(BaseModel):
+    """On-demand stack sampling via POST /admin/profile (requires ADMIN_TOKEN)."""
+    interval_ms: float = 10.0  # Sampling period (100 Hz)
+    max_seconds: int = 120  # Longest profile a single request may ask for
+
+class IndexConfig(BaseModel):
+    """In-memory layout of the word index."""
+    layout: str = "auto"  # dict | packed | auto (packed when workers > 1)
+    background_load: bool = True  # Serve /health while loading; /ready reports progress
+    delta_poll_seconds: float = 0.0  # Apply newly published delta segments this often (0 disables)
+
+class CircuitBreakerConfig(BaseModel):
+    """Fail fast on storage outages instead of queueing behind retries."""
+    enabled: bool = True
+    failure_rate: float = 0.5  # Open when half of the recent reads fail
+    min_calls: int = 20  # Reads needed in the window before evaluating
+    window: int = 100  # Recent reads considered
+    open_seconds: float = 30.0  # Fail fast for this long, then probe
+    half_open_probes: int = 3  # Successful probes needed to close again
+
+class StorageConfig(BaseModel):
+    """Where manifest, index and data files are read from."""
+    backend: str = "s3"  # s3 | local | memory | progressive
+    local_root: str = "data"  # Bucket mirror for local/memory, download target for progressive
+    use_mmap: bool = False  # local backend: mmap instead of os.pread
+    download_range_size: int = 16 * 1024 * 1024  # progressive: bytes per background range GET
+    download_concurrency: int = 4  # progressive: parallel range downloads
+    in_memory_max_bytes: int = 512 * 1024 * 1024  # Hold smaller data files in memory (0 disables)
+    in_memory_compression: str = "none"  # none | zlib (per block)
+    in_memory_block_size: int = 256 * 1024  # zlib block size
+    hedging: HedgingConfig = Field(default_factory=HedgingConfig)
+    circuit_breaker: CircuitBreakerConfig = Field(default_factory=CircuitBreakerConfig)
 
 class AppSettings(BaseSettings):
     service_name: str
@@ -42,12 +112,19 @@ class AppSettings(BaseSettings):
     environment: str
     host: str
     port: int
+    workers: int = 1  # >1: `python -m src.server` forks workers after loading the index
     debug: bool
     api_prefix: str
     cors_origins: list[str]
     logging: LoggingConfig
     autosuggest: AutoSuggestConfig
     cache: CacheConfig = Field(default_factory=CacheConfig)  # Optional with defaults
+    compression: CompressionConfig = Field(default_factory=CompressionConfig)
+    http_cache: HttpCacheConfig = Field(default_factory=HttpCacheConfig)
+    server_timing: ServerTimingConfig = Field(default_factory=ServerTimingConfig)
+    profiling: ProfilingConfig = Field(default_factory=ProfilingConfig)
+    index: IndexConfig = Field(default_factory=IndexConfig)
+    storage: StorageConfig = Field(default_factory=StorageConfig)
     base_url: str
 
     model_config = SettingsConfigDict(
@@ -72,6 +149,41 @@ class AppSettings(BaseSettings):
         )
     
 
-# Instantiate settings
-env_settings = EnvSettings()
-app_settings = AppSettings()
+class LazySettings:
+    """
+    Settings object built on first attribute access.
+
+    Importing this module (or anything that imports it) reads neither
+    config.yaml nor .env; the file is parsed the first time a value is used.
+    `load_seconds` records how long that took for the startup report.
+    """
+
+    def __init__(self, settings_cls: Type[BaseSettings]):
+        object.__setattr__(self, "_settings_cls", settings_cls)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "load_seconds", None)
+
+    def load(self) -> BaseSettings:
+        if self._instance is None:
+            start = time.perf_counter()
+            object.__setattr__(self, "_instance", self._settings_cls())
+            object.__setattr__(self, "load_seconds", time.perf_counter() - start)
+        return self._instance
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.load(), name, value)
+
+    def __repr__(self) -> str:
+        return repr(self._instance) if self.loaded else f"<{self._settings_cls.__name__} (not loaded)>"
+
+
+# Settings are parsed on first use
+env_settings = LazySettings(EnvSettings)
+app_settings = LazySettings(AppSettings)
@@ -1,6 +1,7 @@
+from src.controller.admin_controller import router as admin_router
 from src.controller.health_controller import router as health_router
 from src.controller.search_controller import router as search_router
 
 
 
-__all__ = ["health_router", "search_router"]
+__all__ = ["admin_router", "health_router", "search_router"]
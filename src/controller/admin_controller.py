@@ -0,0 +1,106 @@
+"""
+Admin Controller - Operational endpoints behind the admin token
+"""
+
+import asyncio
+import hmac
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from src.config import app_settings, env_settings, get_index_loader
+from src.errors import (
+    BadRequestException,
+    ConflictException,
+    ErrorResponse,
+    ForbiddenException,
+    UnauthorizedException,
+)
+from src.profiling import start_profile, stop_profile
+
+
+async def require_admin_token(x_admin_token: Optional[str] = Header(None, description="Value of ADMIN_TOKEN")):
+    """Reject the request unless X-Admin-Token matches the ADMIN_TOKEN env var."""
+    if not env_settings.admin_token:
+        raise ForbiddenException(detail="Admin endpoints are disabled: ADMIN_TOKEN is not set")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, env_settings.admin_token):
+        raise UnauthorizedException(detail="Missing or invalid X-Admin-Token header")
+
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin_token)])
+
+
+@router.post(
+    "/profile",
+    responses={
+        200: {"description": "Collapsed stacks (text) or a JSON summary"},
+        400: {"description": "Invalid duration", "model": ErrorResponse},
+        401: {"description": "Missing or invalid admin token", "model": ErrorResponse},
+        403: {"description": "Admin endpoints disabled", "model": ErrorResponse},
+        409: {"description": "A profile is already running in this worker", "model": ErrorResponse},
+    }
+)
+async def profile(
+    seconds: float = Query(default=30, gt=0, description="How long to sample"),
+    slow_ms: Optional[float] = Query(default=None, gt=0, description="Only keep samples taken during requests slower than this"),
+    idle: bool = Query(default=False, description="Include threads waiting for work"),
+    format: str = Query(default="collapsed", pattern="^(collapsed|json)$", description="collapsed | json"),
+):
+    """
+    Sample the Python stacks of every thread in this worker for `seconds`.
+
+    The default response is a collapsed-stack file for flamegraph.pl or
+    speedscope. `format=json` returns the same stacks with the sample counts
+    and, with `slow_ms`, the slow requests seen (request ID, route, duration
+    and stage timings). Requests keep being served while sampling; with
+    several workers, only the worker that receives this request is profiled.
+    """
+    max_seconds = app_settings.profiling.max_seconds
+    if seconds > max_seconds:
+        raise BadRequestException(detail=f"seconds must be at most {max_seconds}")
+
+    sampler = start_profile(app_settings.profiling.interval_ms / 1000, slow_ms=slow_ms, include_idle=idle)
+    if sampler is None:
+        raise ConflictException(detail="A profile is already running in this worker")
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        stop_profile(sampler)
+
+    stacks = sampler.collapsed()
+    if format == "json":
+        return {**sampler.summary(), "stacks": stacks}
+
+    filename = f"profile-{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.collapsed"
+    summary = sampler.summary()
+    return PlainTextResponse(
+        stacks,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Profile-Samples": str(summary["kept_samples"]),
+            "X-Slow-Requests": str(len(summary["slow_requests"])),
+        },
+    )
+
+
+@router.post(
+    "/index/refresh",
+    responses={
+        200: {"description": "Refresh result: updated, current or reload_required"},
+        401: {"description": "Missing or invalid admin token", "model": ErrorResponse},
+        403: {"description": "Admin endpoints disabled", "model": ErrorResponse},
+        503: {"description": "Index not loaded yet", "model": ErrorResponse},
+    }
+)
+async def refresh_index():
+    """
+    Apply the delta segments published since the index was loaded, in place.
+
+    Returns `status` (`updated`, `current`, or `reload_required` when the
+    manifest points at a new base index), the number of deltas applied and
+    the index generation. With several workers, only the worker that receives
+    this request is refreshed; `index.delta_poll_seconds` refreshes them all.
+    """
+    # Reads the manifest and delta indexes from storage
+    return await run_in_threadpool(get_index_loader().refresh_deltas)
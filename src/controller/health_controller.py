@@ -3,54 +3,107 @@ Health Controller - Health check endpoints
 """
 
 from fastapi import APIRouter
-from src.models import HealthResponse
+from fastapi.responses import Response
+from starlette import status
+from src.config.load_indexes import get_index_load_state
+from src.metrics import render_metrics
+from src.models import HealthResponse, ReadinessResponse
+from src.storage import get_storage_backend
+from src.utils import get_last_known_meanings, get_meaning_reader, get_search_responses
 
 router = APIRouter(prefix="", tags=["Health"])
 
 
 @router.get("/health", response_model=HealthResponse)
-async def health_check():
+async def health_check(response: Response):
     """
     Liveness probe - checks if the application is running.
 
     Use for Kubernetes livenessProbe.
     If this fails, Kubernetes will restart the container.
 
+    Stays healthy while the index loads in the background; returns 503 once
+    the load has failed, so the pod is restarted.
+
     Returns:
         HealthResponse: Service health status
     """
+    healthy = get_index_load_state().state != "failed"
+    if not healthy:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
     return HealthResponse(
-        status="healthy",
+        status="healthy" if healthy else "unhealthy",
         service="sm-wikidict",
         version="1.0.0"
     )
 
 
-@router.get("/ready", response_model=HealthResponse)
-async def readiness_check():
+@router.get("/ready", response_model=ReadinessResponse)
+async def readiness_check(response: Response):
     """
     Readiness probe - checks if the application is ready to serve traffic.
 
     Use for Kubernetes readinessProbe.
     If this fails, Kubernetes will stop sending traffic to this pod.
 
-    Add dependency checks here (database, cache, external services).
+    Ready once the index is loaded and a read of the data file through the
+    storage backend has succeeded. Until then returns 503 with the load
+    phase, an estimated percentage and the elapsed time.
 
     Returns:
-        HealthResponse: Service readiness status
+        ReadinessResponse: Service readiness status and index load progress
     """
+    load_state = get_index_load_state()
+    if not load_state.is_ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return ReadinessResponse(
+        status="ready" if load_state.is_ready else load_state.state,
+        service="sm-wikidict",
+        version="1.0.0",
+        index=load_state.snapshot(),
+    )
 
-    # check connection with S3
 
-    # check index status
-    
+@router.get("/storage/stats")
+async def storage_stats():
+    """
+    Storage backend counters.
 
+    For the progressive backend this includes download progress per data file
+    and how many reads were served locally vs from S3; for S3 the circuit
+    breaker state.
+    """
+    return get_storage_backend().stats()
 
-    return HealthResponse(
-        status="ready",
-        service="sm-wikidict",
-        version="1.0.0"
-    )
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus metrics: request and stage latency histograms, cache lookups,
+    S3 requests/bytes by result code and index gauges (all workers when
+    PROMETHEUS_MULTIPROC_DIR is set).
+    """
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """
+    In-process cache layers: full /search responses, meanings by byte range,
+    and last-known meanings kept for storage outages.
+    """
+    reader = get_meaning_reader()
+    meaning_cache = {"enabled": hasattr(reader, "cache_info")}
+    if meaning_cache["enabled"]:
+        info = reader.cache_info()
+        meaning_cache.update(entries=info.currsize, max_entries=info.maxsize, hits=info.hits, misses=info.misses)
+
+    return {
+        "responses": get_search_responses().stats(),
+        "meanings": meaning_cache,
+        "stale_meanings": get_last_known_meanings().stats(),
+    }
 
 
 @router.get("/")
@@ -1,20 +1,111 @@
-from typing import Union
+from typing import Optional, Union
 from fastapi import APIRouter, Request, Query
-from src.errors import NotFoundException, BadRequestException, ErrorResponse
-from src.config import get_index_loader
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+from src.errors import (
+    NotFoundException,
+    BadRequestException,
+    ErrorResponse,
+    ServiceUnavailableException,
+)
+from src.config import get_index_loader, app_settings
+from src.metrics import StageTimer, observe_cache_lookup
 from src.models import SuccessResponse, SearchMeaning, AutocompleteItem
-from src.utils import read_meaning_from_s3
-from datetime import datetime, timezone
+from src.utils import (
+    read_meaning,
+    get_last_known_meanings,
+    get_search_responses,
+    PrecompressedBody,
+    negotiate_encoding,
+    supported_encodings,
+    FastJSONResponse,
+    dumps_json,
+    success_body,
+    utc_timestamp,
+    make_etag,
+    encoded_etag,
+    matching_etag,
+    cache_control,
+)
 from html import escape
 
 router = APIRouter(prefix="", tags=["Search"])
 
+
+def _build_search_body(word: str, meaning_text: str, encodings: Optional[tuple[str, ...]] = None) -> PrecompressedBody:
+    """
+    Build the static part of a /search response body, compressed once per coding.
+
+    Field order matches what FastAPI emits for SuccessResponse; the per-request
+    fields are appended by `_search_body_tail`.
+    """
+    body = dumps_json({
+        "status": "success",
+        "data": {"word": word, "meaning": meaning_text},
+        "message": "Word found successfully",
+    })
+    prefix = body[:-1] + b","
+    return PrecompressedBody(prefix, level=app_settings.compression.level, encodings=encodings)
+
+
+def _search_body_tail(request_id: Optional[str]) -> bytes:
+    """Per-request fields that close a cached /search body."""
+    return (
+        b'"timestamp":"' + utc_timestamp().encode("ascii") + b'",'
+        b'"request_id":' + dumps_json(request_id) + b','
+        b'"result_count":1}'
+    )
+
+
+def _http_cache_headers(etag: str, max_age: int, encoding: Optional[str] = None) -> dict:
+    """
+    ETag/Cache-Control headers for a cacheable response.
+
+    With compression enabled every representation varies on Accept-Encoding,
+    the identity one included: a cache must not hand a stored identity body to
+    a client that asks for gzip, nor a gzip body to one that does not.
+    """
+    headers = {
+        "ETag": encoded_etag(etag, encoding),
+        "Cache-Control": cache_control(max_age, app_settings.http_cache.shared_max_age),
+    }
+    if app_settings.compression.enabled:
+        headers["Vary"] = "Accept-Encoding"
+    return headers
+
+
+def _encoded_response(content: bytes, encoding: Optional[str], headers: dict) -> Response:
+    """
+    JSON response compressed here rather than by GZipMiddleware.
+
+    Responses with an ETag must name their coding in it (`encoded_etag`); the
+    middleware compresses without touching the ETag, so a gzip body would be
+    sent under the identity tag.
+    """
+    if encoding and len(content) >= app_settings.compression.minimum_size:
+        content = PrecompressedBody(content, level=app_settings.compression.level,
+                                    encodings=(encoding,)).encode(b"", encoding)
+        if "ETag" in headers:
+            headers["ETag"] = encoded_etag(headers["ETag"], encoding)
+        headers.update({"Content-Encoding": encoding, "Vary": "Accept-Encoding"})
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def _not_modified(request: Request, etag: str, max_age: int) -> Optional[Response]:
+    """304 response when the client already holds this representation."""
+    matched = matching_etag(request.headers.get("if-none-match"), etag)
+    if matched is None:
+        return None
+    return Response(status_code=304, headers=_http_cache_headers(matched, max_age))
+
+
 # get /search
 @router.get(
     "/search",
     response_model=SuccessResponse[SearchMeaning],
     responses={
         200: {"description": "Word found successfully"},
+        304: {"description": "Not modified (If-None-Match matches the current index generation)"},
         400: {"description": "Invalid request", "model": ErrorResponse},
         404: {"description": "Word not found", "model": ErrorResponse},
         500: {"description": "Internal server error", "model": ErrorResponse},
@@ -37,12 +128,18 @@ async def search(
         SuccessResponse[SearchData]: Standard success response with word data
     """
 
+    timer = request.state.stage_timer = StageTimer("search")
+
     # Get the index loader
     index = get_index_loader()
     data_file_path = index.manifest.get("file_path")
+    # Read before the lookup: apply_delta installs new entries before the new
+    # generation, so the entry found is at least as new as this generation
+    generation = index.generation
 
     # Search for the word in the index
     result = index.get_value_by_key(word)
+    timer.mark("index_lookup")
 
     if not result:
         raise NotFoundException(
@@ -53,6 +150,9 @@ async def search(
     # Extract offset and length from the index
     offset = result.get("offset")
     length = result.get("length")
+    # Entries from a delta segment point into its own data file
+    data_file_path = result.get("file_path", data_file_path)
+    data_format = result.get("data_format", index.data_format)
 
     if offset is None or length is None:
         raise NotFoundException(
@@ -60,21 +160,84 @@ async def search(
             resource="Word"
         )
 
-    # Read the actual meaning from S3 using the offset and length
-    # All S3-related exceptions are handled in read_meaning_from_s3
-    meaning_text = read_meaning_from_s3(offset, length, file_key=data_file_path)
+    # Answer revalidations before touching storage
+    etag = None
+    max_age = app_settings.http_cache.search_max_age
+    if app_settings.http_cache.enabled:
+        etag = make_etag(generation, "search", word)
+        not_modified = _not_modified(request, etag, max_age)
+        if not_modified is not None:
+            timer.tier = "not_modified"
+            return not_modified
 
-    return {
-        "status": "success",
-        "data": {
-            "word": word,
-            "meaning": meaning_text
-        },
-        "result_count": 1,
-        "message": "Word found successfully",
-        "request_id": getattr(request.state, "request_id", None),
-        "timestamp": datetime.now(timezone.utc).isoformat()
-    }
+    request_id = getattr(request.state, "request_id", None)
+
+    encoding = None
+    if app_settings.compression.enabled:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+
+    search_responses = get_search_responses()
+    cache_key = (word, generation)
+    body = search_responses.get(cache_key)
+    observe_cache_lookup("response", hit=body is not None)
+    timer.mark("cache_lookup")
+    timer.tier = "response"
+    if body is None:
+        try:
+            # Read the actual meaning from storage using the offset and length
+            # Storage exceptions are raised by the backend as AppException subclasses
+            # The read blocks (S3 GET), so it runs in the threadpool instead of
+            # stalling every other request on the event loop
+            observe_cache_lookup("meaning")
+            meaning_text = await run_in_threadpool(
+                read_meaning, offset, length, file_key=data_file_path, data_format=data_format
+            )
+            timer.mark("storage_read")
+            timer.tier = "storage" if "meaning" in timer.misses else "meaning"
+        except ServiceUnavailableException:
+            timer.mark("storage_read")
+            timer.tier = "stale"
+            # Storage is unavailable (throttled, unreachable) or the circuit is open:
+            # serve the last meaning we returned for this word (possibly from a
+            # previous index generation). Other storage errors still fail.
+            meaning_text = get_last_known_meanings().get(word)
+            if meaning_text is None:
+                raise
+            return FastJSONResponse(
+                success_body(
+                    {"word": word, "meaning": meaning_text},
+                    message="Word found successfully (served from cache while storage is unavailable)",
+                    request_id=request_id,
+                    result_count=1,
+                ),
+                # Never let a CDN or browser keep the stale answer
+                headers={"X-Served-Stale": "true", "Cache-Control": "no-store"},
+            )
+        get_last_known_meanings().remember(word, meaning_text)
+
+        if search_responses.enabled:
+            # Cached bodies carry every coding clients may ask for later
+            encodings = supported_encodings() if app_settings.compression.enabled else ()
+            body = _build_search_body(word, meaning_text, encodings)
+            search_responses.put(cache_key, body)
+        else:
+            body = _build_search_body(word, meaning_text, (encoding,) if encoding else ())
+
+    # Already-encoded body plus the per-request tail; no model validation.
+    # With Content-Encoding set, GZipMiddleware passes the body through untouched.
+    tail = _search_body_tail(request_id)
+    # Same threshold as GZipMiddleware, on the whole body
+    if not (encoding and len(body) + len(tail) >= app_settings.compression.minimum_size):
+        encoding = None
+    headers = _http_cache_headers(etag, max_age, encoding) if etag else {}
+
+    if encoding:
+        headers.update({"Content-Encoding": encoding, "Vary": "Accept-Encoding"})
+        content = body.encode(tail, encoding)
+    else:
+        content = body.identity(tail)
+    timer.mark("serialization")
+    return Response(content=content, media_type="application/json", headers=headers)
 
 # get /autocomplete
 @router.get(
@@ -82,6 +245,7 @@ async def search(
         response_model=SuccessResponse[list[AutocompleteItem]],
         responses={
             200: {"description": "Autocomplete suggestions returned successfully"},
+            304: {"description": "Not modified (If-None-Match matches the current index generation)"},
             400: {"description": "Invalid request", "model": ErrorResponse},
             500: {"description": "Internal server error", "model": ErrorResponse},
         }
@@ -91,8 +255,22 @@ async def autocomplete(
         q: str = Query(..., description="Query string for autocomplete"),
         limit: int = Query(default=10, ge=1, le=50, description="Maximum number of suggestions")
     ) -> Union[SuccessResponse, ErrorResponse]:
+    timer = request.state.stage_timer = StageTimer("autocomplete")
     index = get_index_loader()
+
+    # Suggestions only change with the index generation
+    etag = None
+    max_age = app_settings.http_cache.autocomplete_max_age
+    if app_settings.http_cache.enabled:
+        etag = make_etag(index.generation, "autocomplete", q, limit)
+        not_modified = _not_modified(request, etag, max_age)
+        if not_modified is not None:
+            timer.tier = "not_modified"
+            return not_modified
+
     autocomplete_result = index.autosuggest_keys(q, max_suggestions=limit)
+    timer.mark("index_lookup")
+    timer.tier = "index"
 
     # Create highlighted suggestions (bold the matched part)
     result = []
@@ -101,13 +279,18 @@ async def autocomplete(
         matched_part = word[:split_position]
         remaining_part = word[split_position:]
         highlighted = f"<b>{escape(matched_part)}</b>{escape(remaining_part)}"
-        result.append(AutocompleteItem(word=word, highlighted=highlighted))
+        # Plain dicts in AutocompleteItem shape; no per-item model instances
+        result.append({"word": word, "highlighted": highlighted})
 
-    return {
-        "status": "success",
-        "data": result,
-        "result_count": len(result),
-        "message": f"{len(result)} suggestions found",
-        "request_id": getattr(request.state, "request_id", None),
-        "timestamp": datetime.now(timezone.utc).isoformat()
-    }
\ No newline at end of file
+    content = dumps_json(success_body(
+        result,
+        message=f"{len(result)} suggestions found",
+        request_id=getattr(request.state, "request_id", None),
+        result_count=len(result),
+    ))
+    encoding = None
+    if app_settings.compression.enabled:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    response = _encoded_response(content, encoding, _http_cache_headers(etag, max_age) if etag else {})
+    timer.mark("serialization")
+    return response
\ No newline at end of file
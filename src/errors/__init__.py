@@ -17,12 +17,6 @@ from .errors import (
     ServiceUnavailableException,
 )
 
-from .handlers import (
-    app_exception_handler,
-    validation_exception_handler,
-    http_exception_handler,
-    generic_exception_handler,
-)
 
 __all__ = [
     # Error models
@@ -46,3 +40,13 @@ __all__ = [
     "http_exception_handler",
     "generic_exception_handler",
 ]
+
+
+def __getattr__(name):
+    # The handlers need FastAPI itself; only the app imports them, so code that
+    # just raises these exceptions (storage, utils) does not load FastAPI.
+    if name in ("app_exception_handler", "validation_exception_handler",
+                "http_exception_handler", "generic_exception_handler"):
+        from src.errors import handlers
+        return getattr(handlers, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,7 +5,7 @@ Following RFC 7807 (Problem Details for HTTP APIs) and OpenAPI standards.
 """
 
 from typing import Any, Dict, Optional, Union
-from fastapi import status
+from starlette import status
 from pydantic import BaseModel, Field
 
 
@@ -14,9 +14,9 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 from .errors import AppException, ErrorResponse, ErrorDetail
 from src.config import app_settings
 
-def generate_error_type_url(error_type: str, base_url: str = app_settings.base_url) -> str:
+def generate_error_type_url(error_type: str, base_url: Optional[str] = None) -> str:
     """Generate a URI reference for the error type."""
-    return f"{base_url}/errors/{error_type}"
+    return f"{base_url or app_settings.base_url}/errors/{error_type}"
 
 
 def create_error_response(
@@ -0,0 +1,29 @@
+from src.metrics.prometheus import (
+    StageTimer,
+    PhaseTimer,
+    observe_request,
+    observe_cache_lookup,
+    observe_cache_miss,
+    observe_s3,
+    observe_storage_read,
+    observe_localize,
+    observe_index_load,
+    render_metrics,
+    mark_worker_exit,
+    process_age_seconds,
+)
+
+__all__ = [
+    "StageTimer",
+    "PhaseTimer",
+    "observe_request",
+    "observe_cache_lookup",
+    "observe_cache_miss",
+    "observe_s3",
+    "observe_storage_read",
+    "observe_localize",
+    "observe_index_load",
+    "render_metrics",
+    "mark_worker_exit",
+    "process_age_seconds",
+]
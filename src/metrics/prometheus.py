@@ -0,0 +1,305 @@
+"""
+Prometheus metrics.
+
+- request latency per route/method/status (RequestContextMiddleware)
+- stage latency per route: index_lookup, cache_lookup, storage_read, serialization
+- cache lookups and misses per cache layer (response, meaning)
+- S3 requests, bytes and latency by operation and result code
+- index size, load time and generation
+- progressive storage: reads served locally vs remotely, download progress
+- startup time per phase (imports, settings, storage, index, caches)
+
+Multiple workers: when PROMETHEUS_MULTIPROC_DIR is set (before the app is
+imported, e.g. in the container environment) prometheus_client keeps every
+value in per-process files in that directory and /metrics aggregates all
+workers. The directory must be emptied before the server starts.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+)
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+# Sub-millisecond buckets for in-memory stages, up to seconds for S3 reads
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+REQUEST_SECONDS = Histogram(
+    "wikidict_request_duration_seconds",
+    "Time to the response start, per route",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+STAGE_SECONDS = Histogram(
+    "wikidict_stage_duration_seconds",
+    "Time spent in each request stage",
+    ["route", "stage"],
+    buckets=LATENCY_BUCKETS,
+)
+
+CACHE_LOOKUPS = Counter(
+    "wikidict_cache_lookups_total",
+    "Cache lookups per cache layer",
+    ["cache"],
+)
+
+CACHE_MISSES = Counter(
+    "wikidict_cache_misses_total",
+    "Cache misses per cache layer",
+    ["cache"],
+)
+
+S3_REQUESTS = Counter(
+    "wikidict_s3_requests_total",
+    "S3 requests by operation and result code (OK or the S3 error code)",
+    ["operation", "code"],
+)
+
+S3_BYTES = Counter(
+    "wikidict_s3_bytes_total",
+    "Bytes received from S3 by operation",
+    ["operation"],
+)
+
+S3_SECONDS = Histogram(
+    "wikidict_s3_request_duration_seconds",
+    "S3 request latency by operation",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+
+STORAGE_READS = Counter(
+    "wikidict_storage_reads_total",
+    "Meaning reads of the progressive backend by source (local copy or remote)",
+    ["source"],
+)
+
+STORAGE_READ_BYTES = Counter(
+    "wikidict_storage_read_bytes_total",
+    "Bytes read by the progressive backend by source (local copy or remote)",
+    ["source"],
+)
+
+# Downloads run in one process (the pre-fork master), so take its values
+LOCALIZE_BYTES_DONE = Gauge(
+    "wikidict_localize_bytes_done",
+    "Bytes of the data file copied to local disk",
+    ["file"],
+    multiprocess_mode="livemax",
+)
+
+LOCALIZE_BYTES_TOTAL = Gauge(
+    "wikidict_localize_bytes_total",
+    "Size of the data file being copied to local disk",
+    ["file"],
+    multiprocess_mode="livemax",
+)
+
+LOCALIZE_COMPLETE = Gauge(
+    "wikidict_localize_complete",
+    "1 once the local copy of the data file is complete",
+    ["file"],
+    multiprocess_mode="livemax",
+)
+
+INDEX_ENTRIES = Gauge(
+    "wikidict_index_entries",
+    "Entries in the loaded index",
+    multiprocess_mode="livemostrecent",
+)
+
+INDEX_LOAD_SECONDS = Gauge(
+    "wikidict_index_load_seconds",
+    "Time taken to load the current index",
+    multiprocess_mode="livemostrecent",
+)
+
+INDEX_LOADED_AT = Gauge(
+    "wikidict_index_loaded_timestamp_seconds",
+    "Unix time the current index finished loading",
+    multiprocess_mode="livemostrecent",
+)
+
+STARTUP_PHASE_SECONDS = Gauge(
+    "wikidict_startup_phase_seconds",
+    "Time spent in each startup phase of this worker",
+    ["phase"],
+    multiprocess_mode="livemostrecent",
+)
+
+
+def observe_request(method: str, route: str, status: int, seconds: float) -> None:
+    REQUEST_SECONDS.labels(method, route, str(status)).observe(seconds)
+
+
+def observe_cache_lookup(cache: str, hit: Optional[bool] = None) -> None:
+    """Count a lookup; pass `hit` when known here, else report misses separately."""
+    CACHE_LOOKUPS.labels(cache).inc()
+    if hit is False:
+        CACHE_MISSES.labels(cache).inc()
+
+
+def observe_cache_miss(cache: str) -> None:
+    CACHE_MISSES.labels(cache).inc()
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.misses.add(cache)
+
+
+def observe_s3(operation: str, code: str, seconds: float, nbytes: int = 0) -> None:
+    S3_REQUESTS.labels(operation, code).inc()
+    S3_SECONDS.labels(operation).observe(seconds)
+    if nbytes:
+        S3_BYTES.labels(operation).inc(nbytes)
+
+
+def observe_storage_read(source: str, nbytes: int) -> None:
+    STORAGE_READS.labels(source).inc()
+    STORAGE_READ_BYTES.labels(source).inc(nbytes)
+
+
+def observe_localize(file: str, bytes_done: int, bytes_total: int, complete: bool) -> None:
+    LOCALIZE_BYTES_DONE.labels(file).set(bytes_done)
+    LOCALIZE_BYTES_TOTAL.labels(file).set(bytes_total)
+    LOCALIZE_COMPLETE.labels(file).set(1 if complete else 0)
+
+
+def observe_index_load(entries: int, seconds: float) -> None:
+    INDEX_ENTRIES.set(entries)
+    INDEX_LOAD_SECONDS.set(seconds)
+    INDEX_LOADED_AT.set(time.time())
+
+
+# The timer of the request being handled, so cache misses deep in the call
+# stack (e.g. the meaning LRU) are attributed to it
+_current_timer: ContextVar[Optional["StageTimer"]] = ContextVar("stage_timer", default=None)
+
+
+class StageTimer:
+    """
+    Times consecutive stages of one request.
+
+    `mark(stage)` records the time since the previous mark (or creation)
+    under `stage` and keeps it in `stages` for per-request reporting.
+    `tier` names the layer that produced the response (response, meaning,
+    storage, stale) and `misses` the caches that missed on the way.
+    """
+
+    __slots__ = ("route", "stages", "tier", "misses", "_last")
+
+    def __init__(self, route: str):
+        self.route = route
+        self.stages: list[tuple[str, float]] = []
+        self.tier: Optional[str] = None
+        self.misses: set[str] = set()
+        self._last = time.perf_counter()
+        _current_timer.set(self)
+
+    def mark(self, stage: str) -> float:
+        now = time.perf_counter()
+        seconds = now - self._last
+        self._last = now
+        self.stages.append((stage, seconds))
+        STAGE_SECONDS.labels(self.route, stage).observe(seconds)
+        return seconds
+
+    def server_timing(self, total_seconds: Optional[float] = None) -> str:
+        """Server-Timing header value: stage durations in ms plus the cache tier."""
+        metrics = [f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in self.stages]
+        if self.tier:
+            metrics.append(f'cache;desc="{self.tier}"')
+        if total_seconds is not None:
+            metrics.append(f"total;dur={total_seconds * 1000:.3f}")
+        return ", ".join(metrics)
+
+
+# Name column of PhaseTimer.report()
+REPORT_WIDTH = 28
+
+
+class PhaseTimer:
+    """
+    Durations of named, sequential phases (server startup, index load).
+
+    `phase(name)` times a block; `add(name, seconds)` records one measured
+    elsewhere. Nested timers are kept under their parent phase for `report()`.
+    """
+
+    def __init__(self):
+        self.phases: list[tuple[str, float, Optional["PhaseTimer"]]] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float, details: Optional["PhaseTimer"] = None) -> None:
+        self.phases.append((name, seconds, details))
+
+    @property
+    def total(self) -> float:
+        return sum(seconds for _, seconds, _ in self.phases)
+
+    def report(self, indent: int = 2, with_total: bool = True) -> str:
+        """One line per phase, nested phases indented below their parent."""
+        lines = []
+        for name, seconds, details in self.phases:
+            lines.append(f"{' ' * indent}{name:<{REPORT_WIDTH - indent}}{seconds * 1000:>10,.1f} ms")
+            if details is not None:
+                lines.append(details.report(indent + 2, with_total=False))
+        if with_total:
+            lines.append(f"{' ' * indent}{'total':<{REPORT_WIDTH - indent}}{self.total * 1000:>10,.1f} ms")
+        return "\n".join(lines)
+
+    def publish(self) -> None:
+        """Export the top-level phases as wikidict_startup_phase_seconds."""
+        for name, seconds, _ in self.phases:
+            STARTUP_PHASE_SECONDS.labels(name).set(seconds)
+
+
+def process_age_seconds() -> Optional[float]:
+    """Seconds since this process started (Linux /proc, 10ms resolution), else None."""
+    try:
+        with open("/proc/self/stat", "r") as f:
+            # Fields after the parenthesised command name; starttime is field 22
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", "r") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return max(uptime - start_ticks / os.sysconf("SC_CLK_TCK"), 0.0)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Exposition-format payload and content type, aggregated across workers."""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_exit(pid: Optional[int] = None) -> None:
+    """Drop a stopped worker's live gauges from the shared directory."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid or os.getpid())
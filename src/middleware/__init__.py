@@ -0,0 +1,5 @@
+from src.middleware.request_context import RequestContextMiddleware
+
+__all__ = [
+    "RequestContextMiddleware",
+]
@@ -0,0 +1,98 @@
+"""
+Request context middleware (pure ASGI).
+
+Assigns each request an ID (the client's `X-Request-ID` or a new one), stores
+it in `request.state.request_id` for handlers and error responses, adds
+`X-Request-ID` and `X-Process-Time` to the response headers and records the
+request latency per route for /metrics.
+
+When Server-Timing is enabled in config, or the client sends the configured
+opt-in header, routes that time their stages (`request.state.stage_timer`)
+also get a `Server-Timing` header with per-stage durations and the cache tier.
+
+While a slow-request profile runs (POST /admin/profile?slow_ms=...), every
+finished request is reported to the sampler.
+
+/search and /autocomplete send `Vary: Accept-Encoding` themselves, and
+GZipMiddleware appends the same token again to identity bodies above its
+minimum size; repeated `Vary` tokens are collapsed here.
+
+Unlike `@app.middleware("http")` (BaseHTTPMiddleware), this does not run the
+app in a separate task or wrap the body stream in call_next's memory
+streams: it only rewrites the `http.response.start` message.
+"""
+
+import time
+import uuid
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.config.settings import app_settings
+from src.metrics import observe_request
+from src.profiling import active_sampler
+
+REQUEST_ID_HEADER = b"x-request-id"
+VARY_HEADER = b"vary"
+
+
+def _collapse_vary(headers: list) -> None:
+    """Drop repeated tokens from a `Vary` header, in place."""
+    for i, (name, value) in enumerate(headers):
+        if name.lower() == VARY_HEADER and b"," in value:
+            tokens = [token.strip() for token in value.split(b",")]
+            unique = list(dict.fromkeys(token for token in tokens if token))
+            if len(unique) < len(tokens):
+                headers[i] = (name, b", ".join(unique))
+
+
+class RequestContextMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        server_timing = app_settings.server_timing
+        self.server_timing_always = server_timing.enabled
+        self.server_timing_header = (
+            server_timing.request_header.lower().encode("latin-1") if server_timing.request_header else None
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+
+        # Check if client provided a request ID (and asked for Server-Timing)
+        request_id = None
+        server_timing = self.server_timing_always
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                request_id = value.decode("latin-1")
+            elif name == self.server_timing_header:
+                server_timing = True
+        if not request_id:
+            request_id = f"req_{uuid.uuid4().hex[:16]}"
+
+        # Store in request state for access in route handlers
+        state = scope.setdefault("state", {})
+        state["request_id"] = request_id
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                finished = time.perf_counter()
+                process_time = finished - start_time
+                # Route template (not the raw path) keeps label cardinality bounded
+                route = getattr(scope.get("route"), "path", "unmatched")
+                observe_request(scope["method"], route, message["status"], process_time)
+                sampler = active_sampler()
+                if sampler is not None:
+                    sampler.request_finished(start_time, finished, route, request_id,
+                                             message["status"], state.get("stage_timer"))
+                headers = list(message.get("headers", []))
+                _collapse_vary(headers)
+                headers.append((REQUEST_ID_HEADER, request_id.encode("latin-1")))
+                headers.append((b"x-process-time", f"{process_time:.4f}".encode("latin-1")))
+                timer = state.get("stage_timer") if server_timing else None
+                if timer is not None:
+                    headers.append((b"server-timing", timer.server_timing(process_time).encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
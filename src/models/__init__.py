@@ -1,4 +1,4 @@
-from src.models.models import HealthResponse, SearchMeaning,AutocompleteItem
+from src.models.models import HealthResponse, IndexLoadStatus, ReadinessResponse, SearchMeaning,AutocompleteItem
 from src.models.responses import (
     SuccessResponse,
     ListResponse,
@@ -7,6 +7,8 @@ from src.models.responses import (
 
 __all__ = [
     "HealthResponse",
+    "IndexLoadStatus",
+    "ReadinessResponse",
     "SuccessResponse",
     "ListResponse",
     "MessageResponse",
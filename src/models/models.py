@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel
 
 
@@ -6,6 +7,17 @@ class HealthResponse(BaseModel):
     service: str
     version: str
 
+class IndexLoadStatus(BaseModel):
+    state: str  # pending | loading | ready | failed
+    phase: Optional[str] = None
+    percent: float
+    elapsed_seconds: Optional[float] = None
+    entries: Optional[int] = None
+    error: Optional[str] = None
+
+class ReadinessResponse(HealthResponse):
+    index: IndexLoadStatus
+
 class SearchMeaning(BaseModel):
     word: str
     meaning: str
@@ -0,0 +1,3 @@
+from src.profiling.sampler import StackSampler, start_profile, stop_profile, active_sampler
+
+__all__ = ["StackSampler", "start_profile", "stop_profile", "active_sampler"]
@@ -0,0 +1,192 @@
+"""
+Statistical stack sampler for on-demand profiling of a live worker.
+
+A background thread wakes every `interval` seconds, takes the Python stack of
+every other thread (`sys._current_frames()`) and records it with a timestamp.
+Nothing is instrumented, so the cost is one stack walk per thread per sample
+(100 Hz by default) and only while a profile is running.
+
+Stacks are reported in the collapsed format (`root;caller;callee count` per
+line) read by flamegraph.pl, speedscope and most flame graph viewers.
+
+With `slow_ms`, the request middleware reports every finished request and only
+samples taken while a slower request was in flight are kept. Requests share
+the event loop, so those samples can include work of requests that overlapped
+the slow one.
+"""
+
+import bisect
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+# Leaf frames of threads waiting for work: the event loop in select() and
+# threadpool workers blocked on their queue
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+}
+
+
+class StackSampler:
+    def __init__(self, interval: float = 0.01, slow_ms: Optional[float] = None, include_idle: bool = False):
+        self.interval = interval
+        self.slow_ms = slow_ms
+        self.include_idle = include_idle
+        self.samples: list[tuple[float, str]] = []
+        self.slow_requests: list[dict] = []
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self._labels: dict = {}
+        self._thread_names: dict[int, str] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.stopped_at = time.perf_counter()
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = self._collapse(ident, frame)
+                if stack is not None:
+                    self.samples.append((now, stack))
+
+    def _collapse(self, ident: int, frame) -> Optional[str]:
+        """`thread;outermost;...;innermost` for one thread, or None when idle."""
+        code = frame.f_code
+        if not self.include_idle and (Path(code.co_filename).name, code.co_name) in IDLE_FRAMES:
+            return None
+
+        labels = []
+        while frame is not None:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        labels.append(self._thread_name(ident))
+        labels.reverse()
+        return ";".join(labels)
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            path = Path(code.co_filename)
+            try:
+                path = path.relative_to(PROJECT_ROOT)
+            except ValueError:
+                # Library frames: keep the package and module, e.g. starlette/routing.py
+                path = Path(*path.parts[-2:])
+            label = f"{code.co_name} ({path}:{code.co_firstlineno})".replace(";", ":")
+            self._labels[code] = label
+        return label
+
+    def _thread_name(self, ident: int) -> str:
+        name = self._thread_names.get(ident)
+        if name is None:
+            self._thread_names = {t.ident: t.name for t in threading.enumerate()}
+            name = self._thread_names.get(ident, f"thread-{ident}")
+        return name.replace(" ", "_")
+
+    def request_finished(self, started: float, finished: float, route: str, request_id: str,
+                         status: int, stage_timer=None) -> None:
+        """Called by the request middleware; keeps requests slower than `slow_ms`."""
+        if self.slow_ms is None:
+            return
+        duration_ms = (finished - started) * 1000
+        if duration_ms < self.slow_ms:
+            return
+        stages_ms = None
+        if stage_timer is not None:
+            stages_ms = {stage: round(seconds * 1000, 3) for stage, seconds in stage_timer.stages}
+        self.slow_requests.append({
+            "request_id": request_id,
+            "route": route,
+            "status": status,
+            "duration_ms": round(duration_ms, 3),
+            "stages_ms": stages_ms,
+            "_window": (started, finished),
+        })
+
+    def kept_samples(self) -> list[str]:
+        """All samples, or with `slow_ms` only those taken during a slow request."""
+        if self.slow_ms is None:
+            return [stack for _, stack in self.samples]
+
+        # Merge the slow request windows, then keep samples inside any of them
+        windows = []
+        for start, end in sorted(r["_window"] for r in self.slow_requests):
+            if windows and start <= windows[-1][1]:
+                windows[-1][1] = max(windows[-1][1], end)
+            else:
+                windows.append([start, end])
+        starts = [start for start, _ in windows]
+
+        kept = []
+        for timestamp, stack in self.samples:
+            i = bisect.bisect_right(starts, timestamp) - 1
+            if i >= 0 and timestamp <= windows[i][1]:
+                kept.append(stack)
+        return kept
+
+    def collapsed(self) -> str:
+        """Collapsed stacks, most frequent first."""
+        counts = Counter(self.kept_samples())
+        return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+    def summary(self) -> dict:
+        kept = self.kept_samples()
+        return {
+            "seconds": round((self.stopped_at or time.perf_counter()) - self.started_at, 3),
+            "interval_ms": self.interval * 1000,
+            "samples": len(self.samples),
+            "kept_samples": len(kept),
+            "slow_ms": self.slow_ms,
+            "slow_requests": [
+                {key: value for key, value in r.items() if key != "_window"}
+                for r in self.slow_requests
+            ],
+        }
+
+
+# One profile at a time per worker; the middleware checks this on every request
+_active_sampler: Optional[StackSampler] = None
+_lock = threading.Lock()
+
+
+def start_profile(interval: float, slow_ms: Optional[float] = None, include_idle: bool = False) -> Optional[StackSampler]:
+    """Start sampling this worker; returns None when a profile is already running."""
+    global _active_sampler
+    with _lock:
+        if _active_sampler is not None:
+            return None
+        sampler = StackSampler(interval, slow_ms=slow_ms, include_idle=include_idle)
+        sampler.start()
+        _active_sampler = sampler
+        return sampler
+
+
+def stop_profile(sampler: StackSampler) -> None:
+    global _active_sampler
+    sampler.stop()
+    with _lock:
+        if _active_sampler is sampler:
+            _active_sampler = None
+
+
+def active_sampler() -> Optional[StackSampler]:
+    return _active_sampler
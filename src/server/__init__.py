@@ -0,0 +1,7 @@
+"""
+Pre-fork multi-worker server (`python -m src.server`).
+"""
+
+from src.server.prefork import serve_prefork
+
+__all__ = ["serve_prefork"]
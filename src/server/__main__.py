@@ -0,0 +1,29 @@
+"""
+Run the pre-fork server.
+
+Usage:
+    python -m src.server                          # host, port and workers from config.yaml
+    python -m src.server --host 0.0.0.0 --port 8000 --workers 4
+"""
+
+import argparse
+from src.config import app_settings
+from src.server.prefork import serve_prefork
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WikiDict pre-fork server")
+    parser.add_argument("--host", help="Bind address (default: host from config)")
+    parser.add_argument("--port", type=int, help="Bind port (default: port from config)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: workers from config)")
+    parser.add_argument("--log-level", default="info", help="uvicorn log level (default: info)")
+    args = parser.parse_args()
+
+    workers = args.workers or app_settings.workers
+    if workers < 1:
+        parser.error("--workers must be at least 1")
+    serve_prefork(args.host or app_settings.host, args.port or app_settings.port, workers, args.log_level)
+
+
+if __name__ == "__main__":
+    main()
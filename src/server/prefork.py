@@ -0,0 +1,198 @@
+"""
+Pre-fork server: load the index once, then fork workers that share it.
+
+`uvicorn --workers N` starts N independent interpreters and each one loads
+the full index. Here the master process loads it, takes every object alive at
+that point out of the garbage collector (`gc.freeze()`) and forks N workers
+that serve from the same physical pages. A page is only copied when a worker
+writes to it: frozen objects are never visited by collections, and the packed
+index layout (see src/config/packed_index.py, the default with several
+workers) keeps lookups from updating reference counts on per-entry objects.
+
+With one worker there is nothing to share: uvicorn serves main:app directly,
+so the socket is bound at once and the index loads in the background behind
+/ready (`index.background_load`), as with `uvicorn main:app`. With several
+workers /health only answers once the master has loaded the index and forked
+them; give the pods a startup probe long enough for the load.
+
+The master binds the listening socket, restarts workers that die and forwards
+SIGTERM/SIGINT. It never starts a thread: a worker forked while another thread
+holds a lock would inherit the lock held forever. Background downloads of the
+data file (progressive storage) therefore run in a child process of their own,
+and /metrics aggregates all processes through PROMETHEUS_MULTIPROC_DIR, created
+here when unset.
+"""
+
+import gc
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+import traceback
+
+# Pause before replacing a worker that died, so a crash loop does not spin
+RESTART_DELAY_SECONDS = 1.0
+LISTEN_BACKLOG = 2048
+
+
+def _prepare_metrics_dir() -> None:
+    """Multiprocess metrics must be configured before prometheus_client is imported."""
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        path = tempfile.mkdtemp(prefix="wikidict-metrics-")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = path
+        print(f"PROMETHEUS_MULTIPROC_DIR not set - worker metrics are aggregated in {path}")
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(LISTEN_BACKLOG)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock: socket.socket, log_level: str) -> None:
+    import uvicorn
+    from src.storage import get_storage_backend
+
+    # uvicorn installs its own handlers for a graceful shutdown
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    get_storage_backend().after_fork()
+
+    config = uvicorn.Config(app, lifespan="on", log_level=log_level)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _spawn(app, sock: socket.socket, log_level: str) -> int:
+    pid = os.fork()
+    if pid:
+        return pid
+
+    code = 0
+    try:
+        _run_worker(app, sock, log_level)
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        # Never return into the master's code
+        os._exit(code)
+
+
+def _spawn_prefetch(storage) -> int:
+    """Fork a process that runs the deferred data file downloads, then exits."""
+    pid = os.fork()
+    if pid:
+        return pid
+
+    code = 0
+    try:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        storage.run_prefetch()
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
+
+
+def _describe_exit(status: int) -> str:
+    if os.WIFSIGNALED(status):
+        return f"killed by {signal.Signals(os.WTERMSIG(status)).name}"
+    return f"exit code {os.WEXITSTATUS(status)}"
+
+
+def _serve_single(host: str, port: int, log_level: str) -> None:
+    """One worker: plain uvicorn, whose lifespan loads the index in the background."""
+    import uvicorn
+    from main import app
+
+    print(f"Single worker on http://{host}:{port} - GET /ready reports index load progress")
+    uvicorn.run(app, host=host, port=port, log_level=log_level, lifespan="on")
+
+
+def serve_prefork(host: str, port: int, workers: int, log_level: str = "info") -> None:
+    """Load the index, fork `workers` uvicorn workers on one socket and supervise them."""
+    if workers == 1:
+        _serve_single(host, port, log_level)
+        return
+
+    _prepare_metrics_dir()
+
+    from src.config import app_settings
+    # `index.layout: auto` packs the index when there are several workers
+    app_settings.workers = workers
+
+    from main import app
+    from src.config.load_indexes import IndexLoader, set_index_loader
+    from src.metrics import mark_worker_exit
+
+    # Bound before the load: a port conflict fails at once, and connections
+    # queue in the backlog instead of being refused while the index loads
+    sock = _bind(host, port)
+
+    start = time.perf_counter()
+    # Downloads are only prepared here: their threads must not run in the master
+    loader = IndexLoader(start_downloads=False)
+    set_index_loader(loader)
+
+    # Everything alive now is shared with the workers; keep collections off it
+    gc.collect()
+    gc.freeze()
+    print(f"✓ Index loaded in master ({loader.layout} layout) in {time.perf_counter() - start:.2f}s;"
+          f" {gc.get_freeze_count():,} objects frozen")
+
+    children = {_spawn(app, sock, log_level) for _ in range(workers)}
+    print(f"Pre-fork master {os.getpid()}: {workers} worker(s) on http://{host}:{port}")
+    downloads = {_spawn_prefetch(loader.storage)}
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children | downloads:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        if pid in downloads:
+            # Not replaced: reads fall back to S3 for whatever was not copied.
+            # Its gauges stay in the metrics directory with the final progress.
+            downloads.discard(pid)
+            if status and not stopping:
+                print(f"✗ Download process {pid} stopped ({_describe_exit(status)})")
+            continue
+        children.discard(pid)
+        mark_worker_exit(pid)
+        if stopping:
+            continue
+        print(f"✗ Worker {pid} stopped ({_describe_exit(status)}) - starting a replacement")
+        time.sleep(RESTART_DELAY_SECONDS)
+        if not stopping:
+            children.add(_spawn(app, sock, log_level))
+
+    for pid in downloads:
+        os.waitpid(pid, 0)
+    sock.close()
+    loader.storage.close()
+    print("Pre-fork master stopped")
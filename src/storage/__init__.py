@@ -0,0 +1,118 @@
+"""
+Storage backends for manifest, index and meaning reads.
+
+The backend is selected with `storage.backend` in config.yaml:
+    s3      - byte-range GETs against AWS_BUCKET_NAME (default)
+    local   - os.pread / mmap against a local mirror of the bucket
+    memory  - every object under `storage.local_root` loaded into memory
+    progressive - S3 at startup, switching to a local copy of the data file
+              under `storage.local_root` as it downloads in the background
+
+Independently of the backend, data files below `storage.in_memory_max_bytes`
+are loaded into one in-memory buffer at startup (see buffer.py).
+"""
+
+from typing import Optional
+from src.config.settings import app_settings
+from src.storage.base import StorageBackend
+from src.storage.s3 import S3StorageBackend, get_s3_client
+from src.storage.local import LocalStorageBackend
+from src.storage.memory import MemoryStorageBackend
+from src.storage.progressive import ProgressiveLocalBackend
+from src.storage.buffer import InMemoryDataBackend, load_in_memory_if_small
+from src.storage.hedging import HedgedStorageBackend
+from src.storage.circuit_breaker import CircuitBreakerBackend
+
+
+def create_storage_backend(backend: Optional[str] = None) -> StorageBackend:
+    """Build the storage backend named in configuration (or `backend`)."""
+    storage_config = app_settings.storage
+    backend = (backend or storage_config.backend).lower()
+
+    if backend == "s3":
+        return _protected(S3StorageBackend())
+    if backend == "local":
+        return LocalStorageBackend(storage_config.local_root, use_mmap=storage_config.use_mmap)
+    if backend == "memory":
+        return MemoryStorageBackend.from_directory(storage_config.local_root)
+    if backend == "progressive":
+        s3 = S3StorageBackend()
+        # Only user reads go through hedging and the breaker: duplicating 16MB
+        # background range GETs wastes the hedge budget, and their failures
+        # would open the circuit for /search
+        return ProgressiveLocalBackend(
+            _protected(s3),
+            storage_config.local_root,
+            downloader=s3,
+            range_size=storage_config.download_range_size,
+            concurrency=storage_config.download_concurrency,
+        )
+    raise ValueError(
+        f"Unknown storage backend '{backend}'. Expected one of: s3, local, memory, progressive"
+    )
+
+
+def _protected(backend: StorageBackend) -> StorageBackend:
+    """Wrap a remote backend with hedged reads and a circuit breaker when enabled."""
+    hedging = app_settings.storage.hedging
+    if hedging.enabled:
+        backend = HedgedStorageBackend(
+            backend,
+            percentile=hedging.percentile,
+            budget=hedging.budget,
+            min_delay_ms=hedging.min_delay_ms,
+            initial_delay_ms=hedging.initial_delay_ms,
+            window=hedging.window,
+        )
+
+    breaker = app_settings.storage.circuit_breaker
+    if breaker.enabled:
+        # Outermost, so an open circuit also stops hedged duplicates
+        backend = CircuitBreakerBackend(
+            backend,
+            failure_rate=breaker.failure_rate,
+            min_calls=breaker.min_calls,
+            window=breaker.window,
+            open_seconds=breaker.open_seconds,
+            half_open_probes=breaker.half_open_probes,
+        )
+    return backend
+
+
+# Lazy initialization - the backend is created on first use
+_storage_backend: Optional[StorageBackend] = None
+
+
+def get_storage_backend() -> StorageBackend:
+    """Get or create the singleton storage backend."""
+    global _storage_backend
+    if _storage_backend is None:
+        _storage_backend = create_storage_backend()
+    return _storage_backend
+
+
+def set_storage_backend(backend: Optional[StorageBackend]) -> None:
+    """
+    Replace the active backend (in-memory wrapper, tests, benchmarks).
+
+    The previous backend is not closed - the new one may wrap it.
+    """
+    global _storage_backend
+    _storage_backend = backend
+
+
+__all__ = [
+    "StorageBackend",
+    "S3StorageBackend",
+    "LocalStorageBackend",
+    "MemoryStorageBackend",
+    "ProgressiveLocalBackend",
+    "InMemoryDataBackend",
+    "HedgedStorageBackend",
+    "CircuitBreakerBackend",
+    "load_in_memory_if_small",
+    "create_storage_backend",
+    "get_storage_backend",
+    "set_storage_backend",
+    "get_s3_client",
+]
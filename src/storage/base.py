@@ -0,0 +1,74 @@
+"""
+Storage backend interface.
+
+Every read the server performs - manifest, index and meaning byte ranges -
+goes through a StorageBackend, so S3, a local disk copy or an in-memory
+dataset can serve the same API without touching the controllers.
+"""
+
+import json
+from abc import ABC, abstractmethod
+
+
+class StorageBackend(ABC):
+    """Read-only access to the objects published by the build scripts."""
+
+    name: str = "base"
+
+    @abstractmethod
+    def read_bytes(self, key: str) -> bytes:
+        """Read a whole object."""
+
+    @abstractmethod
+    def read_range(self, key: str, offset: int, length: int) -> bytes:
+        """Read `length` bytes starting at `offset` from an object."""
+
+    @abstractmethod
+    def get_size(self, key: str) -> int:
+        """Return the size of an object in bytes."""
+
+    def read_json(self, key: str):
+        """Read and parse a JSON object (manifest, index)."""
+        return json.loads(self.read_bytes(key).decode("utf-8"))
+
+    def prefetch(self, key: str, start: bool = True) -> None:
+        """
+        Hint that `key` is the active data file. Backends may start warming it.
+
+        With `start=False` the backend only prepares; `start_prefetch()` begins
+        the work later (the pre-fork server prepares before forking so workers
+        share the state, and downloads once they are forked).
+        """
+
+    def start_prefetch(self) -> None:
+        """Start work deferred by `prefetch(key, start=False)`."""
+
+    def run_prefetch(self) -> None:
+        """
+        Do the work deferred by `prefetch(key, start=False)` in this process and
+        return once it is finished. The pre-fork server calls it, instead of
+        `after_fork()`, in a child forked only for the downloads, so the master
+        that forks workers never starts threads.
+        """
+
+    def unprotected(self) -> "StorageBackend":
+        """
+        This backend without hedged reads and circuit breaking, for bulk reads
+        at startup or in the background that must not skew the latency window
+        or open the circuit for the reads serving requests.
+        """
+        return self
+
+    def stats(self) -> dict:
+        """Backend counters for monitoring."""
+        return {"backend": self.name}
+
+    def close(self) -> None:
+        """Release open handles. Backends without resources do nothing."""
+
+    def after_fork(self) -> None:
+        """
+        Called in each pre-forked worker. Drop what must not be shared with the
+        parent process: network connections, thread pools, locks held by
+        threads that do not exist in the child.
+        """
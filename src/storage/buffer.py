@@ -0,0 +1,217 @@
+"""
+In-memory data file - the whole data file held in one contiguous buffer.
+
+For small datasets a storage round trip on every cache miss is pure overhead.
+`InMemoryDataBackend` reads the active data file once at startup and answers
+range reads with slices of a single buffer: no per-entry objects, no network
+or disk I/O. Other objects (manifest, index) are delegated to the wrapped
+backend.
+
+With `compression="zlib"` the file is split into fixed-size blocks that are
+compressed independently and concatenated into one buffer; a read inflates
+only the blocks it touches (recently used blocks are kept decompressed).
+"""
+
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+from typing import Optional
+from src.errors import InternalServerException
+from src.storage.base import StorageBackend
+
+# Bytes fetched from the wrapped backend per read while loading
+LOAD_CHUNK_SIZE = 64 * 1024 * 1024
+
+
+class InMemoryDataBackend(StorageBackend):
+    """
+    Serves one data file from memory and delegates everything else.
+
+    Args:
+        remote: Backend the other objects are read from
+        key: Data file key (manifest file_path)
+        size: Data file size in bytes
+        compression: "none" or "zlib"
+        block_size: Uncompressed block size for zlib mode
+        cached_blocks: Decompressed blocks kept in zlib mode
+        loader: Backend the data file is loaded from (default: `remote`),
+            typically `remote.unprotected()`
+    """
+
+    name = "in-memory"
+
+    def __init__(self, remote: StorageBackend, key: str, size: int,
+                 compression: str = "none", block_size: int = 256 * 1024,
+                 cached_blocks: int = 64, loader: Optional[StorageBackend] = None):
+        if compression not in ("none", "zlib"):
+            raise ValueError(f"Unknown in-memory compression '{compression}'. Expected none or zlib")
+
+        self.remote = remote
+        self.loader = loader or remote
+        self.key = key
+        self.size = size
+        self.compression = compression
+        self.block_size = block_size
+        self.cached_blocks = cached_blocks
+        self.reads = 0
+        self._block_cache: OrderedDict[int, bytes] = OrderedDict()
+        self._block_lock = threading.Lock()
+
+        if compression == "zlib":
+            self._buffer, self._block_offsets = self._load_compressed()
+        else:
+            self._buffer = self._load_raw()
+            self._block_offsets = None
+
+    def _iter_chunks(self):
+        for start in range(0, self.size, LOAD_CHUNK_SIZE):
+            yield self.loader.read_range(self.key, start, min(LOAD_CHUNK_SIZE, self.size - start))
+
+    def _load_raw(self) -> memoryview:
+        # Chunks are copied straight into the final buffer, which is kept as is:
+        # converting it to bytes would hold the data file twice while copying
+        buffer = bytearray(self.size)
+        view = memoryview(buffer)
+        position = 0
+        for chunk in self._iter_chunks():
+            view[position:position + len(chunk)] = chunk
+            position += len(chunk)
+        return view
+
+    def _load_compressed(self) -> tuple[memoryview, array]:
+        compressed = bytearray()
+        # offsets[i] is where block i starts; offsets[-1] is the end of the buffer
+        offsets = array("Q", [0])
+        block_size = self.block_size
+        # Start of a block left over from the previous chunk (< block_size bytes)
+        pending = b""
+        for chunk in self._iter_chunks():
+            view = memoryview(chunk)
+            position = 0
+            if pending:
+                position = block_size - len(pending)
+                if position > len(view):
+                    pending += chunk
+                    continue
+                compressed += zlib.compress(pending + view[:position], 6)
+                offsets.append(len(compressed))
+            # Whole blocks are compressed in place; only the tail is carried over
+            while position + block_size <= len(view):
+                compressed += zlib.compress(view[position:position + block_size], 6)
+                offsets.append(len(compressed))
+                position += block_size
+            pending = bytes(view[position:])
+        if pending:
+            compressed += zlib.compress(pending, 6)
+            offsets.append(len(compressed))
+        return memoryview(compressed), offsets
+
+    def _block(self, index: int) -> bytes:
+        with self._block_lock:
+            block = self._block_cache.get(index)
+            if block is not None:
+                self._block_cache.move_to_end(index)
+                return block
+
+        start, end = self._block_offsets[index], self._block_offsets[index + 1]
+        block = zlib.decompress(self._buffer[start:end])
+        with self._block_lock:
+            self._block_cache[index] = block
+            if len(self._block_cache) > self.cached_blocks:
+                self._block_cache.popitem(last=False)
+        return block
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes held for the data file (compressed size in zlib mode)."""
+        offsets = self._block_offsets.itemsize * len(self._block_offsets) if self._block_offsets else 0
+        return len(self._buffer) + offsets
+
+    def read_bytes(self, key: str) -> bytes:
+        if key == self.key:
+            return self.read_range(key, 0, self.size)
+        return self.remote.read_bytes(key)
+
+    def get_size(self, key: str) -> int:
+        if key == self.key:
+            return self.size
+        return self.remote.get_size(key)
+
+    def read_range(self, key: str, offset: int, length: int) -> bytes:
+        if key != self.key:
+            return self.remote.read_range(key, offset, length)
+        if offset < 0 or offset + length > self.size:
+            raise InternalServerException(
+                detail=f"Invalid byte range requested: offset={offset}, length={length}"
+            )
+
+        self.reads += 1
+        if self._block_offsets is None:
+            return self._buffer[offset:offset + length].tobytes()
+
+        first = offset // self.block_size
+        last = (offset + length - 1) // self.block_size
+        if first == last:
+            start = offset - first * self.block_size
+            return self._block(first)[start:start + length]
+
+        data = b"".join(self._block(i) for i in range(first, last + 1))
+        start = offset - first * self.block_size
+        return data[start:start + length]
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "data_file": self.key,
+            "data_bytes": self.size,
+            "memory_bytes": self.memory_bytes,
+            "compression": self.compression,
+            "reads": self.reads,
+            "remote": self.remote.stats(),
+        }
+
+    def close(self) -> None:
+        self.remote.close()
+
+    def after_fork(self) -> None:
+        # The buffer itself stays shared with the parent (copy-on-write)
+        self._block_lock = threading.Lock()
+        self.remote.after_fork()
+
+
+def load_in_memory_if_small(backend: StorageBackend, manifest: dict, max_bytes: int,
+                            compression: str = "none", block_size: int = 256 * 1024) -> StorageBackend:
+    """
+    Wrap `backend` with an InMemoryDataBackend when the data file is small enough.
+
+    The threshold is `max_bytes` unless the manifest sets `in_memory_max_bytes`.
+    The data file size comes from the manifest `file_size` (written by the
+    build scripts) or, for older manifests, from the backend. The file is read
+    from `backend.unprotected()`: 64MB startup reads through hedging would skew
+    its latency percentile and fire duplicate GETs, and their failures would
+    count toward the circuit breaker of /search.
+
+    Returns:
+        StorageBackend: the in-memory wrapper, or `backend` unchanged
+    """
+    # Already fully in memory
+    if backend.name in ("memory", InMemoryDataBackend.name):
+        return backend
+
+    key = manifest.get("file_path")
+    threshold = manifest.get("in_memory_max_bytes", max_bytes)
+    if not key or not threshold or threshold <= 0:
+        return backend
+
+    size: Optional[int] = manifest.get("file_size")
+    if size is None:
+        size = backend.get_size(key)
+    if size > threshold:
+        return backend
+
+    print(f"Loading data file into memory ({size / (1024 ** 2):,.1f} MB, compression={compression})...")
+    wrapped = InMemoryDataBackend(backend, key, size, compression=compression,
+                                  block_size=block_size, loader=backend.unprotected())
+    print(f"✓ Data file in memory: {wrapped.memory_bytes / (1024 ** 2):,.1f} MB held")
+    return wrapped
@@ -0,0 +1,165 @@
+"""
+Circuit breaker around a storage backend.
+
+When S3 throttles (SlowDown) or is unavailable, every cache miss otherwise
+waits through botocore retries and then fails, holding worker concurrency the
+whole time. The breaker tracks the outcome of recent reads:
+
+- closed:    reads pass through; once at least `min_calls` of the last
+             `window` reads are recorded and the failure rate reaches
+             `failure_rate`, the circuit opens
+- open:      reads fail immediately with ServiceUnavailableException for
+             `open_seconds` (callers fall back to last-known meanings)
+- half-open: up to `half_open_probes` reads are let through; all succeeding
+             closes the circuit, any failure opens it again
+
+NotFoundException is a data problem, not a dependency failure, and does not
+count against the backend.
+"""
+
+import threading
+import time
+from collections import deque
+from src.errors import NotFoundException, ServiceUnavailableException
+from src.storage.base import StorageBackend
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreakerBackend(StorageBackend):
+    """
+    Wraps a backend's range reads with a circuit breaker; other calls are delegated.
+
+    Args:
+        remote: Backend to protect
+        failure_rate: Failure ratio over the window that opens the circuit
+        min_calls: Calls required in the window before the rate is evaluated
+        window: Number of recent calls considered
+        open_seconds: Time the circuit stays open before probing
+        half_open_probes: Successful probes required to close the circuit
+    """
+
+    def __init__(self, remote: StorageBackend, failure_rate: float = 0.5, min_calls: int = 20,
+                 window: int = 100, open_seconds: float = 30.0, half_open_probes: int = 3):
+        self.remote = remote
+        self.name = remote.name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.state = CLOSED
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.times_opened = 0
+
+    def read_bytes(self, key: str) -> bytes:
+        return self.remote.read_bytes(key)
+
+    def get_size(self, key: str) -> int:
+        return self.remote.get_size(key)
+
+    def prefetch(self, key: str, start: bool = True) -> None:
+        self.remote.prefetch(key, start)
+
+    def start_prefetch(self) -> None:
+        self.remote.start_prefetch()
+
+    def run_prefetch(self) -> None:
+        self.remote.run_prefetch()
+
+    def unprotected(self) -> StorageBackend:
+        return self.remote.unprotected()
+
+    def _before_call(self) -> bool:
+        """Admit or reject a call. Returns True when the call is a half-open probe."""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    self.rejected += 1
+                    raise ServiceUnavailableException(
+                        detail="Storage temporarily unavailable (circuit open). Please retry shortly"
+                    )
+                self.state = HALF_OPEN
+                self._probes_in_flight = 0
+                self._probe_successes = 0
+
+            if self.state == HALF_OPEN:
+                if self._probes_in_flight >= self.half_open_probes:
+                    self.rejected += 1
+                    raise ServiceUnavailableException(
+                        detail="Storage temporarily unavailable (circuit half-open). Please retry shortly"
+                    )
+                self._probes_in_flight += 1
+                return True
+            return False
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self._failures = 0
+        self.times_opened += 1
+        print(f"⚠ Storage circuit opened for {self.open_seconds:g}s")
+
+    def _record(self, success: bool, probe: bool) -> None:
+        with self._lock:
+            if probe:
+                self._probes_in_flight -= 1
+                if self.state != HALF_OPEN:
+                    return
+                if not success:
+                    self._open()
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self.state = CLOSED
+                    print("✓ Storage circuit closed")
+                return
+
+            if len(self._outcomes) == self._outcomes.maxlen and not self._outcomes[0]:
+                self._failures -= 1
+            self._outcomes.append(success)
+            if not success:
+                self._failures += 1
+
+            if (self.state == CLOSED and len(self._outcomes) >= self.min_calls
+                    and self._failures / len(self._outcomes) >= self.failure_rate):
+                self._open()
+
+    def read_range(self, key: str, offset: int, length: int) -> bytes:
+        probe = self._before_call()
+        try:
+            data = self.remote.read_range(key, offset, length)
+        except NotFoundException:
+            self._record(True, probe)
+            raise
+        except Exception:
+            self._record(False, probe)
+            raise
+        self._record(True, probe)
+        return data
+
+    def stats(self) -> dict:
+        stats = self.remote.stats()
+        stats["circuit_breaker"] = {
+            "state": self.state,
+            "window_calls": len(self._outcomes),
+            "window_failures": self._failures,
+            "rejected": self.rejected,
+            "times_opened": self.times_opened,
+        }
+        return stats
+
+    def close(self) -> None:
+        self.remote.close()
+
+    def after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self.remote.after_fork()
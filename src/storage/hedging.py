@@ -0,0 +1,164 @@
+"""
+Hedged range reads for tail-latency control.
+
+A single slow S3 GET sets the p99 of /search. `HedgedStorageBackend` issues the
+range read and, if it has not answered within the rolling p95 (configurable
+percentile) of recent read latencies, sends one duplicate. Whichever answers
+first wins; the other is cancelled if it has not started, otherwise its result
+is discarded when it completes.
+
+Hedging is capped by a token budget: every read earns `budget` tokens (e.g.
+0.05) and every hedge spends one, so at most ~5% of traffic is duplicated even
+when the whole backend slows down.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from src.storage.base import StorageBackend
+
+
+class LatencyTracker:
+    """Rolling window of read latencies with a periodically refreshed percentile."""
+
+    def __init__(self, percentile: float = 95.0, window: int = 1000,
+                 initial_seconds: float = 0.1, refresh_every: int = 50):
+        self.percentile = percentile
+        self.samples: deque[float] = deque(maxlen=window)
+        self.refresh_every = refresh_every
+        self.threshold = initial_seconds
+        self._since_refresh = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.samples.append(seconds)
+            self._since_refresh += 1
+            if self._since_refresh >= self.refresh_every:
+                self._since_refresh = 0
+                ordered = sorted(self.samples)
+                index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+                self.threshold = ordered[index]
+
+
+class HedgedStorageBackend(StorageBackend):
+    """
+    Wraps a backend and hedges `read_range`; everything else is delegated.
+
+    Args:
+        remote: Backend whose range reads are hedged (S3)
+        percentile: Latency percentile after which a duplicate is sent
+        budget: Maximum fraction of reads that may be hedged
+        min_delay_ms: Floor for the hedge delay
+        initial_delay_ms: Hedge delay until enough samples are collected
+        window: Number of recent latencies used for the percentile
+        max_workers: Threads available for in-flight reads
+    """
+
+    def __init__(self, remote: StorageBackend, percentile: float = 95.0, budget: float = 0.05,
+                 min_delay_ms: float = 10.0, initial_delay_ms: float = 100.0,
+                 window: int = 1000, max_workers: int = 32):
+        self.remote = remote
+        self.name = remote.name
+        self.budget = budget
+        self.min_delay = min_delay_ms / 1000
+        self.tracker = LatencyTracker(percentile, window, initial_delay_ms / 1000)
+        self._max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedged-read")
+        self._tokens = 0.0
+        self._max_tokens = 10.0
+        self._lock = threading.Lock()
+        self.reads = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.hedges_denied = 0
+
+    def read_bytes(self, key: str) -> bytes:
+        return self.remote.read_bytes(key)
+
+    def get_size(self, key: str) -> int:
+        return self.remote.get_size(key)
+
+    def prefetch(self, key: str, start: bool = True) -> None:
+        self.remote.prefetch(key, start)
+
+    def start_prefetch(self) -> None:
+        self.remote.start_prefetch()
+
+    def run_prefetch(self) -> None:
+        self.remote.run_prefetch()
+
+    def unprotected(self) -> StorageBackend:
+        return self.remote.unprotected()
+
+    def _timed_read(self, key: str, offset: int, length: int) -> bytes:
+        start = time.perf_counter()
+        data = self.remote.read_range(key, offset, length)
+        self.tracker.record(time.perf_counter() - start)
+        return data
+
+    def _take_token(self) -> bool:
+        """Spend a budget token on a hedge; counts the hedge or the denial."""
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                self.hedges += 1
+                return True
+            self.hedges_denied += 1
+            return False
+
+    def read_range(self, key: str, offset: int, length: int) -> bytes:
+        with self._lock:
+            self.reads += 1
+            self._tokens = min(self._max_tokens, self._tokens + self.budget)
+
+        primary = self._pool.submit(self._timed_read, key, offset, length)
+        delay = max(self.min_delay, self.tracker.threshold)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        if not self._take_token():
+            return primary.result()
+
+        hedge = self._pool.submit(self._timed_read, key, offset, length)
+        pending = {primary, hedge}
+        first_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                first_error = first_error or future.exception()
+        raise first_error
+
+    def stats(self) -> dict:
+        stats = self.remote.stats()
+        with self._lock:
+            reads, hedges, hedge_wins, hedges_denied = self.reads, self.hedges, self.hedge_wins, self.hedges_denied
+        stats["hedging"] = {
+            "reads": reads,
+            "hedges": hedges,
+            "hedge_wins": hedge_wins,
+            "hedges_denied": hedges_denied,
+            "hedge_rate": round(hedges / reads, 4) if reads else 0.0,
+            "delay_ms": round(max(self.min_delay, self.tracker.threshold) * 1000, 2),
+        }
+        return stats
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.remote.close()
+
+    def after_fork(self) -> None:
+        # The parent's pool threads do not exist in this process
+        self._pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="hedged-read")
+        self._lock = threading.Lock()
+        self.tracker._lock = threading.Lock()
+        self.remote.after_fork()
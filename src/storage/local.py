@@ -0,0 +1,107 @@
+"""
+Local filesystem storage backend - positional reads with os.pread or mmap.
+
+Object keys are resolved relative to a root directory, so the same manifest
+(`dict/20250101/data.bin`) works for S3 and for a disk-local copy of the bucket.
+"""
+
+import mmap
+import os
+import threading
+from pathlib import Path
+from src.errors import NotFoundException, InternalServerException
+from src.storage.base import StorageBackend
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Serves objects from a directory mirroring the bucket layout.
+
+    File descriptors (and mappings when `use_mmap` is set) are opened once and
+    kept for the lifetime of the backend. `os.pread` does not move a shared
+    file offset, so concurrent readers never need a lock.
+    """
+
+    name = "local"
+
+    def __init__(self, root_dir: str, use_mmap: bool = False):
+        self.root = Path(root_dir).resolve()
+        self.use_mmap = use_mmap
+        self._fds: dict[str, int] = {}
+        self._maps: dict[str, mmap.mmap] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        # Keys come from the manifest - never allow them to escape the root
+        if self.root != path and self.root not in path.parents:
+            raise InternalServerException(detail=f"Invalid object key: {key}")
+        return path
+
+    def _fd(self, key: str) -> int:
+        fd = self._fds.get(key)
+        if fd is not None:
+            return fd
+
+        with self._lock:
+            fd = self._fds.get(key)
+            if fd is None:
+                try:
+                    fd = os.open(self._path(key), os.O_RDONLY)
+                except FileNotFoundError:
+                    raise NotFoundException(
+                        detail=f"Meaning data file '{key}' not found in {self.root}",
+                        resource="Local Object"
+                    )
+                self._fds[key] = fd
+        return fd
+
+    def _map(self, key: str) -> mmap.mmap:
+        mapped = self._maps.get(key)
+        if mapped is None:
+            fd = self._fd(key)
+            with self._lock:
+                mapped = self._maps.get(key)
+                if mapped is None:
+                    mapped = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+                    self._maps[key] = mapped
+        return mapped
+
+    def read_bytes(self, key: str) -> bytes:
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            raise NotFoundException(detail=f"'{key}' not found in {self.root}", resource="Local Object")
+
+    def get_size(self, key: str) -> int:
+        return os.fstat(self._fd(key)).st_size
+
+    def read_range(self, key: str, offset: int, length: int) -> bytes:
+        if self.use_mmap:
+            mapped = self._map(key)
+            # Slicing would silently return a short (or empty) range
+            if offset < 0 or length < 0 or offset + length > len(mapped):
+                raise InternalServerException(
+                    detail=f"Invalid byte range requested: offset={offset}, length={length}"
+                )
+            return mapped[offset:offset + length]
+
+        data = os.pread(self._fd(key), length, offset)
+        if len(data) != length:
+            raise InternalServerException(
+                detail=f"Invalid byte range requested: offset={offset}, length={length}"
+            )
+        return data
+
+    def close(self) -> None:
+        with self._lock:
+            for mapped in self._maps.values():
+                mapped.close()
+            for fd in self._fds.values():
+                os.close(fd)
+            self._maps.clear()
+            self._fds.clear()
+
+    def after_fork(self) -> None:
+        # Inherited descriptors and mappings stay valid: pread has no shared offset
+        self._lock = threading.Lock()
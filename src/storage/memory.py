@@ -0,0 +1,54 @@
+"""
+In-memory storage backend - objects held as bytes in the process.
+
+Used for small datasets, tests and benchmarks that must exclude network and
+disk latency from the serving path.
+"""
+
+from pathlib import Path
+from typing import Optional
+from src.errors import NotFoundException, InternalServerException
+from src.storage.base import StorageBackend
+
+
+class MemoryStorageBackend(StorageBackend):
+    """Serves objects from a dict of key -> bytes."""
+
+    name = "memory"
+
+    def __init__(self, objects: Optional[dict[str, bytes]] = None):
+        self._objects: dict[str, bytes] = dict(objects or {})
+
+    @classmethod
+    def from_directory(cls, root_dir: str) -> "MemoryStorageBackend":
+        """Load every file below `root_dir`, keyed by its path relative to the root."""
+        root = Path(root_dir)
+        objects = {
+            path.relative_to(root).as_posix(): path.read_bytes()
+            for path in root.rglob("*")
+            if path.is_file()
+        }
+        return cls(objects)
+
+    def put(self, key: str, data: bytes) -> None:
+        self._objects[key] = bytes(data)
+
+    def _get(self, key: str) -> bytes:
+        try:
+            return self._objects[key]
+        except KeyError:
+            raise NotFoundException(detail=f"'{key}' not found in memory storage", resource="Memory Object")
+
+    def read_bytes(self, key: str) -> bytes:
+        return self._get(key)
+
+    def get_size(self, key: str) -> int:
+        return len(self._get(key))
+
+    def read_range(self, key: str, offset: int, length: int) -> bytes:
+        data = self._get(key)
+        if offset < 0 or offset + length > len(data):
+            raise InternalServerException(
+                detail=f"Invalid byte range requested: offset={offset}, length={length}"
+            )
+        return data[offset:offset + length]
@@ -0,0 +1,294 @@
+"""
+Progressive localization - serve from S3 while the data file is copied to local disk.
+
+On `prefetch(file_path)` a background thread downloads the data file in
+fixed-size ranges, several in parallel, into `<local_root>/<key>.part`. Every
+read checks whether the ranges covering it are already on disk: if so it is
+served with a local `os.pread`, otherwise it goes to S3. Once every range is
+present the file is renamed to `<local_root>/<key>` and S3 is no longer used
+for meaning reads. A completed copy is reused on restart.
+
+Manifest and index reads always go to the remote backend so a new generation
+is never missed. The download itself can use a separate `downloader` backend,
+so background GETs bypass the hedging and circuit breaker wrapped around the
+reads that serve requests.
+
+Under the pre-fork server the download runs in one process only, a child the
+master forks for it (`run_prefetch()`). The per-range "done" flags live in
+shared memory, so every worker sees ranges land and reads them from the file
+through its own descriptor.
+
+Read counts by source and download progress are also exported to /metrics
+(`wikidict_storage_reads_total`, `wikidict_localize_*`).
+"""
+
+import mmap
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Optional
+from src.metrics import observe_localize, observe_storage_read
+from src.storage.base import StorageBackend
+
+
+class _Download:
+    """State of one data file being localized."""
+
+    def __init__(self, key: str, path: Path, size: int, range_size: int):
+        self.key = key
+        self.path = path
+        self.part_path = path.with_name(path.name + ".part")
+        self.size = size
+        self.range_size = range_size
+        self.range_count = max(1, -(-size // range_size))
+        # Anonymous shared mapping: survives fork() as the same memory
+        self.done = mmap.mmap(-1, self.range_count)
+        self.ranges_done = 0
+        self.bytes_done = 0
+        self.complete = False
+        self.error: Optional[str] = None
+        self.started_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.fd: Optional[int] = None
+        # Set in forked workers: another process owns the download and its descriptor
+        self.forked = False
+        self.started = False
+
+    def reopen(self) -> Optional[int]:
+        """Open the copy in a forked worker once the downloading process has created it."""
+        for path in (self.part_path, self.path):
+            try:
+                self.fd = os.open(path, os.O_RDONLY)
+                return self.fd
+            except FileNotFoundError:
+                continue
+        return None
+
+    def covers(self, offset: int, length: int) -> bool:
+        if self.complete:
+            return True
+        if length <= 0:
+            return False
+        if self.fd is None and not (self.forked and self.reopen() is not None):
+            return False
+        first = offset // self.range_size
+        last = min((offset + length - 1) // self.range_size, self.range_count - 1)
+        done = self.done
+        for i in range(first, last + 1):
+            if not done[i]:
+                return False
+        return True
+
+    def stats(self) -> dict:
+        end = self.finished_at or time.monotonic()
+        ranges_done, bytes_done, complete = self.ranges_done, self.bytes_done, self.complete
+        if self.forked:
+            # The counters belong to the master; the shared flags are current
+            flags = self.done[:]
+            ranges_done = flags.count(1)
+            bytes_done = ranges_done * self.range_size
+            if ranges_done and flags[-1]:
+                bytes_done = self.size - (self.range_count - ranges_done) * self.range_size
+            complete = ranges_done == self.range_count
+        return {
+            "bytes_total": self.size,
+            "bytes_done": bytes_done,
+            "ranges_total": self.range_count,
+            "ranges_done": ranges_done,
+            "progress": round(bytes_done / self.size, 4) if self.size else 1.0,
+            "complete": complete,
+            "elapsed_seconds": round(end - self.started_at, 3),
+            "error": self.error,
+        }
+
+
+class ProgressiveLocalBackend(StorageBackend):
+    """
+    S3 backend that migrates meaning reads to a local copy as it downloads.
+
+    Args:
+        remote: Backend holding the authoritative objects (S3)
+        root_dir: Local directory for the copy (local SSD)
+        range_size: Bytes per download range (and per routing decision)
+        concurrency: Ranges downloaded in parallel
+        downloader: Backend the copy is downloaded from (default: `remote`),
+            typically the unwrapped backend `remote` protects. It is closed
+            and reset after fork through `remote`, not separately
+    """
+
+    name = "progressive"
+
+    def __init__(self, remote: StorageBackend, root_dir: str,
+                 range_size: int = 16 * 1024 * 1024, concurrency: int = 4,
+                 downloader: Optional[StorageBackend] = None):
+        self.remote = remote
+        self.downloader = downloader or remote
+        self.root = Path(root_dir).resolve()
+        self.range_size = range_size
+        self.concurrency = concurrency
+        self._downloads: dict[str, _Download] = {}
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.local_reads = 0
+        self.remote_reads = 0
+        self.local_bytes = 0
+        self.remote_bytes = 0
+
+    def read_bytes(self, key: str) -> bytes:
+        return self.remote.read_bytes(key)
+
+    def get_size(self, key: str) -> int:
+        download = self._downloads.get(key)
+        if download is not None:
+            return download.size
+        return self.remote.get_size(key)
+
+    def read_range(self, key: str, offset: int, length: int) -> bytes:
+        download = self._downloads.get(key)
+        if download is not None and download.covers(offset, length):
+            data = os.pread(download.fd, length, offset)
+            if len(data) == length:
+                with self._stats_lock:
+                    self.local_reads += 1
+                    self.local_bytes += length
+                observe_storage_read("local", length)
+                return data
+
+        data = self.remote.read_range(key, offset, length)
+        with self._stats_lock:
+            self.remote_reads += 1
+            self.remote_bytes += length
+        observe_storage_read("remote", length)
+        return data
+
+    def prefetch(self, key: str, start: bool = True) -> None:
+        with self._lock:
+            if key not in self._downloads:
+                path = (self.root / key).resolve()
+                if self.root not in path.parents:
+                    raise ValueError(f"Invalid object key: {key}")
+                self._downloads[key] = _Download(key, path, self.downloader.get_size(key), self.range_size)
+        if start:
+            self.start_prefetch()
+
+    def unprotected(self) -> StorageBackend:
+        return self.downloader.unprotected()
+
+    def _claim_pending(self) -> list[_Download]:
+        with self._lock:
+            pending = [d for d in self._downloads.values() if not d.started and not d.forked]
+            for download in pending:
+                download.started = True
+        return pending
+
+    def start_prefetch(self) -> None:
+        for download in self._claim_pending():
+            thread = threading.Thread(
+                target=self._run_download, args=(download,), name=f"localize-{download.key}", daemon=True
+            )
+            thread.start()
+
+    def run_prefetch(self) -> None:
+        # A process forked for the downloads: they are ours, the parent's locks
+        # and connections are not
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.remote.after_fork()
+        for download in self._claim_pending():
+            self._run_download(download)
+
+    def _run_download(self, download: _Download) -> None:
+        download.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # A finished copy from a previous run - data files are immutable per key
+        if download.path.exists() and download.path.stat().st_size == download.size:
+            download.fd = os.open(download.path, os.O_RDONLY)
+            download.done[:] = b"\x01" * download.range_count
+            download.ranges_done = download.range_count
+            download.bytes_done = download.size
+            download.complete = True
+            download.finished_at = time.monotonic()
+            observe_localize(download.key, download.size, download.size, True)
+            print(f"✓ Reusing local copy of {download.key}")
+            return
+
+        fd = os.open(download.part_path, os.O_RDWR | os.O_CREAT, 0o644)
+        os.ftruncate(fd, download.size)
+        download.fd = fd
+        observe_localize(download.key, 0, download.size, False)
+        print(f"Localizing {download.key}: {download.size / (1024 ** 2):,.1f} MB "
+              f"in {download.range_count} ranges ({self.concurrency} parallel)")
+
+        def fetch(index: int) -> int:
+            if self._stop.is_set():
+                return 0
+            start = index * download.range_size
+            length = min(download.range_size, download.size - start)
+            data = self.downloader.read_range(download.key, start, length)
+            os.pwrite(fd, data, start)
+            download.done[index] = 1
+            return length
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency,
+                                    thread_name_prefix="localize") as pool:
+                futures = [pool.submit(fetch, i) for i in range(download.range_count)]
+                for future in as_completed(futures):
+                    written = future.result()
+                    if written:
+                        download.ranges_done += 1
+                        download.bytes_done += written
+                        observe_localize(download.key, download.bytes_done, download.size, False)
+
+            if self._stop.is_set():
+                return
+
+            os.fsync(fd)
+            os.replace(download.part_path, download.path)
+            download.complete = True
+            download.finished_at = time.monotonic()
+            observe_localize(download.key, download.size, download.size, True)
+            elapsed = download.finished_at - download.started_at
+            print(f"✓ Localized {download.key} in {elapsed:.1f}s - meaning reads are now local")
+        except Exception as e:
+            # Reads keep falling back to S3 for the missing ranges
+            download.error = str(e)
+            print(f"✗ Localizing {download.key} failed: {e}")
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            reads = {
+                "local": self.local_reads,
+                "remote": self.remote_reads,
+                "local_bytes": self.local_bytes,
+                "remote_bytes": self.remote_bytes,
+            }
+        return {
+            "backend": self.name,
+            "reads": reads,
+            "downloads": {key: download.stats() for key, download in self._downloads.items()},
+        }
+
+    def close(self) -> None:
+        self._stop.set()
+        with self._lock:
+            for download in self._downloads.values():
+                if download.fd is not None:
+                    os.close(download.fd)
+                    download.fd = None
+            self._downloads.clear()
+        self.remote.close()
+
+    def after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        for download in self._downloads.values():
+            # Reads reopen the copy lazily once the downloading process has created it
+            download.forked = True
+            if download.fd is not None:
+                os.close(download.fd)
+                download.fd = None
+        self.remote.after_fork()
@@ -0,0 +1,194 @@
+"""
+S3 storage backend - byte-range GETs against the configured bucket.
+"""
+
+import time
+from typing import TYPE_CHECKING, Optional
+from src.config.settings import env_settings
+from src.errors import (
+    NotFoundException,
+    InternalServerException,
+    ServiceUnavailableException
+)
+from src.storage.base import StorageBackend
+from src.metrics import observe_s3
+
+if TYPE_CHECKING:
+    from botocore.exceptions import ClientError
+
+
+def get_s3_client(read_timeout: int = 30):
+    """Create and return an S3 client with credentials from environment settings."""
+    import boto3
+    from botocore.config import Config
+
+    # Configure client with connection pooling and timeouts
+    config = Config(
+        retries={'max_attempts': 3, 'mode': 'adaptive'},
+        connect_timeout=5,
+        read_timeout=read_timeout,
+        max_pool_connections=50
+    )
+
+    return boto3.client(
+        "s3",
+        aws_access_key_id=env_settings.access_key,
+        aws_secret_access_key=env_settings.secret_key,
+        region_name=env_settings.region,
+        config=config
+    )
+
+
+class S3StorageBackend(StorageBackend):
+    """
+    Reads objects from S3.
+
+    One client is created per backend and reused, so the connection pool
+    survives across requests. Large objects (index) use a longer read timeout.
+    boto3/botocore are imported with the first client, not with this module.
+    """
+
+    name = "s3"
+
+    def __init__(self, bucket_name: Optional[str] = None):
+        self.bucket_name = bucket_name if bucket_name is not None else env_settings.bucket_name
+        self._client = None
+        self._bulk_client = None
+
+    def after_fork(self) -> None:
+        # botocore connection pools must not be shared across processes
+        self._client = None
+        self._bulk_client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_s3_client()
+        return self._client
+
+    @property
+    def bulk_client(self):
+        if self._bulk_client is None:
+            self._bulk_client = get_s3_client(120)
+        return self._bulk_client
+
+    def _check_bucket(self) -> None:
+        if not self.bucket_name or not self.bucket_name.strip():
+            raise InternalServerException(
+                detail="Bucket is not configured properly. Please contact to administrator"
+            )
+
+    def read_bytes(self, key: str) -> bytes:
+        self._check_bucket()
+        start = time.perf_counter()
+        try:
+            response = self.bulk_client.get_object(Bucket=self.bucket_name, Key=key)
+            data = response['Body'].read()
+        except Exception as e:
+            observe_s3("get_object", s3_error_code(e), time.perf_counter() - start)
+            raise
+        observe_s3("get_object", "OK", time.perf_counter() - start, len(data))
+        return data
+
+    def get_size(self, key: str) -> int:
+        self._check_bucket()
+        start = time.perf_counter()
+        try:
+            response = self.client.head_object(Bucket=self.bucket_name, Key=key)
+        except Exception as e:
+            observe_s3("head_object", s3_error_code(e), time.perf_counter() - start)
+            raise
+        observe_s3("head_object", "OK", time.perf_counter() - start)
+        return response['ContentLength']
+
+    def read_range(self, key: str, offset: int, length: int) -> bytes:
+        from botocore.exceptions import (
+            ClientError,
+            ConnectionClosedError,
+            ConnectTimeoutError,
+            EndpointConnectionError,
+            NoCredentialsError,
+            PartialCredentialsError,
+            ReadTimeoutError,
+        )
+
+        self._check_bucket()
+
+        # Calculate the byte range: bytes=start-end (end is inclusive in S3)
+        byte_range = f"bytes={offset}-{offset + length - 1}"
+
+        start = time.perf_counter()
+        try:
+            try:
+                # Get object with specific byte range
+                response = self.client.get_object(
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    Range=byte_range
+                )
+                data = response['Body'].read()
+            except Exception as e:
+                observe_s3("get_range", s3_error_code(e), time.perf_counter() - start)
+                raise
+            observe_s3("get_range", "OK", time.perf_counter() - start, len(data))
+            return data
+
+        except NoCredentialsError:
+            raise InternalServerException(
+                detail="AWS credentials not configured properly"
+            )
+        except PartialCredentialsError:
+            raise InternalServerException(
+                detail="Incomplete AWS credentials"
+            )
+        except ClientError as e:
+            raise map_s3_client_error(e, key, offset, length, self.bucket_name)
+        except (EndpointConnectionError, ConnectTimeoutError, ReadTimeoutError, ConnectionClosedError) as e:
+            # S3 unreachable or not answering: an outage, not a fault of ours
+            raise ServiceUnavailableException(
+                detail=f"S3 unreachable: {str(e)}"
+            )
+        except Exception as e:
+            raise InternalServerException(
+                detail=f"Unexpected error reading from S3: {str(e)}"
+            )
+
+
+def s3_error_code(e: Exception) -> str:
+    """S3 error code of a ClientError (e.g. SlowDown), else the exception type."""
+    response = getattr(e, "response", None)
+    if isinstance(response, dict):
+        return response.get('Error', {}).get('Code', 'Unknown')
+    return type(e).__name__
+
+
+def map_s3_client_error(e: "ClientError", key: str, offset: int, length: int, bucket_name: str) -> Exception:
+    """Convert a botocore ClientError into the matching AppException."""
+    error_code = e.response.get('Error', {}).get('Code', 'Unknown')
+    error_message = e.response.get('Error', {}).get('Message', str(e))
+
+    if error_code == 'NoSuchKey':
+        return NotFoundException(
+            detail=f"Meaning data file '{key}' not found in S3",
+            resource="S3 Object"
+        )
+    elif error_code == 'NoSuchBucket':
+        return InternalServerException(
+            detail=f"S3 bucket '{bucket_name}' does not exist"
+        )
+    elif error_code == 'AccessDenied':
+        return InternalServerException(
+            detail="Access denied to S3 resource. Check IAM permissions"
+        )
+    elif error_code in ['RequestTimeout', 'ServiceUnavailable', 'SlowDown', 'InternalError']:
+        return ServiceUnavailableException(
+            detail=f"S3 service temporarily unavailable: {error_message}"
+        )
+    elif error_code == 'InvalidRange':
+        return InternalServerException(
+            detail=f"Invalid byte range requested: offset={offset}, length={length}"
+        )
+    else:
+        return InternalServerException(
+            detail=f"S3 error ({error_code}): {error_message}"
+        )
@@ -1,3 +1,27 @@
-from src.utils.utils import get_s3_client, read_json_from_s3, load_index_from_local, read_meaning_from_s3
+from src.utils.utils import get_s3_client, read_json_from_s3, load_index_from_local, read_meaning, get_meaning_reader, get_last_known_meanings, get_search_responses
+from src.utils.compression import PrecompressedBody, negotiate_encoding, supported_encodings
+from src.utils.response_cache import ResponseCache
+from src.utils.http_cache import make_etag, encoded_etag, matching_etag, cache_control
+from src.utils.serialization import FastJSONResponse, dumps_json, success_body, utc_timestamp
 
-__all__ = ["get_s3_client", "read_json_from_s3", "load_index_from_local", "read_meaning_from_s3"]
\ No newline at end of file
+__all__ = [
+    "get_s3_client",
+    "read_json_from_s3",
+    "load_index_from_local",
+    "read_meaning",
+    "get_meaning_reader",
+    "get_last_known_meanings",
+    "get_search_responses",
+    "PrecompressedBody",
+    "negotiate_encoding",
+    "supported_encodings",
+    "ResponseCache",
+    "make_etag",
+    "encoded_etag",
+    "matching_etag",
+    "cache_control",
+    "FastJSONResponse",
+    "dumps_json",
+    "success_body",
+    "utc_timestamp",
+]
@@ -0,0 +1,152 @@
+"""
+Precompressed response bodies.
+
+A /search response is made of a static part (word, meaning, message) and a few
+per-request fields (timestamp, request_id). The static part is compressed once
+and cached; on each request only the small tail is compressed and spliced on,
+so identical meaning bytes are never recompressed by GZipMiddleware.
+
+- gzip: the prefix is deflated with a full flush (byte-aligned, no back
+  references past the flush point), the tail is deflated separately and the
+  CRC32/ISIZE trailer is computed by continuing the cached prefix CRC.
+- br: the prefix is brotli-compressed with a flush, the tail is appended as an
+  uncompressed meta-block followed by an empty last meta-block. Only available
+  when the optional `brotli` package is installed.
+"""
+
+import struct
+import zlib
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # brotli is optional - gzip is always available
+    brotli = None
+
+# gzip member header: magic, deflate, no flags, mtime=0, xfl=0, OS=unknown
+GZIP_HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"
+
+# Brotli empty last meta-block: ISLAST=1, ISLASTEMPTY=1
+BROTLI_LAST_EMPTY = b"\x03"
+
+# Largest tail that fits in a 4-nibble brotli uncompressed meta-block
+BROTLI_MAX_TAIL = 1 << 16
+
+
+def supported_encodings() -> tuple[str, ...]:
+    """Content codings this server can produce, in order of preference."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the preferred content coding allowed by an Accept-Encoding header.
+
+    Honours q-values (q=0 disables a coding) and the `*` wildcard.
+
+    Returns:
+        str | None: "br", "gzip" or None if the client only accepts identity
+    """
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+
+    best, best_q = None, 0.0
+    for coding in supported_encodings():
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class PrecompressedBody:
+    """
+    Static response prefix kept both raw and compressed.
+
+    `encode(tail, encoding)` returns a complete, standards-compliant body for
+    `prefix + tail` in the requested coding, compressing only the tail.
+    `encodings` selects which compressed prefixes are built (default: all
+    supported); `identity(tail)` needs none.
+    """
+
+    __slots__ = ("prefix", "level", "_gzip_prefix", "_prefix_crc", "_br_prefix")
+
+    def __init__(self, prefix: bytes, level: int = 6, encodings: Optional[tuple[str, ...]] = None):
+        self.prefix = prefix
+        self.level = level
+        if encodings is None:
+            encodings = supported_encodings()
+
+        self._gzip_prefix = None
+        self._prefix_crc = 0
+        if "gzip" in encodings:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+            self._gzip_prefix = compressor.compress(prefix) + compressor.flush(zlib.Z_FULL_FLUSH)
+            self._prefix_crc = zlib.crc32(prefix)
+
+        self._br_prefix = None
+        if brotli is not None and "br" in encodings:
+            br_compressor = brotli.Compressor(quality=min(level, 11))
+            self._br_prefix = br_compressor.process(prefix) + br_compressor.flush()
+
+    def __len__(self) -> int:
+        return len(self.prefix)
+
+    @property
+    def compressed_size(self) -> int:
+        """Bytes held by the cached compressed prefixes."""
+        return len(self._gzip_prefix or b"") + len(self._br_prefix or b"")
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the raw and compressed prefixes."""
+        return len(self.prefix) + self.compressed_size
+
+    def identity(self, tail: bytes) -> bytes:
+        return self.prefix + tail
+
+    def gzip(self, tail: bytes) -> bytes:
+        if self._gzip_prefix is None:
+            raise RuntimeError("gzip prefix was not built for this body")
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        deflated_tail = compressor.compress(tail) + compressor.flush(zlib.Z_FINISH)
+        trailer = struct.pack(
+            "<II",
+            zlib.crc32(tail, self._prefix_crc),
+            (len(self.prefix) + len(tail)) & 0xFFFFFFFF,
+        )
+        return GZIP_HEADER + self._gzip_prefix + deflated_tail + trailer
+
+    def brotli(self, tail: bytes) -> bytes:
+        if self._br_prefix is None:
+            raise RuntimeError("brotli prefix was not built for this body (or brotli is not installed)")
+        if not tail:
+            return self._br_prefix + BROTLI_LAST_EMPTY
+        if len(tail) > BROTLI_MAX_TAIL:
+            raise ValueError(f"Tail too large for an uncompressed meta-block: {len(tail)} bytes")
+
+        # ISLAST=0 (1 bit), MNIBBLES=4 (2 bits, value 0), MLEN-1 (16 bits),
+        # ISUNCOMPRESSED=1 (1 bit), zero padding to the byte boundary.
+        header = (((len(tail) - 1) << 3) | (1 << 19)).to_bytes(3, "little")
+        return self._br_prefix + header + tail + BROTLI_LAST_EMPTY
+
+    def encode(self, tail: bytes, encoding: str) -> bytes:
+        if encoding == "gzip":
+            return self.gzip(tail)
+        if encoding == "br":
+            return self.brotli(tail)
+        raise ValueError(f"Unsupported content encoding: {encoding}")
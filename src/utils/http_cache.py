@@ -0,0 +1,62 @@
+"""
+HTTP validators for dictionary responses.
+
+Meanings only change when a build publishes a new manifest, so a response is
+fully determined by the index generation and the request key (word, or query
+and limit). The ETag is a hash of both; `If-None-Match` can then be answered
+with 304 before any storage read, and CDNs/browsers can revalidate cheaply.
+
+Compressed representations get the coding appended (`"<tag>-gzip"`, as
+Apache does) so each stays a distinct strong validator; `If-None-Match`
+accepts any coding of the current tag.
+"""
+
+import hashlib
+from typing import Optional
+
+
+def make_etag(generation: str, *key) -> str:
+    """Strong ETag for a response of this index generation and request key."""
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(generation.encode("utf-8"))
+    for part in key:
+        digest.update(b"\0")
+        digest.update(str(part).encode("utf-8"))
+    return f'"{digest.hexdigest()}"'
+
+
+def encoded_etag(etag: str, encoding: Optional[str]) -> str:
+    """ETag of a compressed representation."""
+    if not encoding:
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def matching_etag(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """
+    The validator in an If-None-Match header that matches `etag` in any coding.
+
+    Returns:
+        str | None: The matching tag (to echo in the 304), or None
+    """
+    if not if_none_match:
+        return None
+    opaque = etag.strip('"')
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return etag
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        candidate = candidate.strip('"')
+        if candidate == opaque or candidate.startswith(opaque + "-"):
+            return f'"{candidate}"'
+    return None
+
+
+def cache_control(max_age: int, shared_max_age: Optional[int] = None) -> str:
+    """Cache-Control value for a public, generation-scoped response."""
+    value = f"public, max-age={max_age}"
+    if shared_max_age is not None:
+        value += f", s-maxage={shared_max_age}"
+    return value
@@ -0,0 +1,52 @@
+"""
+Fast JSON responses.
+
+Route handlers that return dicts are validated against their response_model
+and re-serialized by FastAPI on every request. The hot endpoints instead build
+the response already in SuccessResponse shape and return it as a
+FastJSONResponse, which skips validation and encodes with orjson when it is
+installed. `response_model` stays on the routes, so the OpenAPI schema is
+unchanged.
+"""
+
+import json
+from datetime import datetime, timezone
+from typing import Any, Optional
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # orjson is optional - the stdlib encoder produces the same JSON
+    orjson = None
+
+
+def dumps_json(content: Any) -> bytes:
+    """Compact UTF-8 JSON, the same bytes FastAPI's JSONResponse would send."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def utc_timestamp() -> str:
+    """Current UTC time as serialized for SuccessResponse.timestamp."""
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def success_body(data: Any, message: Optional[str], request_id: Optional[str], result_count: int) -> dict:
+    """A SuccessResponse payload with fields in schema order."""
+    return {
+        "status": "success",
+        "data": data,
+        "message": message,
+        "timestamp": utc_timestamp(),
+        "request_id": request_id,
+        "result_count": result_count,
+    }
+
+
+class FastJSONResponse(Response):
+    """JSONResponse without validation; content must already be JSON-compatible."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
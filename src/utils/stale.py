@@ -0,0 +1,56 @@
+"""
+Last-known meanings, served while storage is failing.
+
+The meaning LRU is keyed by byte range, so after an index reload its entries
+can no longer be found for a word. This store is keyed by the exact word
+(index lookups are case-sensitive: "Apple" and "apple" are different titles)
+and survives generations: during an S3 outage a word that was served before -
+from the current or a previous index - is still answered, marked as stale.
+
+Entries reference the same str objects held by the meaning LRU, so the store
+costs little beyond its dict slots.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+class StaleMeaningStore:
+    """Bounded, thread-safe LRU of word -> last meaning served."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def remember(self, word: str, meaning: str) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[word] = meaning
+            self._entries.move_to_end(word)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get(self, word: str) -> Optional[str]:
+        with self._lock:
+            meaning = self._entries.get(word)
+            if meaning is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return meaning
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_size": self.max_size,
+            "stale_hits": self.hits,
+            "stale_misses": self.misses,
+        }
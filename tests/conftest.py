@@ -0,0 +1,24 @@
+'''
+Shared pytest setup.
+
+Tests import the app packages (`src.*`) from the repository root and the build
+scripts the way they import each other (`from record_format import ...`).
+'''
+
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+for path in (PROJECT_ROOT, PROJECT_ROOT / "scripts"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+# Settings require AWS variables; tests never talk to AWS.
+for _name, _value in {
+    "AWS_ACCESS_KEY": "test",
+    "AWS_SECRET_KEY": "test",
+    "AWS_REGION": "us-east-1",
+    "AWS_BUCKET_NAME": "test",
+}.items():
+    os.environ.setdefault(_name, _value)
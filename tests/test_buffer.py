@@ -0,0 +1,76 @@
+import random
+import zlib
+
+import pytest
+
+from src.errors import InternalServerException
+from src.storage import buffer
+from src.storage.buffer import InMemoryDataBackend, load_in_memory_if_small
+from src.storage.circuit_breaker import CircuitBreakerBackend
+from src.storage.hedging import HedgedStorageBackend
+from src.storage.memory import MemoryStorageBackend
+
+KEY = "dict/data.bin"
+
+
+def make_backend(data, monkeypatch, chunk_size, **kwargs):
+    # Small load chunks so blocks straddle chunk boundaries
+    monkeypatch.setattr(buffer, "LOAD_CHUNK_SIZE", chunk_size)
+    remote = MemoryStorageBackend({KEY: data, "manifest.json": b"{}"})
+    return InMemoryDataBackend(remote, KEY, len(data), **kwargs)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1000, 5000])
+@pytest.mark.parametrize("compression", ["none", "zlib"])
+def test_range_reads_match_the_data_file(monkeypatch, chunk_size, compression):
+    rng = random.Random(chunk_size)
+    data = bytes(rng.randrange(256) for _ in range(3000))
+    backend = make_backend(data, monkeypatch, chunk_size, compression=compression, block_size=100)
+    for _ in range(200):
+        offset = rng.randrange(len(data))
+        length = rng.randint(1, len(data) - offset)
+        chunk = backend.read_range(KEY, offset, length)
+        assert type(chunk) is bytes
+        assert chunk == data[offset:offset + length]
+    assert backend.read_bytes(KEY) == data
+
+
+@pytest.mark.parametrize("chunk_size", [1, 30, 100, 250, 4096])
+def test_zlib_blocks_are_independent_and_full_size(monkeypatch, chunk_size):
+    data = bytes(range(256)) * 4  # 1024 bytes: 10 full blocks and a 24-byte tail
+    backend = make_backend(data, monkeypatch, chunk_size, compression="zlib", block_size=100)
+    offsets = backend._block_offsets
+    assert len(offsets) == 12
+    blocks = [zlib.decompress(backend._buffer[offsets[i]:offsets[i + 1]]) for i in range(len(offsets) - 1)]
+    assert [len(block) for block in blocks] == [100] * 10 + [24]
+    assert b"".join(blocks) == data
+
+
+def test_other_keys_and_bad_ranges(monkeypatch):
+    backend = make_backend(b"0123456789", monkeypatch, 4)
+    assert backend.read_bytes("manifest.json") == b"{}"
+    assert backend.get_size(KEY) == 10
+    with pytest.raises(InternalServerException):
+        backend.read_range(KEY, 8, 5)
+
+
+class RemoteBackend(MemoryStorageBackend):
+    # Stands in for S3: a "memory" backend is never loaded into memory again
+    name = "s3"
+
+
+def test_data_file_loads_around_hedging_and_the_breaker(monkeypatch):
+    monkeypatch.setattr(buffer, "LOAD_CHUNK_SIZE", 4)
+    raw = RemoteBackend({KEY: b"0123456789"})
+    hedged = HedgedStorageBackend(raw)
+    protected = CircuitBreakerBackend(hedged)
+    try:
+        backend = load_in_memory_if_small(protected, {"file_path": KEY, "file_size": 10}, max_bytes=100)
+        assert backend.name == "in-memory"
+        assert backend.read_range(KEY, 2, 5) == b"23456"
+    finally:
+        protected.close()
+    # 3 load reads, none recorded by the hedging latency window or the breaker
+    assert hedged.reads == 0
+    assert len(hedged.tracker.samples) == 0
+    assert len(protected._outcomes) == 0
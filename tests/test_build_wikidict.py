@@ -0,0 +1,152 @@
+import csv
+import io
+import json
+import random
+
+import pytest
+
+build_wikidict = pytest.importorskip("build_wikidict")
+
+from record_format import RecordWriter, iter_records  # noqa: E402
+
+
+def data_file(records):
+    data = io.BytesIO()
+    writer = RecordWriter(data)
+    for title, value in records:
+        writer.write(title, value)
+    return data.getvalue()
+
+
+def changelog_csv(rows, header=("title", "value", "op")):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(header)
+    writer.writerows(rows)
+    return out.getvalue()
+
+
+def rewrite(base, changelog):
+    output, index = io.BytesIO(), io.StringIO()
+    build_wikidict.update_wikidict(io.BytesIO(base), io.StringIO(changelog), output, index)
+    return output.getvalue(), json.loads(index.getvalue())
+
+
+def delta_then_compact(base, changelog):
+    changes = build_wikidict.read_changelog(io.StringIO(changelog))
+    delta, delta_index = io.BytesIO(), io.StringIO()
+    build_wikidict.write_delta(changes, delta, delta_index)
+    output, index = io.BytesIO(), io.StringIO()
+    build_wikidict.compact_wikidict(io.BytesIO(base), [io.BytesIO(delta.getvalue())],
+                                    [json.loads(delta_index.getvalue())], output, index)
+    return output.getvalue(), json.loads(index.getvalue())
+
+
+def records(data):
+    return [(record["title"], record["value"]) for record in iter_records(io.BytesIO(data))]
+
+
+def test_rewrite_drops_deleted_titles():
+    base = data_file([("apple", "fruit"), ("banana", "yellow"), ("cherry", "red")])
+    changelog = changelog_csv([
+        ("apple", "", "delete"),
+        ("banana", "long, yellow", ""),
+        ("date", "", "DELETE "),
+        ("elder", "tree", ""),
+    ])
+    data, index = rewrite(base, changelog)
+    assert records(data) == [("banana", "long, yellow"), ("cherry", "red"), ("elder", "tree")]
+    assert list(index) == ["banana", "cherry", "elder"]
+    for title, entry in index.items():
+        assert data[entry["offset"]:entry["offset"] + entry["length"]] == dict(records(data))[title].encode()
+
+
+def test_changelog_without_op_column_only_upserts():
+    base = data_file([("apple", "fruit")])
+    changelog = changelog_csv([("apple", "delete"), ("banana", "")], header=("title", "value"))
+    data, _ = rewrite(base, changelog)
+    assert records(data) == [("apple", "delete"), ("banana", "")]
+
+
+def test_short_changelog_row_has_an_empty_value():
+    base = data_file([("apple", "fruit")])
+    changelog = "title,value,op\r\napple\r\nbanana,yellow\r\n"
+    assert records(rewrite(base, changelog)[0]) == [("apple", ""), ("banana", "yellow")]
+    assert records(delta_then_compact(base, changelog)[0]) == [("apple", ""), ("banana", "yellow")]
+
+
+def mixed_case_title(rng, count):
+    return "".join(c.upper() if rng.random() < 0.5 else c for c in f"ab{rng.randrange(count)}")
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_rewrite_and_delta_modes_build_the_same_dictionary(seed):
+    rng = random.Random(seed)
+    # One spelling per title in the base; the changelog may use others, several times
+    base_titles = {}
+    for _ in range(rng.randrange(60)):
+        title = mixed_case_title(rng, 100)
+        base_titles.setdefault(title.lower(), title)
+    base = data_file([(title, f"value of {title}") for title in sorted(base_titles.values(), key=str.lower)])
+    rows = []
+    for _ in range(rng.randrange(40)):
+        title = mixed_case_title(rng, 100)
+        rows.append((title, "", "delete") if rng.random() < 0.4 else (title, f'new, "{title}"\nvalue', ""))
+    changelog = changelog_csv(sorted(rows, key=lambda row: row[0].lower()))
+
+    rewritten, rewritten_index = rewrite(base, changelog)
+    compacted, compacted_index = delta_then_compact(base, changelog)
+    assert rewritten == compacted
+    assert rewritten_index == compacted_index
+
+
+def test_changelog_title_replaces_the_base_spelling():
+    base = data_file([("apple", "fruit"), ("banana", "yellow")])
+    changelog = changelog_csv([("Apple", "company", "")])
+    assert records(rewrite(base, changelog)[0]) == [("Apple", "company"), ("banana", "yellow")]
+    assert records(delta_then_compact(base, changelog)[0]) == [("Apple", "company"), ("banana", "yellow")]
+
+
+def test_read_changelog_keeps_the_last_row_per_title():
+    changelog = changelog_csv([("a", "1", ""), ("b", "2", ""), ("A", "", "delete"), ("b", "3", ""), ("B", "4", "")])
+    assert build_wikidict.read_changelog(io.StringIO(changelog)) == {"a": ("A", None), "b": ("B", "4")}
+
+
+@pytest.mark.parametrize("deltas, expected", [
+    ([], False),
+    ([{"file_size": 10}] * 7, False),
+    ([{"file_size": 10}] * 8, True),
+    ([{"file_size": 300}], True),
+])
+def test_needs_compaction(deltas, expected):
+    manifest = {"file_size": 1000, "deltas": deltas}
+    assert build_wikidict.needs_compaction(manifest, max_deltas=8, max_delta_ratio=0.25) is expected
+
+
+@pytest.mark.parametrize("manifest, expected", [
+    ({"file_path": "dict/20240101/data.csv"}, True),
+    # A CSV data file published under another name is still CSV
+    ({"file_path": "dict/20240101/data.bin"}, True),
+    ({"file_path": "dict/20240101/data.csv", "data_format": "binary-v1"}, False),
+])
+def test_data_format_comes_from_the_manifest(manifest, expected):
+    assert build_wikidict.is_legacy_csv(manifest) == expected
+
+
+def test_legacy_csv_and_binary_base_merge_the_same():
+    base_records = [("apple", 'fruit, "red"'), ("Banana", "yellow\nlong")]
+    legacy = io.StringIO()
+    writer = csv.writer(legacy)
+    writer.writerow(["title", "value"])
+    writer.writerows(base_records)
+    changelog = changelog_csv([("apple", "green", ""), ("cherry", "red", "")], header=("title", "value", "op"))
+    # Blank lines in the changelog are skipped, as csv.DictReader does
+    changelog = changelog.replace("\r\ncherry", "\r\n\r\ncherry")
+
+    outputs = []
+    for base, legacy_csv in ((data_file(base_records), False), (legacy.getvalue().encode("utf-8"), True)):
+        output, index = io.BytesIO(), io.StringIO()
+        build_wikidict.update_wikidict(io.BytesIO(base), io.StringIO(changelog), output, index, legacy_csv=legacy_csv)
+        outputs.append((output.getvalue(), index.getvalue()))
+    assert outputs[0] == outputs[1]
+    assert records(outputs[0][0]) == [("apple", "green"), ("Banana", "yellow\nlong"), ("cherry", "red")]
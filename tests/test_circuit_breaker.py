@@ -0,0 +1,143 @@
+import pytest
+
+from src.errors import InternalServerException, NotFoundException, ServiceUnavailableException
+from src.storage import circuit_breaker
+from src.storage.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreakerBackend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class FlakyRemote:
+    """Range reads that raise `error` while it is set."""
+
+    name = "fake"
+
+    def __init__(self):
+        self.error = None
+        self.calls = 0
+
+    def read_range(self, key, offset, length):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return b"ok"
+
+    def stats(self):
+        return {"backend": self.name}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(circuit_breaker, "time", clock)
+    return clock
+
+
+def make_breaker(remote, **kwargs):
+    options = {"failure_rate": 0.5, "min_calls": 4, "window": 10, "open_seconds": 30.0, "half_open_probes": 2}
+    options.update(kwargs)
+    return CircuitBreakerBackend(remote, **options)
+
+
+def read(breaker):
+    return breaker.read_range("k", 0, 2)
+
+
+def fail(breaker, times):
+    for _ in range(times):
+        with pytest.raises(InternalServerException):
+            read(breaker)
+
+
+def test_opens_at_failure_rate_after_min_calls(clock):
+    remote = FlakyRemote()
+    breaker = make_breaker(remote)
+    remote.error = InternalServerException(detail="boom")
+    fail(breaker, 3)
+    # Below min_calls the rate is not evaluated
+    assert breaker.state == CLOSED
+    fail(breaker, 1)
+    assert breaker.state == OPEN
+
+    calls = remote.calls
+    with pytest.raises(ServiceUnavailableException):
+        read(breaker)
+    assert remote.calls == calls
+    assert breaker.stats()["circuit_breaker"]["rejected"] == 1
+
+
+def test_stays_closed_below_failure_rate(clock):
+    remote = FlakyRemote()
+    breaker = make_breaker(remote)
+    for _ in range(10):
+        assert read(breaker) == b"ok"
+    remote.error = InternalServerException(detail="boom")
+    fail(breaker, 4)
+    # 4 failures out of the last 10 calls
+    assert breaker.state == CLOSED
+    fail(breaker, 1)
+    assert breaker.state == OPEN
+
+
+def test_not_found_does_not_count_as_failure(clock):
+    remote = FlakyRemote()
+    breaker = make_breaker(remote)
+    remote.error = NotFoundException(detail="missing")
+    for _ in range(10):
+        with pytest.raises(NotFoundException):
+            read(breaker)
+    assert breaker.state == CLOSED
+    assert breaker.stats()["circuit_breaker"]["window_failures"] == 0
+
+
+def test_half_open_probes_close_the_circuit(clock):
+    remote = FlakyRemote()
+    breaker = make_breaker(remote)
+    remote.error = InternalServerException(detail="boom")
+    fail(breaker, 4)
+
+    clock.now += 29.0
+    with pytest.raises(ServiceUnavailableException):
+        read(breaker)
+
+    clock.now += 1.0
+    remote.error = None
+    assert read(breaker) == b"ok"
+    assert breaker.state == HALF_OPEN
+    assert read(breaker) == b"ok"
+    assert breaker.state == CLOSED
+    assert breaker.stats()["circuit_breaker"]["window_calls"] == 0
+
+
+def test_failed_probe_reopens_the_circuit(clock):
+    remote = FlakyRemote()
+    breaker = make_breaker(remote)
+    remote.error = InternalServerException(detail="boom")
+    fail(breaker, 4)
+
+    clock.now += 30.0
+    fail(breaker, 1)
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 2
+    with pytest.raises(ServiceUnavailableException):
+        read(breaker)
+
+
+def test_half_open_admits_at_most_the_probe_count(clock):
+    remote = FlakyRemote()
+    breaker = make_breaker(remote)
+    remote.error = InternalServerException(detail="boom")
+    fail(breaker, 4)
+    clock.now += 30.0
+
+    # Two probes in flight (admitted, not yet finished): a third call is rejected
+    assert breaker._before_call() is True
+    assert breaker._before_call() is True
+    with pytest.raises(ServiceUnavailableException):
+        breaker._before_call()
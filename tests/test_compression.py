@@ -0,0 +1,71 @@
+import gzip
+import zlib
+
+import pytest
+
+from src.utils.compression import PrecompressedBody, brotli, negotiate_encoding, supported_encodings
+
+PREFIX = b'{"status":"success","data":{"word":"Apple","meaning":"' + b"fruit " * 500 + b'"},'
+TAIL = b'"timestamp":"2026-01-01T00:00:00Z","request_id":"req_1","result_count":1}'
+
+
+@pytest.mark.parametrize("tail", [TAIL, b"", b"x"])
+def test_gzip_splice_decodes_to_prefix_and_tail(tail):
+    body = PrecompressedBody(PREFIX, encodings=("gzip",))
+    encoded = body.gzip(tail)
+    assert gzip.decompress(encoded) == PREFIX + tail
+    # A single member with a valid CRC32/ISIZE trailer, not just a lenient decoder
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert decompressor.decompress(encoded) == PREFIX + tail
+    assert decompressor.eof and decompressor.unused_data == b""
+
+
+def test_gzip_prefix_is_reused_across_tails():
+    body = PrecompressedBody(PREFIX, encodings=("gzip",))
+    for request in range(3):
+        tail = f'"request_id":"req_{request}"}}'.encode()
+        assert gzip.decompress(body.encode(tail, "gzip")) == PREFIX + tail
+
+
+@pytest.mark.skipif(brotli is None, reason="brotli is not installed")
+@pytest.mark.parametrize("tail", [TAIL, b"", b"x", b"y" * 65536])
+def test_brotli_splice_decodes_to_prefix_and_tail(tail):
+    body = PrecompressedBody(PREFIX, encodings=("br",))
+    assert brotli.decompress(body.brotli(tail)) == PREFIX + tail
+
+
+@pytest.mark.skipif(brotli is None, reason="brotli is not installed")
+def test_brotli_rejects_tail_over_one_meta_block():
+    body = PrecompressedBody(PREFIX, encodings=("br",))
+    with pytest.raises(ValueError):
+        body.brotli(b"y" * 65537)
+
+
+def test_identity_and_missing_coding():
+    body = PrecompressedBody(PREFIX, encodings=())
+    assert body.identity(TAIL) == PREFIX + TAIL
+    assert body.compressed_size == 0
+    with pytest.raises(RuntimeError):
+        body.gzip(TAIL)
+    with pytest.raises(ValueError):
+        body.encode(TAIL, "deflate")
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip;q=0", None),
+    ("deflate, gzip;q=0.5", "gzip"),
+    ("*", supported_encodings()[0]),
+    ("*, gzip;q=0", "br" if brotli is not None else None),
+])
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+@pytest.mark.skipif(brotli is None, reason="brotli is not installed")
+def test_negotiate_encoding_prefers_brotli_unless_weighted_lower():
+    assert negotiate_encoding("gzip, br") == "br"
+    assert negotiate_encoding("gzip, br;q=0.5") == "gzip"
@@ -0,0 +1,96 @@
+import random
+
+from src.config.delta_index import MISSING, DeltaOverlay, DeltaSegment
+
+
+def delta(number):
+    return {"file_path": f"dict/delta-{number}.bin", "data_format": "binary-v1"}
+
+
+def entry(offset):
+    return {"offset": offset, "length": 1}
+
+
+def overlay_of(*indexes):
+    """Overlay of delta indexes given oldest first."""
+    return DeltaOverlay.from_indexes((delta(number), index) for number, index in enumerate(indexes))
+
+
+def test_newest_segment_wins():
+    overlay = overlay_of(
+        {"apple": entry(1), "banana": entry(1), "cherry": entry(1)},
+        {"apple": entry(2), "banana": None},
+    )
+    apple = overlay.get("apple")
+    assert apple["offset"] == 2 and apple["file_path"] == "dict/delta-1.bin"
+    assert overlay.get("banana") is None
+    assert overlay.get("cherry")["file_path"] == "dict/delta-0.bin"
+    assert overlay.get("date") is MISSING
+    assert overlay.get("date", "default") == "default"
+    assert overlay.file_paths == ["dict/delta-0.bin", "dict/delta-1.bin"]
+    assert overlay.changed == 5 and overlay.deleted == 1
+
+
+def test_newer_segment_can_restore_a_deleted_title():
+    overlay = overlay_of({"apple": None}, {"apple": entry(3)})
+    assert overlay.get("apple")["offset"] == 3
+
+
+def test_title_spelled_differently_replaces_the_older_one():
+    overlay = overlay_of({"apple": entry(1)}, {"Apple": entry(2)})
+    assert overlay.get("Apple")["offset"] == 2
+    # "apple" (base or older delta) was replaced by "Apple", as in a full rewrite
+    assert overlay.get("apple") is None
+    assert overlay.get("APPLE") is None
+    assert overlay.get("banana") is MISSING
+
+
+def test_with_segment_leaves_the_original_unchanged():
+    base = overlay_of({"apple": entry(1)})
+    newer = base.with_segment(delta(1), {"apple": None, "kiwi": entry(2)})
+    assert base.get("apple")["offset"] == 1 and base.get("kiwi") is MISSING
+    assert newer.get("apple") is None and newer.get("kiwi")["offset"] == 2
+    assert newer.entry_maps == tuple(segment.entries for segment in newer.segments)
+    assert newer.file_paths == ["dict/delta-0.bin", "dict/delta-1.bin"]
+    assert not DeltaOverlay() and newer
+
+
+def test_segment_prefix_counts_include_deletes():
+    segment = DeltaSegment(delta(0), {"Apple": entry(1), "apricot": None, "banana": entry(2)})
+    assert segment.count_prefix("ap") == 2
+    assert segment.prefix_search("ap", 10) == ["Apple"]
+    assert segment.prefix_search("Ap", 10, case_sensitive=True) == ["Apple"]
+    assert segment.prefix_search("ap", 10, case_sensitive=True) == []
+
+
+def reference_suggestions(base_keys, indexes, query, limit):
+    """Apply the segments to a dict of the base, then scan it."""
+    titles = {key.lower(): key for key in base_keys}
+    for index in indexes:
+        for title, value in index.items():
+            if value is None:
+                titles.pop(title.lower(), None)
+            else:
+                titles[title.lower()] = title
+    matches = sorted((t for t in titles.values() if t.lower().startswith(query.lower())), key=str.lower)
+    return matches[:limit]
+
+
+def test_merge_suggestions_matches_applying_the_deltas():
+    rng = random.Random(11)
+    for _ in range(300):
+        pool = [f"{a}{b}" for a in "aAb" for b in "abcdefgh"]
+        # One spelling per title in the base; deltas may use the other
+        base_keys = sorted({key.lower(): key for key in rng.sample(pool, rng.randint(0, len(pool)))}.values(),
+                           key=str.lower)
+        indexes = [{title: (None if rng.random() < 0.4 else entry(n)) for title in rng.sample(pool, rng.randint(0, 6))}
+                   for n in range(rng.randint(1, 4))]
+        overlay = overlay_of(*indexes)
+        query = rng.choice(["a", "A", "b", "ab", "x"])
+        limit = rng.randint(1, 8)
+
+        base = [k for k in base_keys if k.lower().startswith(query.lower())]
+        base = base[:limit + overlay.shadowed_in_prefix(query)]
+        merged = overlay.merge_suggestions(base, query, limit)
+        expected = reference_suggestions(base_keys, indexes, query, limit)
+        assert merged == expected
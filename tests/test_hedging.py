@@ -0,0 +1,117 @@
+import threading
+import time
+
+import pytest
+
+from src.storage.hedging import HedgedStorageBackend, LatencyTracker
+
+
+class FakeRemote:
+    """Range reads that sleep `delays[call]` seconds (the last delay repeats)."""
+
+    name = "fake"
+
+    def __init__(self, delays, error=None):
+        self.delays = delays
+        self.error = error
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def read_range(self, key, offset, length):
+        with self._lock:
+            call = self.calls
+            self.calls += 1
+        time.sleep(self.delays[min(call, len(self.delays) - 1)])
+        if self.error is not None:
+            raise self.error
+        return f"{key}:{offset}:{length}".encode()
+
+    def stats(self):
+        return {"backend": self.name}
+
+    def close(self):
+        pass
+
+
+def hedged(remote, budget, delay_ms=1.0):
+    return HedgedStorageBackend(remote, budget=budget, min_delay_ms=delay_ms, initial_delay_ms=delay_ms)
+
+
+def test_budget_allows_one_hedge_per_earned_token():
+    backend = hedged(FakeRemote([0.02]), budget=0.25)
+    try:
+        for i in range(20):
+            assert backend.read_range("k", i, 1) == f"k:{i}:1".encode()
+        stats = backend.stats()["hedging"]
+    finally:
+        backend.close()
+    # Every read is slow: a token is earned every 4 reads and spent on a hedge
+    assert stats["reads"] == 20
+    assert stats["hedges"] == 5
+    assert stats["hedges_denied"] == 15
+    assert stats["hedge_rate"] == 0.25
+
+
+def test_budget_holds_under_concurrent_reads():
+    backend = hedged(FakeRemote([0.05]), budget=0.2)
+    # Keep the 1ms hedge delay: every read stays slower than it
+    backend.tracker.refresh_every = 10 ** 9
+    try:
+        threads = [threading.Thread(target=lambda: [backend.read_range("k", 0, 1) for _ in range(10)])
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = backend.stats()["hedging"]
+    finally:
+        backend.close()
+    assert stats["reads"] == 80
+    # Each slow read either hedged or was denied, and no count was lost
+    assert stats["hedges"] + stats["hedges_denied"] == 80
+    assert 0 < stats["hedges"] <= 80 * 0.2
+
+
+def test_fast_duplicate_wins():
+    # The primary takes 1s, the hedge answers at once
+    backend = hedged(FakeRemote([1.0, 0.0]), budget=1.0)
+    try:
+        start = time.perf_counter()
+        assert backend.read_range("k", 5, 3) == b"k:5:3"
+        elapsed = time.perf_counter() - start
+        stats = backend.stats()["hedging"]
+    finally:
+        backend.close()
+    assert elapsed < 0.5
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+
+
+def test_fast_reads_are_not_hedged():
+    remote = FakeRemote([0.0])
+    backend = hedged(remote, budget=1.0, delay_ms=200.0)
+    try:
+        for _ in range(5):
+            backend.read_range("k", 0, 1)
+        stats = backend.stats()["hedging"]
+    finally:
+        backend.close()
+    assert remote.calls == 5
+    assert stats["hedges"] == 0 and stats["hedges_denied"] == 0
+
+
+def test_error_is_raised_when_both_reads_fail():
+    backend = hedged(FakeRemote([0.02], error=OSError("down")), budget=1.0)
+    try:
+        with pytest.raises(OSError):
+            backend.read_range("k", 0, 1)
+    finally:
+        backend.close()
+
+
+def test_latency_tracker_refreshes_percentile():
+    tracker = LatencyTracker(percentile=90.0, window=100, initial_seconds=0.5, refresh_every=10)
+    for i in range(9):
+        tracker.record(i / 1000)
+    assert tracker.threshold == 0.5
+    tracker.record(0.009)
+    assert tracker.threshold == 0.009
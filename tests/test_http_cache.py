@@ -0,0 +1,64 @@
+import gzip
+
+import pytest
+
+from src.config import app_settings
+from src.controller.search_controller import _encoded_response, _http_cache_headers
+from src.middleware.request_context import _collapse_vary
+from src.utils.http_cache import encoded_etag, make_etag, matching_etag
+
+ETAG = make_etag("generation-1", "autocomplete", "app", 10)
+
+
+def test_etag_depends_on_generation_and_key():
+    assert make_etag("generation-1", "autocomplete", "app", 10) == ETAG
+    assert make_etag("generation-2", "autocomplete", "app", 10) != ETAG
+    assert make_etag("generation-1", "autocomplete", "app", 11) != ETAG
+    # Key parts are separated: ("ab", "c") is not ("a", "bc")
+    assert make_etag("g", "ab", "c") != make_etag("g", "a", "bc")
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    (ETAG, ETAG),
+    (encoded_etag(ETAG, "gzip"), encoded_etag(ETAG, "gzip")),
+    ("W/" + encoded_etag(ETAG, "br"), encoded_etag(ETAG, "br")),
+    ('"other", ' + ETAG, ETAG),
+    ("*", ETAG),
+    ('"other"', None),
+])
+def test_if_none_match_accepts_any_coding_of_the_tag(header, expected):
+    assert matching_etag(header, ETAG) == expected
+
+
+def test_compressed_response_names_its_coding():
+    content = b'{"data":"' + b"x" * 2000 + b'"}'
+    response = _encoded_response(content, "gzip", {"ETag": ETAG})
+    assert response.headers["etag"] == encoded_etag(ETAG, "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert gzip.decompress(response.body) == content
+
+
+@pytest.mark.parametrize("content, encoding", [(b"{}", "gzip"), (b'{"data":"' + b"x" * 2000 + b'"}', None)])
+def test_identity_response_keeps_the_identity_tag(content, encoding):
+    response = _encoded_response(content, encoding, {"ETag": ETAG})
+    assert response.headers["etag"] == ETAG
+    assert "content-encoding" not in response.headers
+    assert response.body == content
+
+
+@pytest.mark.parametrize("compression", [True, False])
+def test_identity_response_varies_when_compression_is_enabled(monkeypatch, compression):
+    monkeypatch.setattr(app_settings.compression, "enabled", compression)
+    # A client without Accept-Encoding: the body is sent as is
+    response = _encoded_response(b'{"data":"' + b"x" * 2000 + b'"}', None, _http_cache_headers(ETAG, 60))
+    assert "content-encoding" not in response.headers
+    assert response.headers.get("vary") == ("Accept-Encoding" if compression else None)
+
+
+def test_repeated_vary_tokens_are_collapsed():
+    # The handler's Vary plus the one GZipMiddleware appends to identity bodies
+    headers = [(b"content-type", b"application/json"), (b"vary", b"Accept-Encoding, Accept-Encoding, Origin")]
+    _collapse_vary(headers)
+    assert headers == [(b"content-type", b"application/json"), (b"vary", b"Accept-Encoding, Origin")]
@@ -0,0 +1,66 @@
+import io
+import json
+import random
+
+import pytest
+
+from record_format import IndexWriter, write_indented_index
+from src.config import load_indexes
+from src.config.load_indexes import parse_index_json
+
+TRICKY_KEYS = ["plain", 'brace},', 'quote"},{"x', "},", "日本}, 語", "back\\slash", "", "  spaced  "]
+
+
+def random_index(seed, count=300):
+    rng = random.Random(seed)
+    keys = set(TRICKY_KEYS)
+    while len(keys) < count:
+        keys.add("".join(rng.choice('ab},"\\ 日') for _ in range(rng.randint(1, 8))))
+    return {key: (rng.randrange(2 ** 40), rng.randrange(2 ** 20)) for key in sorted(keys, key=str.lower)}
+
+
+def compact_json(index):
+    out = io.StringIO()
+    writer = IndexWriter(out)
+    for key, (offset, length) in index.items():
+        writer.add(key, offset, length)
+    writer.close()
+    return out.getvalue().encode("utf-8")
+
+
+def indented_json(index):
+    out = io.StringIO()
+    write_indented_index(index, out)
+    return out.getvalue().encode("utf-8")
+
+
+@pytest.mark.parametrize("chunk_bytes", [1, 17, 256, 1 << 20])
+@pytest.mark.parametrize("encode", [compact_json, indented_json])
+def test_chunked_parse_matches_json_loads(monkeypatch, chunk_bytes, encode):
+    monkeypatch.setattr(load_indexes, "INDEX_PARSE_CHUNK_BYTES", chunk_bytes)
+    raw = encode(random_index(chunk_bytes))
+    parsed = parse_index_json(raw)
+    assert parsed == json.loads(raw)
+    # Entry order is kept: prefix search relies on the sorted index order
+    assert list(parsed) == list(json.loads(raw))
+
+
+def test_progress_reaches_one_and_never_goes_back(monkeypatch):
+    monkeypatch.setattr(load_indexes, "INDEX_PARSE_CHUNK_BYTES", 64)
+    progress = []
+    parse_index_json(compact_json(random_index(1)), on_progress=progress.append)
+    assert len(progress) > 10
+    assert progress == sorted(progress)
+    assert progress[-1] == 1.0
+
+
+@pytest.mark.parametrize("raw", [b"{}", b"  {\n}\n", b'{"a":{"offset":1,"length":2}}'])
+def test_small_documents(monkeypatch, raw):
+    monkeypatch.setattr(load_indexes, "INDEX_PARSE_CHUNK_BYTES", 1)
+    assert parse_index_json(raw) == json.loads(raw)
+
+
+def test_invalid_json_is_reported(monkeypatch):
+    monkeypatch.setattr(load_indexes, "INDEX_PARSE_CHUNK_BYTES", 8)
+    with pytest.raises(ValueError):
+        parse_index_json(b'{"a":{"offset":1,"length":2},"b":{"offset":}')
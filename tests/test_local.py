@@ -0,0 +1,27 @@
+import pytest
+
+from src.errors import InternalServerException
+from src.storage.local import LocalStorageBackend
+
+KEY = "dict/data.bin"
+
+
+@pytest.fixture(params=[False, True], ids=["pread", "mmap"])
+def backend(request, tmp_path):
+    (tmp_path / "dict").mkdir()
+    (tmp_path / KEY).write_bytes(b"0123456789")
+    backend = LocalStorageBackend(str(tmp_path), use_mmap=request.param)
+    yield backend
+    backend.close()
+
+
+def test_reads_ranges(backend):
+    assert backend.read_range(KEY, 2, 5) == b"23456"
+    assert backend.read_range(KEY, 0, 10) == b"0123456789"
+    assert backend.get_size(KEY) == 10
+
+
+@pytest.mark.parametrize("offset, length", [(8, 5), (10, 1), (20, 4)])
+def test_out_of_range_reads_fail(backend, offset, length):
+    with pytest.raises(InternalServerException):
+        backend.read_range(KEY, offset, length)
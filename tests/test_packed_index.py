@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from src.config.packed_index import PackedIndex
+
+
+def build(keys):
+    keys = sorted(keys, key=str.lower)
+    return {key: {"offset": i * 10, "length": len(key)} for i, key in enumerate(keys)}, keys
+
+
+def reference_prefix(keys, query, limit):
+    return [key for key in keys if key.lower().startswith(query.lower())][:limit]
+
+
+KEYS = ["apple", "Apple Inc.", "applesauce", "app", "banana", "Bañera", "日本", "日本語", "zebra", "Zürich"]
+
+
+def test_lookups_match_the_dict():
+    indexes, keys = build(KEYS)
+    packed = PackedIndex(indexes)
+    assert len(packed) == len(keys)
+    assert list(packed) == keys
+    for key, entry in indexes.items():
+        assert packed.get(key) == entry
+        assert packed[key] == entry
+        assert key in packed
+
+
+@pytest.mark.parametrize("missing", ["ap", "appl", "apple ", "APPLE", "日", "", "zebras"])
+def test_misses_include_prefixes_of_keys(missing):
+    packed = PackedIndex(build(KEYS)[0])
+    assert packed.get(missing) is None
+    assert missing not in packed
+    with pytest.raises(KeyError):
+        packed[missing]
+
+
+def test_prefix_search_matches_a_scan():
+    rng = random.Random(7)
+    alphabet = "abAB日é "
+    indexes, keys = build({"".join(rng.choice(alphabet) for _ in range(rng.randint(1, 6))) for _ in range(2000)})
+    packed = PackedIndex(indexes)
+    for _ in range(500):
+        query = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 3)))
+        limit = rng.randint(1, 20)
+        assert packed.prefix_search(query, limit) == reference_prefix(keys, query, limit)
+
+
+def test_case_sensitive_prefix_search_filters_the_run():
+    packed = PackedIndex(build(KEYS)[0])
+    assert packed.prefix_search("app", 10) == ["app", "apple", "Apple Inc.", "applesauce"]
+    assert packed.prefix_search("App", 10, case_sensitive=True) == ["Apple Inc."]
+    assert packed.prefix_search("日本", 1) == ["日本"]
+    assert packed.prefix_search("x", 10) == []
+
+
+def test_large_offsets_use_wide_arrays():
+    packed = PackedIndex({"a": {"offset": 2 ** 40, "length": 5}, "b": {"offset": 7, "length": 2 ** 33}})
+    assert packed.get("a") == {"offset": 2 ** 40, "length": 5}
+    assert packed.get("b") == {"offset": 7, "length": 2 ** 33}
+
+
+def test_empty_index():
+    packed = PackedIndex({})
+    assert len(packed) == 0
+    assert packed.get("a") is None
+    assert packed.prefix_search("a", 10) == []
+
+
+def test_nul_in_key_is_rejected():
+    with pytest.raises(ValueError):
+        PackedIndex({"a\0b": {"offset": 0, "length": 1}})
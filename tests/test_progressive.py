@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+
+from src.metrics import render_metrics
+from src.storage.memory import MemoryStorageBackend
+from src.storage.progressive import ProgressiveLocalBackend
+
+KEY = "dict/data.bin"
+DATA = os.urandom(50000)
+
+
+def wait_until_complete(backend, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not backend.stats()["downloads"][KEY]["complete"]:
+        assert time.monotonic() < deadline, "download did not complete"
+        time.sleep(0.01)
+
+
+def metric(name, **labels):
+    selector = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    prefix = f"{name}{{{selector}}} " if selector else f"{name} "
+    for line in render_metrics()[0].decode().splitlines():
+        if line.startswith(prefix):
+            return float(line[len(prefix):])
+    return 0.0
+
+
+def test_reads_move_to_the_local_copy_and_are_exported(tmp_path):
+    backend = ProgressiveLocalBackend(MemoryStorageBackend({KEY: DATA}), str(tmp_path), range_size=4096)
+    local_before = metric("wikidict_storage_reads_total", source="local")
+    remote_before = metric("wikidict_storage_reads_total", source="remote")
+    try:
+        assert backend.read_range(KEY, 100, 50) == DATA[100:150]
+        backend.prefetch(KEY)
+        wait_until_complete(backend)
+        assert backend.read_range(KEY, 40000, 10000) == DATA[40000:]
+        stats = backend.stats()
+    finally:
+        backend.close()
+
+    assert stats["reads"] == {"local": 1, "remote": 1, "local_bytes": 10000, "remote_bytes": 50}
+    assert (tmp_path / KEY).read_bytes() == DATA
+    assert metric("wikidict_storage_reads_total", source="local") == local_before + 1
+    assert metric("wikidict_storage_reads_total", source="remote") == remote_before + 1
+    assert metric("wikidict_localize_bytes_done", file=KEY) == len(DATA)
+    assert metric("wikidict_localize_complete", file=KEY) == 1.0
+
+
+class CountingBackend(MemoryStorageBackend):
+    def __init__(self, objects):
+        super().__init__(objects)
+        self.range_reads = 0
+
+    def read_range(self, key, offset, length):
+        self.range_reads += 1
+        return super().read_range(key, offset, length)
+
+
+def test_download_uses_the_downloader_not_the_protected_backend(tmp_path):
+    protected = CountingBackend({KEY: DATA})
+    raw = CountingBackend({KEY: DATA})
+    backend = ProgressiveLocalBackend(protected, str(tmp_path), range_size=4096, downloader=raw)
+    try:
+        backend.prefetch(KEY)
+        wait_until_complete(backend)
+        assert backend.read_range(KEY, 0, 10) == DATA[:10]
+    finally:
+        backend.close()
+    # 13 background range GETs, none through the hedged/breaker-wrapped backend
+    assert raw.range_reads == 13
+    assert protected.range_reads == 0
+
+
+def test_prefork_download_runs_in_its_own_process(tmp_path):
+    from src.server.prefork import _spawn_prefetch
+
+    backend = ProgressiveLocalBackend(MemoryStorageBackend({KEY: DATA}), str(tmp_path), range_size=4096)
+    threads = threading.active_count()
+    try:
+        # As in the pre-fork master: prepare, then download in a forked child
+        backend.prefetch(KEY, start=False)
+        pid = _spawn_prefetch(backend)
+        _, status = os.waitpid(pid, 0)
+        assert status == 0
+        assert threading.active_count() == threads
+
+        # A worker sees the ranges the download process marked done
+        backend.after_fork()
+        assert backend.stats()["downloads"][KEY]["complete"]
+        assert backend.read_range(KEY, 40000, 10000) == DATA[40000:]
+        assert backend.stats()["reads"]["local"] == 1
+    finally:
+        backend.close()
+    assert (tmp_path / KEY).read_bytes() == DATA
@@ -0,0 +1,100 @@
+import io
+import json
+
+import pytest
+
+import record_format
+from record_format import MAGIC, IndexWriter, RecordWriter, iter_raw_records, iter_records, write_indented_index
+
+RECORDS = [
+    ("apple", "A fruit"),
+    ("Äpfel", "Äpfel, plural of \"Apfel\"\nsecond line"),
+    ("empty", ""),
+    ("日本", "Japan " * 1000),
+]
+
+
+def write_data(records):
+    data = io.BytesIO()
+    writer = RecordWriter(data)
+    spans = [writer.write(title, value) for title, value in records]
+    return data.getvalue(), spans, writer.position
+
+
+def test_offsets_point_at_value_bytes():
+    data, spans, position = write_data(RECORDS)
+    assert data.startswith(MAGIC)
+    assert position == len(data)
+    for (_, value), (offset, length) in zip(RECORDS, spans):
+        assert data[offset:offset + length] == value.encode("utf-8")
+
+
+def test_records_round_trip():
+    data, _, _ = write_data(RECORDS)
+    assert [(r["title"], r["value"]) for r in iter_records(io.BytesIO(data))] == RECORDS
+
+
+def test_empty_data_file():
+    data, _, _ = write_data([])
+    assert data == MAGIC
+    assert list(iter_records(io.BytesIO(data))) == []
+
+
+def test_bad_magic_is_rejected():
+    with pytest.raises(ValueError):
+        list(iter_records(io.BytesIO(b"title,value\n")))
+
+
+def test_truncated_file_is_rejected():
+    data, spans, _ = write_data(RECORDS[:2])
+    # Every cut inside the last record: its length prefixes, title and value
+    start = spans[0][0] + spans[0][1]
+    for end in range(start + 1, len(data)):
+        with pytest.raises(ValueError, match="Truncated"):
+            list(iter_raw_records(io.BytesIO(data[:end])))
+    assert len(list(iter_raw_records(io.BytesIO(data[:start])))) == 1
+
+
+def test_index_writer_is_compact_json():
+    index = io.StringIO()
+    writer = IndexWriter(index)
+    writer.add('say "hi"', 8, 3)
+    writer.add("日本", 20, 5)
+    writer.delete("gone")
+    writer.close()
+    assert "\n" not in index.getvalue() and '": ' not in index.getvalue()
+    assert json.loads(index.getvalue()) == {
+        'say "hi"': {"offset": 8, "length": 3},
+        "日本": {"offset": 20, "length": 5},
+        "gone": None,
+    }
+
+
+def test_raw_records_are_undecoded_bytes():
+    data, _, _ = write_data(RECORDS)
+    raw = list(iter_raw_records(io.BytesIO(data)))
+    assert raw == [(title.encode("utf-8"), value.encode("utf-8")) for title, value in RECORDS]
+
+
+def test_write_bytes_matches_write():
+    encoded = io.BytesIO()
+    writer = RecordWriter(encoded)
+    spans = [writer.write_bytes(title.encode("utf-8"), value.encode("utf-8")) for title, value in RECORDS]
+    assert (encoded.getvalue(), spans) == write_data(RECORDS)[:2]
+
+
+@pytest.mark.parametrize("batch", [1, 3, 10000])
+def test_indented_index_is_byte_identical_to_json_dump(monkeypatch, batch):
+    monkeypatch.setattr(record_format, "INDEX_WRITE_BATCH", batch)
+    index = {"apple": (8, 5), 'say "hi"\\n': (20, 0), "日本": (2 ** 40, 7), "tab\t": (1, 2)}
+    out = io.StringIO()
+    write_indented_index(index, out)
+    expected = json.dumps({title: {"offset": offset, "length": length} for title, (offset, length) in index.items()},
+                          ensure_ascii=False, indent=2)
+    assert out.getvalue() == expected
+
+
+def test_empty_indented_index():
+    out = io.StringIO()
+    write_indented_index({}, out)
+    assert out.getvalue() == json.dumps({}, ensure_ascii=False, indent=2)
@@ -0,0 +1,52 @@
+import pytest
+
+from src.errors import InternalServerException, NotFoundException, ServiceUnavailableException
+from src.storage.s3 import map_s3_client_error
+from src.utils.stale import StaleMeaningStore
+
+
+def test_keyed_by_exact_word():
+    store = StaleMeaningStore(10)
+    store.remember("apple", "a fruit")
+    store.remember("Apple", "a company")
+    assert store.get("apple") == "a fruit"
+    assert store.get("Apple") == "a company"
+    assert store.get("APPLE") is None
+    assert store.stats()["stale_hits"] == 2
+    assert store.stats()["stale_misses"] == 1
+
+
+def test_evicts_least_recently_remembered():
+    store = StaleMeaningStore(2)
+    store.remember("a", "1")
+    store.remember("b", "2")
+    store.remember("a", "1 again")
+    store.remember("c", "3")
+    assert store.get("b") is None
+    assert store.get("a") == "1 again"
+    assert len(store) == 2
+
+
+def test_disabled_store_keeps_nothing():
+    store = StaleMeaningStore(0)
+    store.remember("a", "1")
+    assert store.get("a") is None
+
+
+def client_error(code):
+    botocore = pytest.importorskip("botocore.exceptions")
+    return botocore.ClientError({"Error": {"Code": code, "Message": code}}, "GetObject")
+
+
+@pytest.mark.parametrize("code, expected", [
+    ("SlowDown", ServiceUnavailableException),
+    ("ServiceUnavailable", ServiceUnavailableException),
+    ("RequestTimeout", ServiceUnavailableException),
+    ("InternalError", ServiceUnavailableException),
+    ("NoSuchKey", NotFoundException),
+    ("AccessDenied", InternalServerException),
+    ("InvalidRange", InternalServerException),
+])
+def test_only_availability_errors_allow_stale_answers(code, expected):
+    # /search serves stale meanings for ServiceUnavailableException only
+    assert type(map_s3_client_error(client_error(code), "k", 0, 1, "bucket")) is expected